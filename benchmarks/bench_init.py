@@ -0,0 +1,232 @@
+"""Benchmark the full ``tailgen init`` flow against local stand-ins.
+
+pip installs from a directory of stand-in wheels (through a lock and the
+wheelhouse, as after ``tailgen lock`` and ``tailgen cache warm --from``),
+node_modules comes from a directory of stand-in tarballs, and git is real.
+Nothing goes to the network.
+
+For each framework two scenarios are measured:
+
+* cold: an empty tailgen cache, so the golden venv is built and every npm
+  package is extracted into the store;
+* warm: the cache the cold runs left behind, as on a developer's machine.
+
+Each run reports wall time, the peak RSS of tailgen and the tools it ran,
+and the bytes added to disk (the project plus cache growth, hardlinks
+counted once). Results are compared with ``baseline.json``; the script
+exits with status 1 if a median time or the peak RSS is worse than the
+baseline by more than the threshold.
+
+Usage (POSIX only, from the repository root)::
+
+    python benchmarks/bench_init.py [--repeat 3] [--framework flask]
+    python benchmarks/bench_init.py --update-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import standins  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+FRAMEWORKS = ("flask", "fastapi")
+
+
+class Run(NamedTuple):
+    seconds: float
+    peak_rss: int  # bytes
+    bytes_written: int
+
+
+def _disk_usage(paths: Iterable[Path]) -> int:
+    """Bytes in the files under ``paths``, counting each inode once"""
+    seen = set()
+    total = 0
+    for root in paths:
+        for directory, _, files in os.walk(root):
+            for name in files:
+                try:
+                    stat = os.lstat(os.path.join(directory, name))
+                except FileNotFoundError:
+                    continue
+                if (stat.st_dev, stat.st_ino) not in seen:
+                    seen.add((stat.st_dev, stat.st_ino))
+                    total += stat.st_size
+    return total
+
+
+def _tailgen(args: List[str], env: Dict[str, str], stdin: bytes = b"") -> Run:
+    """Run tailgen in a child process and measure it"""
+    with tempfile.TemporaryFile() as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "tailgen", *args],
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        process.stdin.write(stdin)
+        process.stdin.close()
+        # wait4 reports the child's peak RSS, including the tools it waited for
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            log.seek(0)
+            sys.stderr.write(log.read().decode(errors="replace"))
+            raise SystemExit(f"tailgen {' '.join(args)} failed")
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return Run(seconds, usage.ru_maxrss * scale, 0)
+
+
+def _environment(cache: Path, tarballs: Path) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["TAILGEN_CACHE_DIR"] = str(cache)
+    env["TAILGEN_NPM_SOURCE"] = str(tarballs)
+    # Anything that still reaches for the package index fails loudly
+    env["PIP_NO_INDEX"] = "1"
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")])
+    )
+    return env
+
+
+def _prepare_cache(framework: str, env: Dict[str, str], wheels: Path) -> None:
+    """What 'tailgen lock' and 'tailgen cache warm' would leave behind"""
+    cache = Path(env["TAILGEN_CACHE_DIR"])
+    _tailgen(
+        ["lock", "-f", framework, "--from", str(wheels), "-o", str(cache / "locks")],
+        env,
+    )
+    _tailgen(["cache", "warm", "-f", framework, "--from", str(wheels)], env)
+
+
+def _init(framework: str, env: Dict[str, str], output_dir: Path, name: str) -> Run:
+    cache = Path(env["TAILGEN_CACHE_DIR"])
+    before = _disk_usage([cache])
+    run = _tailgen(
+        ["init", "-f", framework, "-o", str(output_dir)], env, f"{name}\n".encode()
+    )
+    written = _disk_usage([cache, output_dir / name]) - before
+    return run._replace(bytes_written=written)
+
+
+def benchmark(framework: str, repeat: int, work: Path, wheels: Path, tarballs: Path):
+    """Median cold and warm runs of one framework"""
+    runs: Dict[str, List[Run]] = {"cold": [], "warm": []}
+    env = None
+    for attempt in range(repeat):
+        env = _environment(work / f"{framework}-cache-{attempt}", tarballs)
+        _prepare_cache(framework, env, wheels)
+        output_dir = work / f"{framework}-cold-{attempt}"
+        runs["cold"].append(_init(framework, env, output_dir, "project"))
+    for attempt in range(repeat):
+        output_dir = work / f"{framework}-warm-{attempt}"
+        runs["warm"].append(_init(framework, env, output_dir, "project"))
+
+    return {
+        scenario: {
+            "seconds": round(statistics.median(run.seconds for run in results), 3),
+            "peak_rss_mb": round(max(run.peak_rss for run in results) / 2**20, 1),
+            "bytes_written": int(
+                statistics.median(run.bytes_written for run in results)
+            ),
+        }
+        for scenario, results in runs.items()
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Regressions of time or memory beyond the threshold"""
+    regressions = []
+    for framework, scenarios in results.items():
+        for scenario, metrics in scenarios.items():
+            base = baseline.get(framework, {}).get(scenario)
+            if not base:
+                continue
+            for metric in ("seconds", "peak_rss_mb"):
+                limit = base[metric] * (1 + threshold)
+                if metrics[metric] > limit:
+                    regressions.append(
+                        f"{framework} {scenario} {metric}: {metrics[metric]} "
+                        f"> {limit:.2f} (baseline {base[metric]})"
+                    )
+    return regressions
+
+
+def _print_table(results: dict, baseline: dict) -> None:
+    header = (
+        f"{'':20} {'seconds':>9} {'baseline':>9} {'peak RSS MB':>12} {'KB written':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for framework, scenarios in results.items():
+        for scenario, metrics in scenarios.items():
+            base = baseline.get(framework, {}).get(scenario, {})
+            base_seconds = base.get("seconds")
+            print(
+                f"{framework + ' ' + scenario:20} {metrics['seconds']:>9.2f} "
+                f"{base_seconds if base_seconds is not None else '-':>9} "
+                f"{metrics['peak_rss_mb']:>12.1f} "
+                f"{metrics['bytes_written'] / 1024:>11.0f}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--framework", choices=FRAMEWORKS, action="append")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", type=Path, help="Also write the results here.")
+    options = parser.parse_args(argv)
+
+    baseline = {}
+    if options.baseline.is_file():
+        baseline = json.loads(options.baseline.read_text())
+
+    with tempfile.TemporaryDirectory(prefix="tailgen-bench-") as temporary:
+        work = Path(temporary)
+        wheels, tarballs = standins.build(work / "standins")
+        results = {
+            framework: benchmark(framework, options.repeat, work, wheels, tarballs)
+            for framework in options.framework or FRAMEWORKS
+        }
+
+    _print_table(results, baseline)
+    if options.json:
+        options.json.write_text(json.dumps(results, indent=2) + "\n")
+
+    if options.update_baseline:
+        updated = {**baseline, **results}
+        updated["machine"] = f"{platform.system()} {platform.machine()}, "
+        updated["machine"] += f"Python {platform.python_version()}"
+        options.baseline.write_text(json.dumps(updated, indent=2) + "\n")
+        print(f"Baseline written to {options.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, options.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
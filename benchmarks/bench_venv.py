@@ -0,0 +1,89 @@
+"""Benchmark creating an empty venv with pip, as ``_create_venv`` does on a cache miss.
+
+Three ways are compared:
+
+* ensurepip: what ``_create_venv`` used to do, ``python -m venv`` (which
+  itself runs ensurepip) followed by ``python -m ensurepip``;
+* seeded, cold: ``_create_venv`` with an empty tailgen cache, so pip is
+  unpacked from the bundled wheel and byte-compiled first;
+* seeded, warm: ``_create_venv`` once the cache holds that copy of pip.
+
+Every venv is checked to have a working pip. Nothing goes to the network.
+
+Usage (from the repository root)::
+
+    python benchmarks/bench_venv.py [--repeat 5] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from tailgen.environments import _create_venv, _venv_executable  # noqa: E402
+
+
+def ensurepip_venv(project_dir: Path) -> None:
+    """The venv build that ``_create_venv`` replaced"""
+    venv_dir = project_dir / "venv"
+    subprocess.run([sys.executable, "-m", "venv", str(venv_dir)], check=True)
+    python = _venv_executable(venv_dir, "python")
+    subprocess.run([python, "-m", "ensurepip"], check=True, capture_output=True)
+
+
+def _check_pip(project_dir: Path) -> None:
+    pip = _venv_executable(project_dir / "venv", "pip")
+    subprocess.run([pip, "--version"], check=True, capture_output=True)
+
+
+def _time(create: Callable[[Path], None], project_dir: Path) -> float:
+    start = time.perf_counter()
+    create(project_dir)
+    seconds = time.perf_counter() - start
+    _check_pip(project_dir)
+    return seconds
+
+
+def benchmark(repeat: int, work: Path) -> dict:
+    """Median seconds of each way of building a venv"""
+    runs: dict = {"ensurepip": [], "seeded, cold": [], "seeded, warm": []}
+    for attempt in range(repeat):
+        runs["ensurepip"].append(_time(ensurepip_venv, work / f"ensurepip-{attempt}"))
+        os.environ["TAILGEN_CACHE_DIR"] = str(work / f"cache-{attempt}")
+        runs["seeded, cold"].append(_time(_create_venv, work / f"cold-{attempt}"))
+        runs["seeded, warm"].append(_time(_create_venv, work / f"warm-{attempt}"))
+    return {
+        name: round(statistics.median(seconds), 3) for name, seconds in runs.items()
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path, help="Also write the results here.")
+    options = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="tailgen-bench-venv-") as temporary:
+        results = benchmark(options.repeat, Path(temporary))
+
+    reference = results["ensurepip"]
+    print(f"{'':14} {'seconds':>9} {'speedup':>8}")
+    print("-" * 33)
+    for name, seconds in results.items():
+        print(f"{name:14} {seconds:>9.3f} {reference / seconds:>7.1f}x")
+    if options.json:
+        options.json.write_text(json.dumps(results, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
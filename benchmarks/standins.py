@@ -0,0 +1,225 @@
+"""Local stand-ins for the package index and the npm registry.
+
+The wheels and tarballs mirror the dependency graphs of the real framework
+and Tailwind packages (names, edges, extras, console scripts and bins),
+padded with generated source so installs move a realistic number of files.
+Nothing in them is meant to be imported.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# name: (version, requirements, extra requirements, padding modules)
+WHEELS: Dict[str, Tuple[str, List[str], Dict[str, List[str]], int]] = {
+    "flask": (
+        "3.0.3",
+        [
+            "Werkzeug>=3.0.0",
+            "Jinja2>=3.1.2",
+            "itsdangerous>=2.1.2",
+            "click>=8.1.3",
+            "blinker>=1.6.2",
+        ],
+        {},
+        40,
+    ),
+    "werkzeug": ("3.0.3", ["MarkupSafe>=2.1.1"], {}, 60),
+    "jinja2": ("3.1.4", ["MarkupSafe>=2.0"], {}, 40),
+    "markupsafe": ("2.1.5", [], {}, 5),
+    "itsdangerous": ("2.2.0", [], {}, 5),
+    "click": ("8.1.7", [], {}, 20),
+    "blinker": ("1.8.2", [], {}, 5),
+    "fastapi": (
+        "0.115.0",
+        ["starlette>=0.37.2", "pydantic>=2.7.0", "typing-extensions>=4.8.0"],
+        {
+            "standard": [
+                "fastapi-cli>=0.0.5",
+                "httpx>=0.23.0",
+                "jinja2>=2.11.2",
+                "python-multipart>=0.0.7",
+                "email-validator>=2.0.0",
+                "uvicorn>=0.12.0",
+            ]
+        },
+        60,
+    ),
+    "starlette": ("0.38.6", ["anyio>=3.4.0"], {}, 30),
+    "pydantic": (
+        "2.9.2",
+        ["annotated-types>=0.6.0", "pydantic-core==2.23.4", "typing-extensions>=4.6.1"],
+        {},
+        80,
+    ),
+    "pydantic-core": ("2.23.4", ["typing-extensions>=4.6.0"], {}, 30),
+    "annotated-types": ("0.7.0", [], {}, 5),
+    "typing-extensions": ("4.12.2", [], {}, 5),
+    "anyio": ("4.6.0", ["idna>=2.8", "sniffio>=1.1"], {}, 20),
+    "idna": ("3.10", [], {}, 5),
+    "sniffio": ("1.3.1", [], {}, 5),
+    "fastapi-cli": ("0.0.5", ["typer>=0.12.3", "uvicorn>=0.15.0"], {}, 5),
+    "typer": ("0.12.5", ["click>=8.0.0", "rich>=10.11.0"], {}, 15),
+    "rich": ("13.8.1", ["pygments>=2.13.0"], {}, 60),
+    "pygments": ("2.18.0", [], {}, 120),
+    "httpx": (
+        "0.27.2",
+        ["anyio", "certifi", "httpcore==1.*", "idna", "sniffio"],
+        {},
+        20,
+    ),
+    "httpcore": ("1.0.5", ["certifi", "h11>=0.13,<0.15"], {}, 15),
+    "certifi": ("2024.8.30", [], {}, 2),
+    "h11": ("0.14.0", [], {}, 10),
+    "python-multipart": ("0.0.12", [], {}, 5),
+    "email-validator": ("2.2.0", ["dnspython>=2.0.0", "idna>=2.0.0"], {}, 5),
+    "dnspython": ("2.6.1", [], {}, 40),
+    "uvicorn": ("0.31.0", ["click>=7.0", "h11>=0.8"], {}, 20),
+}
+
+CONSOLE_SCRIPTS = {
+    "flask": "flask = flask.cli:main",
+    "fastapi-cli": "fastapi = fastapi_cli.cli:main",
+    "uvicorn": "uvicorn = uvicorn.main:main",
+}
+
+# name: (version, dependencies, bins, padding files)
+TARBALLS: Dict[str, Tuple[str, Dict[str, str], Dict[str, str], int]] = {
+    "tailwindcss": (
+        "3.4.17",
+        {
+            "chokidar": "^3.6.0",
+            "fast-glob": "^3.3.2",
+            "lilconfig": "^3.1.3",
+            "picocolors": "^1.1.1",
+            "postcss": "^8.4.47",
+            "postcss-selector-parser": "^6.1.2",
+            "resolve": "^1.22.8",
+        },
+        {"tailwind": "lib/cli.js", "tailwindcss": "lib/cli.js"},
+        200,
+    ),
+    "chokidar": ("3.6.0", {"picomatch": "^2.0.4"}, {}, 15),
+    "fast-glob": ("3.3.2", {"picomatch": "^2.3.1", "micromatch": "^4.0.4"}, {}, 30),
+    "micromatch": ("4.0.8", {"picomatch": "^2.3.1"}, {}, 5),
+    "picomatch": ("2.3.1", {}, {}, 5),
+    "lilconfig": ("3.1.3", {}, {}, 3),
+    "picocolors": ("1.1.1", {}, {}, 2),
+    "postcss": (
+        "8.4.47",
+        {"nanoid": "^3.3.7", "picocolors": "^1.1.0", "source-map-js": "^1.2.1"},
+        {},
+        40,
+    ),
+    "nanoid": ("3.3.7", {}, {"nanoid": "bin/nanoid.cjs"}, 5),
+    "source-map-js": ("1.2.1", {}, {}, 15),
+    "postcss-selector-parser": (
+        "6.1.2",
+        {"cssesc": "^3.0.0", "util-deprecate": "^1.0.2"},
+        {},
+        20,
+    ),
+    "cssesc": ("3.0.0", {}, {"cssesc": "bin/cssesc"}, 2),
+    "util-deprecate": ("1.0.2", {}, {}, 1),
+    "resolve": (
+        "1.22.8",
+        {"is-core-module": "^2.13.0"},
+        {"resolve": "bin/resolve"},
+        30,
+    ),
+    "is-core-module": ("2.15.1", {"hasown": "^2.0.2"}, {}, 3),
+    "hasown": ("2.0.2", {}, {}, 1),
+}
+
+
+def _padding(name: str, index: int) -> str:
+    """About 4 KB of source that differs per file, so nothing deduplicates"""
+    body = "".join(
+        f"def {name}_{index}_{i}(value):\n    return value * {i} + {index}\n\n"
+        for i in range(80)
+    )
+    return f"# {name} module {index}\n{body}"
+
+
+def _record_line(path: str, content: bytes) -> str:
+    digest = base64.urlsafe_b64encode(hashlib.sha256(content).digest())
+    return f"{path},sha256={digest.rstrip(b'=').decode()},{len(content)}"
+
+
+def make_wheel(directory: Path, name: str) -> Path:
+    version, requires, extras, modules = WHEELS[name]
+    module = name.replace("-", "_")
+    dist_info = f"{module}-{version}.dist-info"
+    metadata = ["Metadata-Version: 2.1", f"Name: {name}", f"Version: {version}"]
+    metadata += [f"Requires-Dist: {requirement}" for requirement in requires]
+    for extra, extra_requires in extras.items():
+        metadata.append(f"Provides-Extra: {extra}")
+        metadata += [
+            f'Requires-Dist: {requirement}; extra == "{extra}"'
+            for requirement in extra_requires
+        ]
+
+    files = {f"{module}/__init__.py": f"__version__ = {version!r}\n"}
+    for index in range(modules):
+        files[f"{module}/_module{index}.py"] = _padding(module, index)
+    files[f"{dist_info}/METADATA"] = "\n".join(metadata) + "\n"
+    files[f"{dist_info}/WHEEL"] = (
+        "Wheel-Version: 1.0\nRoot-Is-Purelib: true\nTag: py3-none-any\n"
+    )
+    if name in CONSOLE_SCRIPTS:
+        files[f"{dist_info}/entry_points.txt"] = (
+            f"[console_scripts]\n{CONSOLE_SCRIPTS[name]}\n"
+        )
+
+    record = [_record_line(path, content.encode()) for path, content in files.items()]
+    record.append(f"{dist_info}/RECORD,,")
+    files[f"{dist_info}/RECORD"] = "\n".join(record) + "\n"
+
+    wheel = directory / f"{module}-{version}-py3-none-any.whl"
+    with zipfile.ZipFile(wheel, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path, content in files.items():
+            archive.writestr(path, content)
+    return wheel
+
+
+def make_tarball(directory: Path, name: str) -> Path:
+    version, dependencies, bins, padding = TARBALLS[name]
+    manifest = {"name": name, "version": version, "dependencies": dependencies}
+    if bins:
+        manifest["bin"] = bins
+    files = {
+        "package/package.json": json.dumps(manifest, indent=2),
+        "package/index.js": "module.exports = require('./lib/module0.js');\n",
+    }
+    for index in range(padding):
+        files[f"package/lib/module{index}.js"] = _padding(name, index)
+    scripts = {f"package/{script}" for script in bins.values()}
+    for script in scripts:
+        files[script] = "#!/usr/bin/env node\nrequire('../index.js');\n"
+
+    tarball = directory / f"{name}-{version}.tgz"
+    with tarfile.open(tarball, "w:gz") as archive:
+        for path, content in files.items():
+            data = content.encode()
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            info.mode = 0o755 if path in scripts else 0o644
+            archive.addfile(info, io.BytesIO(data))
+    return tarball
+
+
+def build(root: Path) -> Tuple[Path, Path]:
+    """Write the wheel directory and the tarball registry under ``root``"""
+    wheels, tarballs = root / "wheels", root / "tarballs"
+    wheels.mkdir(parents=True)
+    tarballs.mkdir(parents=True)
+    for name in WHEELS:
+        make_wheel(wheels, name)
+    for name in TARBALLS:
+        make_tarball(tarballs, name)
+    return wheels, tarballs
@@ -8,4 +8,21 @@ __version__ = "1.3.0"
 
 
 VALID_FRAMEWORKS = {"flask", "fastapi"}
+TAILWIND_MODES = {"npm", "standalone"}
+# npm packages a project installs in the default --tailwind npm mode
+TAILWIND_PACKAGES = ("tailwindcss",)
+# Release of the standalone Tailwind CLI used by --tailwind=standalone
+STANDALONE_TAILWIND_VERSION = "3.4.17"
+FRAMEWORK_REQUIREMENTS = {
+    "flask": ("flask",),
+    "fastapi": ("fastapi[standard]", "Jinja2"),
+}
+# What --profile production adds to the venv to serve the app
+PRODUCTION_REQUIREMENTS = {
+    "flask": ("gunicorn",),
+    "fastapi": ("gunicorn", "uvicorn-worker"),
+}
+PROFILES = {"development", "production"}
+# What `tailgen bench` serves the app with; auto prefers production when set up
+BENCH_SERVERS = {"auto", "dev", "production"}
 DELAY_DURATION = 0.5
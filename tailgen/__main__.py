@@ -1,9 +1,25 @@
 """TailGen entry point"""
 
-from tailgen import __app_name__, cli
+import sys
+
+from tailgen import __app_name__, __version__
 
 
 def main():
+    # Answer --version without importing typer, rich and the CLI
+    if sys.argv[1:] in (["--version"], ["-v"]):
+        print(f"{__app_name__} v{__version__}")
+        return
+    # With `tailgen serve` running, init is only a thin client of it
+    if sys.argv[1:2] == ["init"]:
+        from tailgen.client import init
+
+        code = init(sys.argv[2:])
+        if code is not None:
+            sys.exit(code)
+
+    from tailgen import cli
+
     cli.app(prog_name=__app_name__)
 
 
@@ -0,0 +1,234 @@
+"""Generate many projects from one manifest.
+
+The manifest is a TOML file with optional ``[defaults]`` and one
+``[[project]]`` table per project::
+
+    [defaults]
+    framework = "fastapi"
+    output_dir = "services"
+    tailwind = "standalone"
+    commit = true
+
+    [[project]]
+    name = "billing"
+
+    [[project]]
+    name = "admin"
+    framework = "flask"
+    no_cache = true
+
+Projects are generated in separate worker processes. The venv, wheel and npm
+caches are shared between them; each cache guards its writes with a file lock,
+so the first worker to need an entry builds it and the others reuse it.
+"""
+
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+from tailgen import PROFILES, TAILWIND_MODES, VALID_FRAMEWORKS, output
+from tailgen.scheduler import StageError
+from tailgen.settings import configure
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+PROJECT_KEYS = {
+    "name",
+    "framework",
+    "output_dir",
+    "offline",
+    "no_cache",
+    "tailwind",
+    "profile",
+    "commit",
+}
+
+
+class ManifestError(ValueError):
+    """Raised when a batch manifest cannot be used"""
+
+
+class ProjectSpec(NamedTuple):
+    name: str
+    framework: str
+    output_dir: Path
+    offline: bool = False
+    no_cache: bool = False
+    tailwind: str = "npm"
+    profile: str = "development"
+    commit: bool = False
+
+
+class ProjectResult(NamedTuple):
+    spec: ProjectSpec
+    seconds: float
+    error: Optional[str]
+    log: str
+
+
+def _project_spec(entry: dict, defaults: dict, base_dir: Path, number: int):
+    options = {**defaults, **entry}
+    unknown = set(options) - PROJECT_KEYS
+    if unknown:
+        raise ManifestError(
+            f"Project {number}: unknown option(s) {', '.join(sorted(unknown))}"
+        )
+    name = options.get("name")
+    if not isinstance(name, str) or not name:
+        raise ManifestError(f"Project {number}: 'name' is required")
+
+    framework = str(options.get("framework", "flask")).lower()
+    if framework not in VALID_FRAMEWORKS:
+        raise ManifestError(
+            f"Project {name}: framework must be either 'flask' or 'fastapi', "
+            f"not {framework}"
+        )
+
+    tailwind = str(options.get("tailwind", "npm")).lower()
+    if tailwind not in TAILWIND_MODES:
+        raise ManifestError(
+            f"Project {name}: tailwind must be either 'npm' or 'standalone', "
+            f"not {tailwind}"
+        )
+
+    profile = str(options.get("profile", "development")).lower()
+    if profile not in PROFILES:
+        raise ManifestError(
+            f"Project {name}: profile must be either 'development' or "
+            f"'production', not {profile}"
+        )
+
+    output_dir = Path(options.get("output_dir", ".")).expanduser()
+    return ProjectSpec(
+        name=name,
+        framework=framework,
+        output_dir=(base_dir / output_dir).resolve(),
+        offline=bool(options.get("offline", False)),
+        no_cache=bool(options.get("no_cache", False)),
+        tailwind=tailwind,
+        profile=profile,
+        commit=bool(options.get("commit", False)),
+    )
+
+
+def load_manifest(path: Path) -> List[ProjectSpec]:
+    """Read the projects listed in a manifest.
+
+    Relative output directories are taken from the manifest's own directory.
+    """
+    try:
+        with open(path, "rb") as file:
+            manifest = tomllib.load(file)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise ManifestError(f"Cannot read manifest {path}: {e}")
+
+    defaults = manifest.get("defaults", {})
+    if "name" in defaults:
+        raise ManifestError("'name' cannot have a default")
+    base_dir = Path(path).resolve().parent
+    specs = [
+        _project_spec(entry, defaults, base_dir, number)
+        for number, entry in enumerate(manifest.get("project", []), start=1)
+    ]
+    if not specs:
+        raise ManifestError(f"Manifest {path} lists no [[project]] entries")
+
+    seen = set()
+    for spec in specs:
+        target = spec.output_dir / spec.name
+        if target in seen:
+            raise ManifestError(f"Two projects would be generated in {target}")
+        seen.add(target)
+    return specs
+
+
+def _describe(error: BaseException) -> str:
+    if isinstance(error, StageError):
+        return "; ".join(f"{name}: {exc}" for name, exc in error.failures)
+    return str(error) or type(error).__name__
+
+
+def _run_project(generate: Callable[[ProjectSpec], None], spec: ProjectSpec):
+    """Generate one project, capturing its console output"""
+    configure(
+        offline=spec.offline,
+        use_cache=not spec.no_cache,
+        tailwind=spec.tailwind,
+        profile=spec.profile,
+        commit=spec.commit,
+    )
+    log = io.StringIO()
+    start = time.perf_counter()
+    error = None
+    try:
+        with redirect_stdout(log):
+            generate(spec)
+    except Exception as e:
+        error = _describe(e)
+    return ProjectResult(spec, time.perf_counter() - start, error, log.getvalue())
+
+
+def _summary(results: List[ProjectResult], elapsed: float) -> Table:
+    table = Table(title=f"Generated {len(results)} project(s) in {elapsed:.1f}s")
+    table.add_column("Project")
+    table.add_column("Framework")
+    table.add_column("Time", justify="right")
+    table.add_column("Result")
+    for result in results:
+        table.add_row(
+            str(result.spec.output_dir / result.spec.name),
+            result.spec.framework,
+            f"{result.seconds:.1f}s",
+            f"[red]{result.error}[/red]" if result.error else "[green]ok[/green]",
+        )
+    return table
+
+
+def run_batch(
+    specs: List[ProjectSpec],
+    generate: Callable[[ProjectSpec], None],
+    workers: Optional[int] = None,
+) -> List[ProjectResult]:
+    """Generate each spec with ``generate``, up to ``workers`` at a time.
+
+    ``generate`` must be a module-level function so it can be sent to the
+    worker processes. With a single worker everything runs in this process.
+    Results come back in manifest order, after a summary table is printed.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(specs))
+    start = time.perf_counter()
+    results = {}
+
+    def report(result: ProjectResult) -> None:
+        results[result.spec] = result
+        status = f"failed: {result.error}" if result.error else "done"
+        message = f"[{len(results)}/{len(specs)}] {result.spec.name} {status} ({result.seconds:.1f}s)"
+        if result.error:
+            output.error(message)
+            for line in result.log.splitlines():
+                output.detail(f"  {line}")
+        else:
+            output.step(message)
+
+    if workers == 1:
+        for spec in specs:
+            report(_run_project(generate, spec))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_project, generate, spec) for spec in specs]
+            for future in as_completed(futures):
+                report(future.result())
+
+    ordered = [results[spec] for spec in specs]
+    Console().print(_summary(ordered, time.perf_counter() - start))
+    return ordered
@@ -0,0 +1,317 @@
+"""``tailgen bench``: a baseline of how fast a generated app serves.
+
+The project's own server is started locally and driven by an asyncio load
+generator in this process: a fixed number of keep-alive connections, each
+sending the next request as soon as the previous response has been read,
+alternating between the page and its stylesheet. Latencies are kept per
+request, so the percentiles are exact rather than estimated.
+"""
+
+import asyncio
+import json
+import math
+import os
+import re
+import socket
+import subprocess
+import time
+import urllib.request
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rich.table import Table
+
+from tailgen.build import OUTPUT_CSS
+from tailgen.dev import _python, detect_framework, server_command
+from tailgen.environments import _venv_executable
+from tailgen.workspace import venv_dir
+
+HOST = "127.0.0.1"
+STARTUP_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 10.0
+# A client that lost its connection waits before reconnecting, doubling the
+# wait up to the maximum while the server keeps failing
+RECONNECT_DELAY = 0.05
+RECONNECT_MAX_DELAY = 1.0
+RESULTS_PATH = Path(".tailgen") / "bench.json"
+
+_STYLESHEET = re.compile(r"""<link\b[^>]*\bhref=["']([^"']+\.css)["']""", re.IGNORECASE)
+
+
+class BenchError(RuntimeError):
+    """Raised when the app cannot be started or measured"""
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of values sorted in ascending order"""
+    if not ordered:
+        return 0.0
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bool]:
+    """Read one response; returns its status and whether to keep the connection"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    version, status = status_line.split(" ", 2)[:2]
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        if name:
+            headers[name.strip().lower()] = value.strip().lower()
+
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()  # the body runs until the server closes
+        return int(status), False
+
+    connection = headers.get("connection", "")
+    keep_alive = connection != "close" and (
+        version == "HTTP/1.1" or connection == "keep-alive"
+    )
+    return int(status), keep_alive
+
+
+async def _client(
+    port: int,
+    paths: Sequence[str],
+    offset: int,
+    measure_from: float,
+    stop_at: float,
+    latencies: Dict[str, List[float]],
+    errors: Counter,
+) -> None:
+    """One connection's worth of back-to-back requests"""
+    reader = writer = None
+    index = offset
+    delay = RECONNECT_DELAY
+    while True:
+        now = time.perf_counter()
+        if now >= stop_at:
+            break
+        path = paths[index % len(paths)]
+        index += 1
+        start = now
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(HOST, port)
+                start = time.perf_counter()
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: {HOST}:{port}\r\n"
+                "Accept-Encoding: gzip\r\nConnection: keep-alive\r\n\r\n".encode()
+            )
+            status, keep_alive = await asyncio.wait_for(
+                _read_response(reader), REQUEST_TIMEOUT
+            )
+            elapsed = time.perf_counter() - start
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+            if start >= measure_from:
+                errors[path] += 1
+            writer = _close(writer)
+            await asyncio.sleep(min(delay, max(0.0, stop_at - time.perf_counter())))
+            delay = min(2 * delay, RECONNECT_MAX_DELAY)
+            continue
+        delay = RECONNECT_DELAY
+        if start >= measure_from:
+            if 200 <= status < 400:
+                latencies[path].append(elapsed)
+            else:
+                errors[path] += 1
+        if not keep_alive:
+            writer = _close(writer)
+    _close(writer)
+
+
+def _close(writer: Optional[asyncio.StreamWriter]) -> None:
+    if writer is not None:
+        writer.close()
+    return None
+
+
+async def _load(
+    port: int, paths: Sequence[str], concurrency: int, duration: float, warmup: float
+):
+    latencies: Dict[str, List[float]] = {path: [] for path in paths}
+    errors: Counter = Counter()
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + duration
+    await asyncio.gather(
+        *(
+            _client(port, paths, n, measure_from, stop_at, latencies, errors)
+            for n in range(concurrency)
+        )
+    )
+    return latencies, errors
+
+
+def _stats(latencies: List[float], errors: int, seconds: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "requests_per_second": round(len(ordered) / seconds, 1),
+        "mean_ms": round(1000 * sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        **{
+            f"p{q}_ms": round(1000 * percentile(ordered, q / 100), 2)
+            for q in (50, 95, 99)
+        },
+    }
+
+
+def load(
+    port: int,
+    paths: Sequence[str],
+    concurrency: int = 10,
+    duration: float = 10.0,
+    warmup: float = 1.0,
+) -> dict:
+    """Drive a server on localhost and summarize each path and the total"""
+    latencies, errors = asyncio.run(_load(port, paths, concurrency, duration, warmup))
+    results = {path: _stats(latencies[path], errors[path], duration) for path in paths}
+    results["total"] = _stats(
+        [value for path in paths for value in latencies[path]],
+        sum(errors.values()),
+        duration,
+    )
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def _production_command(project_dir: Path, port: int) -> Optional[List[str]]:
+    if not (project_dir / "gunicorn.conf.py").is_file():
+        return None
+    if not _venv_executable(venv_dir(project_dir), "gunicorn").exists():
+        return None
+    return [
+        _python(project_dir),
+        "-m",
+        "gunicorn",
+        "-c",
+        "gunicorn.conf.py",
+        "--bind",
+        f"{HOST}:{port}",
+    ]
+
+
+def server_for(project_dir: Path, framework: str, port: int, server: str):
+    """The command that serves the app, and which kind of server it is"""
+    if server in ("auto", "production"):
+        command = _production_command(project_dir, port)
+        if command:
+            return command, "production"
+        if server == "production":
+            raise BenchError(
+                "No production server: create the project with --profile production"
+            )
+    # The dev server without its reloader or debugger, which would skew results
+    command = server_command(project_dir, framework, port)
+    return [arg for arg in command if arg not in ("--debug", "--reload")], "dev"
+
+
+def _wait_until_ready(process: subprocess.Popen, port: int) -> str:
+    """The page, once the server answers"""
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://{HOST}:{port}/", timeout=2) as page:
+                return page.read().decode("utf-8", errors="replace")
+        except OSError:
+            if process.poll() is not None:
+                raise BenchError(f"The server exited with status {process.returncode}")
+            if time.monotonic() > deadline:
+                raise BenchError(
+                    f"The server did not answer within {STARTUP_TIMEOUT:g}s"
+                )
+            time.sleep(0.1)
+
+
+def stylesheet_path(page: str) -> str:
+    """The first stylesheet the page links, or the default build output"""
+    match = _STYLESHEET.search(page)
+    if match:
+        return re.sub(r"^https?://[^/]+", "", match.group(1))
+    return "/" + OUTPUT_CSS.as_posix()
+
+
+def run(
+    project_dir: Path,
+    concurrency: int = 10,
+    duration: float = 10.0,
+    warmup: float = 1.0,
+    server: str = "auto",
+    port: Optional[int] = None,
+) -> dict:
+    """Start the project's server, load it and return the results"""
+    project_dir = Path(project_dir).resolve()
+    framework = detect_framework(project_dir)
+    port = port or free_port()
+    command, kind = server_for(project_dir, framework, port, server)
+    process = subprocess.Popen(
+        command,
+        cwd=project_dir,
+        env=dict(os.environ, PYTHONUNBUFFERED="1"),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        page = _wait_until_ready(process, port)
+        paths = ["/", stylesheet_path(page)]
+        results = load(port, paths, concurrency, duration, warmup)
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    return {
+        "project": project_dir.name,
+        "framework": framework,
+        "server": kind,
+        "concurrency": concurrency,
+        "duration": duration,
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+
+
+def results_table(report: dict) -> Table:
+    table = Table(
+        title=f"{report['project']} ({report['framework']}, {report['server']} "
+        f"server, {report['concurrency']} connections, {report['duration']:g}s)"
+    )
+    table.add_column("Path")
+    for column in ("Requests", "Errors", "Req/s", "p50 ms", "p95 ms", "p99 ms"):
+        table.add_column(column, justify="right")
+    for path, stats in report["results"].items():
+        table.add_row(
+            path,
+            str(stats["requests"]),
+            str(stats["errors"]),
+            f"{stats['requests_per_second']:.1f}",
+            f"{stats['p50_ms']:.2f}",
+            f"{stats['p95_ms']:.2f}",
+            f"{stats['p99_ms']:.2f}",
+            style="bold" if path == "total" else None,
+        )
+    return table
+
+
+def write_results(report: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
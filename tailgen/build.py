@@ -0,0 +1,306 @@
+"""Build a project's CSS, skipping the build when nothing it reads changed.
+
+Tailwind scans every file matched by the ``content`` globs of
+``tailwind.config.js`` on each run. ``tailgen build`` hashes those files
+together with the config and ``input.css``; when the hash matches the one
+recorded after the last successful build and the output is still there,
+Tailwind is not started at all.
+
+The built CSS is also copied to a name that carries a hash of its content,
+``output.<hash>.css``, and ``static/dist/manifest.json`` maps the logical
+name to it. The generated apps look assets up in the manifest, so the
+fingerprinted files can be cached forever: a new build gets a new name.
+The project's own build scripts (``npm run build``, ``build_css.sh``) only
+run Tailwind, so they remove the manifest and the app falls back to the
+plain ``output.css``.
+
+Finally every file under ``static/dist`` gets a gzip sibling, ``.gz``, and a
+brotli one, ``.br``, when the ``brotli`` package is installed. The generated
+apps send those to clients that accept them instead of compressing the same
+bytes on every request.
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from tailgen import output
+from tailgen.process import run_process
+
+try:
+    import brotli
+except ImportError:  # optional: pip install tailgen[brotli]
+    brotli = None
+
+INPUT_CSS = Path("static") / "src" / "input.css"
+OUTPUT_CSS = Path("static") / "dist" / "css" / "output.css"
+CONFIG_FILE = "tailwind.config.js"
+STATE_PATH = Path(".tailgen") / "build.json"
+STATIC_DIR = Path("static")
+DIST_DIR = STATIC_DIR / "dist"
+MANIFEST = DIST_DIR / "manifest.json"
+FINGERPRINT_LENGTH = 12
+NPX_EXECUTABLE = "C:\\Program Files\\nodejs\\npx.cmd" if os.name == "nt" else "npx"
+
+_CONTENT = re.compile(r"\bcontent\s*:\s*(?:\{[^}]*?\bfiles\s*:\s*)?\[(.*?)\]", re.S)
+_STRING = re.compile(r"""(["'`])(.*?)(?<!\\)\1""", re.S)
+_BRACES = re.compile(r"\{([^{}]*)\}")
+_FINGERPRINT = re.compile(rf"\.[0-9a-f]{{{FINGERPRINT_LENGTH}}}\.css")
+
+
+class BuildError(RuntimeError):
+    """Raised when a project's CSS cannot be built"""
+
+
+class BuildResult(NamedTuple):
+    built: bool
+    digest: Optional[str]
+
+
+def content_globs(config: str) -> Optional[List[str]]:
+    """The ``content`` globs of a Tailwind config, None if they can't be read.
+
+    Only literal strings are understood; a config that computes its globs
+    makes every build run.
+    """
+    match = _CONTENT.search(config)
+    if not match:
+        return None
+    globs = [literal for _, literal in _STRING.findall(match.group(1))]
+    return globs or None
+
+
+def _expand_braces(pattern: str) -> List[str]:
+    """``a.{html,js}`` -> ``a.html``, ``a.js``; the glob module has no braces"""
+    match = _BRACES.search(pattern)
+    if not match:
+        return [pattern]
+    head, tail = pattern[: match.start()], pattern[match.end() :]
+    return [
+        expanded
+        for option in match.group(1).split(",")
+        for expanded in _expand_braces(head + option + tail)
+    ]
+
+
+def _matches(project_dir: Path, pattern: str) -> set:
+    paths = set()
+    for expanded in _expand_braces(pattern):
+        full = os.path.join(project_dir, expanded)
+        paths.update(
+            Path(path).resolve()
+            for path in glob.glob(full, recursive=True)
+            if os.path.isfile(path)
+        )
+    return paths
+
+
+def input_files(project_dir: Path, globs: List[str]) -> List[Path]:
+    """Every file a build of a resolved project directory reads, in order"""
+    included, excluded = set(), set()
+    for pattern in globs:
+        if pattern.startswith("!"):
+            excluded |= _matches(project_dir, pattern[1:])
+        else:
+            included |= _matches(project_dir, pattern)
+    files = {project_dir / CONFIG_FILE, project_dir / INPUT_CSS}
+    files |= included - excluded
+    return sorted(files)
+
+
+def content_digest(project_dir: Path, files: List[Path], command: List[str]) -> str:
+    """Hash of the files' paths and contents and of the Tailwind command.
+
+    The command counts by the name of its executable, so the same project
+    in another directory or on another machine hashes the same.
+    """
+    key = [Path(command[0]).name, *command[1:]]
+    digest = hashlib.sha256(json.dumps(key).encode("utf-8"))
+    for path in files:
+        try:
+            relative = path.relative_to(project_dir)
+        except ValueError:
+            relative = path
+        digest.update(f"\0{relative.as_posix()}\0".encode("utf-8"))
+        try:
+            with open(path, "rb") as file:
+                for block in iter(lambda: file.read(1024 * 1024), b""):
+                    digest.update(block)
+        except FileNotFoundError:
+            digest.update(b"\0missing")
+    return digest.hexdigest()
+
+
+def tailwind_command(project_dir: Path) -> List[str]:
+    """The Tailwind CLI this project was set up with"""
+    from tailgen.standalone import PROJECT_BINARY
+
+    local = Path("node_modules") / ".bin" / "tailwindcss"
+    if os.name == "nt":
+        local = local.with_suffix(".cmd")
+    for executable in (PROJECT_BINARY, local):
+        if (project_dir / executable).exists():
+            return [str(project_dir / executable)]
+    return [NPX_EXECUTABLE, "tailwindcss"]
+
+
+def _read_state(project_dir: Path) -> dict:
+    try:
+        state = json.loads((project_dir / STATE_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _write_state(project_dir: Path, digest: str) -> None:
+    path = project_dir / STATE_PATH
+    path.parent.mkdir(exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}")
+    temporary.write_text(json.dumps({"digest": digest}, indent=2), encoding="utf-8")
+    os.replace(temporary, path)
+
+
+def _fingerprinted(path: Path, data: bytes) -> Path:
+    digest = hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]
+    return path.with_name(f"{path.stem}.{digest}{path.suffix}")
+
+
+def fingerprint_assets(project_dir: Path) -> Dict[str, str]:
+    """Copy the built CSS to its fingerprinted name and update the manifest.
+
+    Returns the manifest: logical names to fingerprinted names, both
+    relative to ``static/`` as ``url_for`` takes them. Fingerprinted copies
+    of earlier builds are removed.
+    """
+    css = project_dir / OUTPUT_CSS
+    data = css.read_bytes()
+    fingerprinted = _fingerprinted(css, data)
+    if not fingerprinted.is_file():
+        temporary = fingerprinted.with_name(f".{fingerprinted.name}.{os.getpid()}")
+        temporary.write_bytes(data)
+        os.replace(temporary, fingerprinted)
+    for stale in css.parent.glob(f"{css.stem}.*{css.suffix}"):
+        if stale != fingerprinted and _FINGERPRINT.fullmatch(
+            stale.name[len(css.stem) :]
+        ):
+            stale.unlink()
+
+    static = project_dir / STATIC_DIR
+    manifest = {
+        css.relative_to(static).as_posix(): fingerprinted.relative_to(static).as_posix()
+    }
+    path = project_dir / MANIFEST
+    if _read_manifest(path) != manifest:
+        temporary = path.with_name(f".{path.name}.{os.getpid()}")
+        temporary.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+        os.replace(temporary, path)
+    return manifest
+
+
+def _read_manifest(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _compressors():
+    compressors = {".gz": lambda data: gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        compressors[".br"] = lambda data: brotli.compress(data, quality=11)
+    return compressors
+
+
+def precompress(project_dir: Path) -> List[Path]:
+    """Write compressed siblings of the files in static/dist.
+
+    Siblings newer than their file are kept; a sibling is only written when
+    it is smaller than the file, and siblings of removed files are deleted.
+    Returns the siblings written.
+    """
+    compressors = _compressors()
+    suffixes = (".gz", ".br")
+    written = []
+    for path in sorted((project_dir / DIST_DIR).rglob("*")):
+        if not path.is_file() or path.name.startswith("."):
+            continue
+        if path.suffix in suffixes:
+            if not path.with_suffix("").is_file():
+                path.unlink()
+            continue
+        data = None
+        for suffix in suffixes:
+            sibling = path.with_name(path.name + suffix)
+            if (
+                sibling.is_file()
+                and sibling.stat().st_mtime_ns >= path.stat().st_mtime_ns
+            ):
+                continue
+            compress = compressors.get(suffix)
+            if compress is None:
+                # Left by a build that had brotli; it would serve stale bytes
+                sibling.unlink(missing_ok=True)
+                continue
+            data = path.read_bytes() if data is None else data
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                sibling.unlink(missing_ok=True)
+                continue
+            temporary = sibling.with_name(f".{sibling.name}.{os.getpid()}")
+            temporary.write_bytes(compressed)
+            os.replace(temporary, sibling)
+            written.append(sibling)
+    return written
+
+
+def compile_css(project_dir: Path, minify: bool = True, force: bool = False):
+    """Run Tailwind into output.css, unless nothing it reads changed since last time"""
+    project_dir = Path(project_dir).resolve()
+    config = project_dir / CONFIG_FILE
+    if not config.is_file():
+        raise BuildError(f"{project_dir} has no {CONFIG_FILE}")
+    if not (project_dir / INPUT_CSS).is_file():
+        raise BuildError(f"{project_dir} has no {INPUT_CSS.as_posix()}")
+
+    command = [
+        *tailwind_command(project_dir),
+        "-i",
+        f"./{INPUT_CSS.as_posix()}",
+        "-o",
+        f"./{OUTPUT_CSS.as_posix()}",
+    ]
+    if minify:
+        command.append("--minify")
+
+    globs = content_globs(config.read_text(encoding="utf-8"))
+    digest = None
+    if globs is None:
+        output.detail(f"Could not read the content globs of {config}, building")
+    else:
+        digest = content_digest(project_dir, input_files(project_dir, globs), command)
+        if (
+            not force
+            and (project_dir / OUTPUT_CSS).is_file()
+            and _read_state(project_dir).get("digest") == digest
+        ):
+            return BuildResult(False, digest)
+
+    run_process(
+        command, cwd=project_dir, on_stdout=output.detail, on_stderr=output.detail
+    )
+    if digest is not None:
+        _write_state(project_dir, digest)
+    return BuildResult(True, digest)
+
+
+def build_css(project_dir: Path, minify: bool = True, force: bool = False):
+    """Build the project's output.css unless it is already up to date"""
+    result = compile_css(project_dir, minify, force)
+    fingerprint_assets(Path(project_dir).resolve())
+    precompress(Path(project_dir).resolve())
+    return result
@@ -0,0 +1,177 @@
+"""On-disk cache shared by every tailgen run on this machine"""
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Any
+
+from tailgen import __app_name__
+
+CACHE_DIR_ENV = "TAILGEN_CACHE_DIR"
+
+# Errors meaning "this filesystem cannot do that", as opposed to a real failure
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+    errno.EMLINK,
+}
+
+# ioctl request that clones a file's extents on Linux (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+
+def cache_dir() -> Path:
+    """Root of the tailgen cache, ``$TAILGEN_CACHE_DIR`` if set"""
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV]).expanduser()
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+    return Path(base) / __app_name__
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable short hash of JSON-serialisable parts"""
+    data = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+class FileLock:
+    """Exclusive lock on a file, held across processes for the ``with`` block"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = None
+
+    def __enter__(self) -> "FileLock":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+b")
+        if os.name == "nt":
+            import msvcrt
+
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ten seconds
+                    continue
+        else:
+            import fcntl
+
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if os.name == "nt":
+            import msvcrt
+
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+def _reflink(source: Path, destination: Path) -> None:
+    """Copy-on-write clone of a file, or OSError if the filesystem can't"""
+    if sys.platform == "darwin":
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(source), os.fsencode(destination), 0) != 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), str(destination))
+        return
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported", str(source))
+
+    import fcntl
+
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.unlink(destination)
+            raise
+    shutil.copystat(source, destination)
+
+
+class _Cloner:
+    """Clone files with the cheapest method the filesystem supports.
+
+    Tries a copy-on-write reflink, then a hardlink, then a plain copy,
+    remembering which methods failed so each is only attempted once.
+    """
+
+    def __init__(self, allow_hardlinks: bool = True):
+        self.reflink = True
+        self.hardlink = allow_hardlinks
+
+    def clone(self, source: Path, destination: Path) -> None:
+        if self.reflink:
+            try:
+                return _reflink(source, destination)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                self.reflink = False
+        if self.hardlink:
+            try:
+                return os.link(source, destination)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                self.hardlink = False
+        shutil.copy2(source, destination)
+
+
+def clone_tree(source: Path, destination: Path, allow_hardlinks: bool = True) -> None:
+    """Recreate a directory tree, sharing file data with the source if possible.
+
+    With hardlinks, files in the clone are the same inodes as the source:
+    callers must replace, never modify in place, any file they change.
+    Symlinks are copied as symlinks.
+    """
+    cloner = _Cloner(allow_hardlinks)
+    source = Path(source)
+    destination = Path(destination)
+    destination.mkdir(parents=True, exist_ok=True)
+    for root, dirs, files in os.walk(source):
+        relative = Path(root).relative_to(source)
+        target_root = destination / relative
+        for name in dirs:
+            path = Path(root) / name
+            if path.is_symlink():
+                os.symlink(os.readlink(path), target_root / name)
+            else:
+                (target_root / name).mkdir(exist_ok=True)
+        for name in files:
+            path = Path(root) / name
+            if path.is_symlink():
+                os.symlink(os.readlink(path), target_root / name)
+            else:
+                cloner.clone(path, target_root / name)
+
+
+def replace_file(path: Path, data: bytes) -> None:
+    """Write a file without touching the inode it may share with the cache"""
+    temporary = path.with_name(f".{path.name}.tailgen-tmp")
+    temporary.write_bytes(data)
+    shutil.copymode(path, temporary)
+    os.replace(temporary, path)
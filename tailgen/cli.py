@@ -1,25 +1,68 @@
+import importlib
 import typer
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, List, Optional
 from pathlib import Path
-from time import sleep
 
-from tailgen import __app_name__, __version__, VALID_FRAMEWORKS, DELAY_DURATION
-from tailgen.flask_app import _create_flask_project, _install_and_configure_tailwindcss
-from tailgen.fastapi_app import (
-    _create_fastapi_project,
-    _install_and_configure_tailwindcss_fastapi,
+from tailgen import (
+    __app_name__,
+    __version__,
+    BENCH_SERVERS,
+    PROFILES,
+    STANDALONE_TAILWIND_VERSION,
+    TAILWIND_MODES,
+    VALID_FRAMEWORKS,
+    output,
+    timing,
 )
-from tailgen.helpers import (
-    _create_git_ignore,
-    _create_readme,
-    _create_venv,
-    _git_init,
-    _init_project_directory,
-    setup_complete,
-    update_package_json_with_build_script,
+from tailgen.settings import configure, get_settings
+
+if TYPE_CHECKING:
+    from tailgen.batch import ProjectSpec
+    from tailgen.scheduler import Stage
+
+
+def _lazy(module: str, name: str) -> Callable[..., Any]:
+    """Stand-in for ``module.name`` that imports the module on first call.
+
+    Keeps ``tailgen --help`` and friends from importing the framework
+    generators, the package store and the rest of the scaffold up front.
+    """
+
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    return call
+
+
+_create_flask_project = _lazy("tailgen.flask_app", "_create_flask_project")
+_install_and_configure_tailwindcss = _lazy(
+    "tailgen.flask_app", "_install_and_configure_tailwindcss"
+)
+_create_fastapi_project = _lazy("tailgen.fastapi_app", "_create_fastapi_project")
+_install_and_configure_tailwindcss_fastapi = _lazy(
+    "tailgen.fastapi_app", "_install_and_configure_tailwindcss_fastapi"
 )
+_create_venv = _lazy("tailgen.environments", "_create_venv")
+_create_git_ignore = _lazy("tailgen.helpers", "_create_git_ignore")
+_create_readme = _lazy("tailgen.helpers", "_create_readme")
+_git_init = _lazy("tailgen.helpers", "_git_init")
+_git_commit = _lazy("tailgen.helpers", "_git_commit")
+_init_project_directory = _lazy("tailgen.helpers", "_init_project_directory")
+setup_complete = _lazy("tailgen.helpers", "setup_complete")
+update_package_json_with_build_script = _lazy(
+    "tailgen.helpers", "update_package_json_with_build_script"
+)
+_write_build_script = _lazy("tailgen.standalone", "write_build_script")
+_create_production_profile = _lazy("tailgen.production", "_create_production_profile")
 
 app = typer.Typer()
+cache_app = typer.Typer(help="Manage the local cache of dependencies.")
+app.add_typer(cache_app, name="cache")
+workspace_app = typer.Typer(
+    help="Manage workspaces: services sharing one venv and Tailwind build."
+)
+app.add_typer(workspace_app, name="workspace")
 
 
 def _version_callback(value: bool) -> None:
@@ -36,6 +79,313 @@ def _valid_framework(value: str):
     return value.lower()
 
 
+def _valid_tailwind_mode(value: str):
+    if value.lower() not in TAILWIND_MODES:
+        raise typer.BadParameter(
+            f"Tailwind mode must be either 'npm' or 'standalone', not {value}."
+        )
+    return value.lower()
+
+
+def _valid_profile(value: str):
+    if value.lower() not in PROFILES:
+        raise typer.BadParameter(
+            f"Profile must be either 'development' or 'production', not {value}."
+        )
+    return value.lower()
+
+
+def _valid_bench_server(value: str):
+    if value.lower() not in BENCH_SERVERS:
+        raise typer.BadParameter(
+            f"Server must be 'auto', 'dev' or 'production', not {value}."
+        )
+    return value.lower()
+
+
+def _valid_frameworks(values: Optional[List[str]]):
+    return [_valid_framework(value) for value in values or []]
+
+
+def _project_stages(project_dir_path: Path, framework: str) -> List["Stage"]:
+    """The stages that scaffold a project into an existing directory.
+
+    Each stage is checkpointed in the project's journal, so running them
+    again over a half-finished project only redoes what is missing.
+    """
+    from tailgen.journal import Journal
+    from tailgen.scheduler import Stage
+
+    if framework == "flask":
+        from tailgen import flask_app as framework_module
+
+        create_project = _create_flask_project
+        install_tailwindcss = _install_and_configure_tailwindcss
+    elif framework == "fastapi":
+        from tailgen import fastapi_app as framework_module
+
+        create_project = _create_fastapi_project
+        install_tailwindcss = _install_and_configure_tailwindcss_fastapi
+    else:
+        raise ValueError("Invalid framework selected.")
+
+    # Files whose presence shows a checkpointed stage is still done
+    outputs = {
+        "venv": ("venv/pyvenv.cfg",),
+        "gitignore": (".gitignore",),
+        "readme": ("README.md",),
+        "git": (".git/HEAD",),
+        framework: tuple(framework_module.APP_FILES),
+        "tailwindcss": (
+            *framework_module.TAILWIND_FILES,
+            "static/src/input.css",
+            "node_modules/tailwindcss/package.json",
+        ),
+        "package_json": ("package.json",),
+    }
+    if get_settings().tailwind == "standalone":
+        from tailgen.standalone import BUILD_SCRIPT, PROJECT_BINARY
+
+        outputs["tailwindcss"] = outputs["tailwindcss"][:-1] + (str(PROJECT_BINARY),)
+        build_stage = Stage(
+            "build_script",
+            _write_build_script,
+            (project_dir_path,),
+            requires=("tailwindcss",),
+        )
+        outputs["build_script"] = (BUILD_SCRIPT,)
+    else:
+        build_stage = Stage(
+            "package_json",
+            update_package_json_with_build_script,
+            (project_dir_path,),
+            requires=("tailwindcss",),
+        )
+
+    # The Python side (venv, then framework install) and the Tailwind side
+    # (npm install or the standalone CLI, then the build script) only meet at
+    # the end, so they run side by side instead of one after the other.
+    stages = [
+        Stage(
+            "venv",
+            _create_venv,
+            (
+                (project_dir_path, framework)
+                if get_settings().use_cache
+                else (project_dir_path,)
+            ),
+            description="Create virtual environment",
+        ),
+        Stage(
+            "gitignore",
+            _create_git_ignore,
+            (project_dir_path,),
+            description="Creating .gitignore file",
+        ),
+        Stage(
+            "readme",
+            _create_readme,
+            (project_dir_path,),
+            description="Creating README.md file",
+        ),
+        Stage("git", _git_init, (project_dir_path,), description="Initializing Git"),
+        Stage(framework, create_project, (project_dir_path,), requires=("venv",)),
+        Stage("tailwindcss", install_tailwindcss, (project_dir_path,)),
+        build_stage,
+    ]
+    if get_settings().profile == "production":
+        stages.append(
+            Stage(
+                "production",
+                _create_production_profile,
+                (project_dir_path, framework),
+                requires=(framework,),
+            )
+        )
+        outputs["production"] = tuple(framework_module.PRODUCTION_FILES)
+    if get_settings().commit:
+        from tailgen.lock import PROJECT_LOCK_NAME
+
+        # What the stages generated, leaving out the ignored venv,
+        # node_modules and Tailwind binary
+        generated = [
+            *outputs["gitignore"],
+            *outputs["readme"],
+            *outputs[framework],
+            PROJECT_LOCK_NAME,
+            *outputs["tailwindcss"][:-1],
+            *outputs[build_stage.name],
+            "package-lock.json",
+            *outputs.get("production", ()),
+        ]
+        stages.append(
+            Stage(
+                "commit",
+                _git_commit,
+                (project_dir_path, generated),
+                requires=tuple(stage.name for stage in stages),
+            )
+        )
+        outputs["commit"] = (".git/index",)
+    journal = Journal(project_dir_path, framework)
+    return [
+        stage._replace(
+            func=journal.step(
+                stage.name, stage.func, outputs[stage.name], stage.requires
+            )
+        )
+        for stage in stages
+    ]
+
+
+def _service_stages(root: Path, service_dir: Path, framework: str) -> List["Stage"]:
+    """The stages that add a service to a workspace.
+
+    The workspace already has the venv and Tailwind, so unless the service
+    is the first of its framework, only the service's own files are written.
+    """
+    from tailgen import workspace
+    from tailgen.journal import Journal
+    from tailgen.scheduler import Stage
+
+    framework_module = importlib.import_module(f"tailgen.{framework}_app")
+    outputs = {
+        "venv": (),
+        "readme": ("README.md",),
+        framework: tuple(framework_module.APP_FILES),
+        "register": (),
+    }
+    stages = [
+        Stage("venv", workspace.install_framework, (root, framework)),
+        Stage(
+            "readme",
+            _create_readme,
+            (service_dir,),
+            description="Creating README.md file",
+        ),
+        Stage(
+            framework,
+            workspace.create_service,
+            (service_dir, framework),
+            requires=("venv",),
+        ),
+    ]
+    if get_settings().profile == "production":
+        stages.append(
+            Stage(
+                "production",
+                workspace.create_production_profile,
+                (root, service_dir, framework),
+                requires=(framework,),
+            )
+        )
+        outputs["production"] = tuple(framework_module.PRODUCTION_FILES)
+    # Last, so a service the workspace lists is always complete
+    stages.append(
+        Stage(
+            "register",
+            workspace.add_service,
+            (root, service_dir.name, framework),
+            requires=tuple(stage.name for stage in stages),
+        )
+    )
+    journal = Journal(service_dir, framework)
+    return [
+        stage._replace(
+            func=journal.step(
+                stage.name, stage.func, outputs[stage.name], stage.requires
+            )
+        )
+        for stage in stages
+    ]
+
+
+def _generate_project(spec: "ProjectSpec") -> None:
+    """Scaffold one project of a batch; runs in a worker process"""
+    from tailgen.scheduler import run_stages
+
+    project_dir_path = _init_project_directory(spec.output_dir, spec.name)
+    run_stages(_project_stages(project_dir_path, spec.framework))
+
+
+def _report_timings(recorder, timings: bool, trace: Optional[Path]) -> None:
+    if timings:
+        from rich.console import Console
+
+        Console().print(timing.timings_table(recorder))
+    if trace:
+        recorder.write_trace(trace)
+        output.step(f"Trace written to {trace}")
+
+
+def _init_project(
+    framework: str,
+    project_name: str,
+    output_dir: str,
+    timings: bool,
+    trace: Optional[Path],
+    workspace: Optional[str] = None,
+) -> None:
+    """Scaffold a project with the current settings; raises typer.Exit on failure
+
+    With ``workspace``, the project is a service of that workspace and
+    ``output_dir`` is not used.
+    """
+    build_command = "tailgen build"
+    if workspace is not None:
+        from tailgen.workspace import WorkspaceError, require
+
+        root = Path(workspace).expanduser().resolve()
+        try:
+            manifest = require(root)
+        except WorkspaceError as e:
+            output.error(str(e))
+            raise typer.Exit(code=1)
+        # Every service uses the Tailwind the workspace was set up with
+        configure(**{**get_settings()._asdict(), "tailwind": manifest["tailwind"]})
+        build_command = f"tailgen build {workspace}"
+
+    recorder = timing.Recorder() if timings or trace else None
+    try:
+        with timing.recording(recorder), timing.span("init", framework=framework):
+            output.step(
+                f"Initializing {framework} project named {project_name} with the latest Tailwind CSS version."
+            )
+
+            output.step("Creating project directory")
+            if workspace is not None:
+                project_path = root
+            elif output_dir:
+                project_path = Path(output_dir).expanduser().resolve()
+            else:
+                project_path = Path.cwd()
+
+            with timing.span("project_directory"):
+                project_dir_path = _init_project_directory(project_path, project_name)
+
+            from tailgen.scheduler import StageError, run_stages
+
+            if workspace is not None:
+                stages = _service_stages(root, project_dir_path, framework)
+            else:
+                stages = _project_stages(project_dir_path, framework)
+            try:
+                run_stages(stages)
+            except StageError as error:
+                for name, exc in error.failures:
+                    output.error(f"Stage '{name}' failed: {exc}")
+                if error.skipped:
+                    output.error(
+                        f"Skipped because of the failures above: {', '.join(error.skipped)}"
+                    )
+                raise typer.Exit(code=1)
+    finally:
+        if recorder is not None:
+            _report_timings(recorder, timings, trace)
+
+    setup_complete(framework, build_command)
+
+
 @app.callback()
 def main(
     version: Optional[bool] = typer.Option(
@@ -65,58 +415,490 @@ def init(
         "-o",
         help="Directory where the project will be initialized",
     ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Build the virtual environment and node_modules from scratch instead of from tailgen's caches.",
+    ),
+    offline: bool = typer.Option(
+        False,
+        "--offline",
+        help="Install dependencies only from the local caches (see 'tailgen cache warm').",
+    ),
+    pace: bool = typer.Option(
+        False,
+        "--pace",
+        help="Pause briefly after each step so the output can be followed.",
+    ),
+    timings: bool = typer.Option(
+        False,
+        "--timings",
+        help="Show how long each step took.",
+    ),
+    trace: Optional[Path] = typer.Option(
+        None,
+        "--trace",
+        help="Write a Chrome/Perfetto trace of the steps to this file.",
+        dir_okay=False,
+    ),
+    tailwind: str = typer.Option(
+        "npm",
+        "--tailwind",
+        help="Install Tailwind with npm, or use the standalone CLI binary (no Node needed).",
+        callback=_valid_tailwind_mode,
+    ),
+    profile: str = typer.Option(
+        "development",
+        "--profile",
+        help="'production' also writes a gunicorn config and a WSGI/ASGI entry point.",
+        callback=_valid_profile,
+    ),
+    commit: bool = typer.Option(
+        False,
+        "--commit",
+        help="Commit the generated files as the repository's first commit.",
+    ),
+    git_cli: bool = typer.Option(
+        False,
+        "--git-cli",
+        help="Run the git command instead of writing the repository directly.",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Finish an interrupted init of the project in --output-dir, redoing only the steps that did not complete.",
+    ),
+    workspace: Optional[str] = typer.Option(
+        None,
+        "--workspace",
+        help="Add the project as a service of this workspace (see 'tailgen workspace init').",
+    ),
 ) -> None:
     """Initialize a new Flask or FastAPI project with Tailwind CSS integration."""
+    configure(
+        pace=pace,
+        offline=offline,
+        use_cache=not no_cache,
+        tailwind=tailwind,
+        profile=profile,
+        commit=commit,
+        git_cli=git_cli,
+    )
+    if workspace is not None and (commit or output_dir not in (".", "")):
+        # A service lives in the workspace and is committed with its repository
+        output.error("--workspace cannot be combined with --commit or --output-dir")
+        raise typer.Exit(code=1)
+
+    if resume:
+        from tailgen.journal import read_journal
+
+        project_dir_path = Path(output_dir or ".").expanduser().resolve()
+        journal = read_journal(project_dir_path)
+        if journal is None:
+            output.error(
+                f"No interrupted tailgen project to resume in {project_dir_path}"
+            )
+            raise typer.Exit(code=1)
+        framework = journal["framework"]
+        configure(
+            **{
+                **get_settings()._asdict(),
+                "tailwind": journal.get("tailwind", "npm"),
+                "profile": journal.get("profile", "development"),
+                "commit": journal.get("commit", False),
+            }
+        )
+        project_name = project_dir_path.name
+        output_dir = str(project_dir_path.parent)
+        from tailgen.workspace import read_manifest
+
+        if read_manifest(project_dir_path.parent) is not None:
+            workspace = output_dir
+        prefetch = None
+    else:
+        from tailgen.client import DEFAULT_PROJECT_NAME, PROMPT
+        from tailgen.prefetch import start as start_prefetch
 
-    project_name: str = typer.prompt(
-        "Provide a project name\n(Name of the project to initialize. Press enter to use default.)",
-        default="new_project",
+        # Fill the caches the stages will read while the name is being typed
+        prefetch = start_prefetch(framework)
+        try:
+            project_name: str = typer.prompt(PROMPT, default=DEFAULT_PROJECT_NAME)
+        except BaseException:
+            if prefetch is not None:
+                prefetch.stop()
+            raise
+
+    try:
+        _init_project(framework, project_name, output_dir, timings, trace, workspace)
+    finally:
+        if prefetch is not None:
+            prefetch.stop()
+
+
+@app.command()
+def build(
+    project_dirs: Optional[List[Path]] = typer.Argument(
+        None,
+        help="Projects to build (default: the current directory).",
+        exists=True,
+        file_okay=False,
+    ),
+    minify: bool = typer.Option(
+        True, "--minify/--no-minify", help="Minify the generated CSS."
+    ),
+    force: bool = typer.Option(
+        False, "--force", help="Build even if nothing changed since the last build."
+    ),
+) -> None:
+    """Build the CSS of a project, unless its templates and config are unchanged.
+
+    A workspace, or any of its services, is built as a whole.
+    """
+    from tailgen import workspace
+    from tailgen.build import OUTPUT_CSS, BuildError, build_css
+    from tailgen.process import ProcessError, ProcessTimeout
+
+    failed = False
+    built_roots = set()
+    for project_dir in project_dirs or [Path.cwd()]:
+        root = workspace.find_root(project_dir)
+        if root in built_roots:
+            continue
+        try:
+            if root is None:
+                built = {project_dir: build_css(project_dir, minify, force).built}
+            else:
+                built_roots.add(root)
+                built = workspace.build(root, minify, force)
+        except (
+            BuildError,
+            ProcessError,
+            ProcessTimeout,
+            workspace.WorkspaceError,
+        ) as e:
+            output.error(f"Failed to build {root or project_dir}: {e}")
+            failed = True
+            continue
+        for built_dir, rewritten in built.items():
+            if rewritten:
+                output.step(f"Built {built_dir / OUTPUT_CSS}")
+            else:
+                output.step(f"{built_dir / OUTPUT_CSS} is up to date")
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def dev(
+    project_dir: Path = typer.Argument(
+        Path("."),
+        help="Project to run (default: the current directory).",
+        exists=True,
+        file_okay=False,
+    ),
+    port: Optional[int] = typer.Option(
+        None,
+        "--port",
+        "-p",
+        help="Port of the app server (default: 5000 for Flask, 8000 for FastAPI).",
+    ),
+    livereload_port: int = typer.Option(
+        35729, "--livereload-port", help="Port the browser gets reload events from."
+    ),
+) -> None:
+    """Run Tailwind in watch mode and the app server, reloading the browser on changes."""
+    from tailgen.dev import DevError, run
+
+    try:
+        run(project_dir, port, livereload_port)
+    except DevError as e:
+        output.error(str(e))
+        raise typer.Exit(code=1)
+    except KeyboardInterrupt:
+        output.step("Stopped.")
+
+
+@app.command()
+def bench(
+    project_dir: Path = typer.Argument(
+        Path("."),
+        help="Project to benchmark (default: the current directory).",
+        exists=True,
+        file_okay=False,
+    ),
+    concurrency: int = typer.Option(
+        10, "--concurrency", "-c", min=1, help="Connections kept busy at once."
+    ),
+    duration: float = typer.Option(
+        10.0, "--duration", "-d", min=0.1, help="Seconds to measure for."
+    ),
+    warmup: float = typer.Option(
+        1.0, "--warmup", min=0, help="Seconds of load before measuring starts."
+    ),
+    server: str = typer.Option(
+        "auto",
+        "--server",
+        callback=_valid_bench_server,
+        help="dev, production (gunicorn), or auto: production when it is set up.",
+    ),
+    port: Optional[int] = typer.Option(
+        None, "--port", "-p", help="Port to serve on (default: a free port)."
+    ),
+    json_path: Optional[Path] = typer.Option(
+        None,
+        "--json",
+        dir_okay=False,
+        help="Where to write the results (default: .tailgen/bench.json).",
+    ),
+) -> None:
+    """Serve a project locally and measure requests/s and latency of / and its CSS."""
+    from rich.console import Console
+
+    from tailgen.bench import (
+        RESULTS_PATH,
+        BenchError,
+        results_table,
+        run,
+        write_results,
     )
-    sleep(DELAY_DURATION)
+    from tailgen.dev import DevError
 
-    typer.secho(
-        f"Initializing {framework} project named {project_name} with the latest Tailwind CSS version.",
-        fg=typer.colors.GREEN,
+    output.step(
+        f"Benchmarking {project_dir.resolve().name} for {duration:g}s "
+        f"with {concurrency} connections..."
     )
+    try:
+        report = run(project_dir, concurrency, duration, warmup, server, port)
+    except (BenchError, DevError) as e:
+        output.error(str(e))
+        raise typer.Exit(code=1)
+    Console().print(results_table(report))
+    json_path = json_path or project_dir / RESULTS_PATH
+    write_results(report, json_path)
+    output.step(f"Wrote {json_path}")
+    if report["results"]["total"]["errors"]:
+        raise typer.Exit(code=1)
 
-    sleep(DELAY_DURATION)
-    typer.secho(f"Creating project directory", fg=typer.colors.GREEN)
-    if output_dir:
-        project_path = Path(output_dir).expanduser().resolve()
-    else:
-        project_path = Path.cwd()
 
-    project_dir_path = _init_project_directory(project_path, project_name)
+@app.command()
+def batch(
+    manifest: Path = typer.Argument(
+        ...,
+        help="TOML file listing the projects to generate.",
+        exists=True,
+        dir_okay=False,
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-j",
+        help="Number of projects to generate at once (default: one per CPU).",
+        min=1,
+    ),
+) -> None:
+    """Generate every project listed in a manifest, several at a time."""
+    from tailgen.batch import ManifestError, load_manifest, run_batch
 
-    sleep(DELAY_DURATION)
-    typer.secho(f"Create virtual environment", fg=typer.colors.GREEN)
+    try:
+        specs = load_manifest(manifest)
+    except ManifestError as e:
+        output.error(str(e))
+        raise typer.Exit(code=1)
 
-    _create_venv(project_dir_path)
-    sleep(DELAY_DURATION)
+    results = run_batch(specs, _generate_project, workers)
+    if any(result.error for result in results):
+        raise typer.Exit(code=1)
 
-    typer.secho(f"Creating .gitignore file", fg=typer.colors.GREEN)
-    _create_git_ignore(project_dir_path)
-    sleep(DELAY_DURATION)
 
-    typer.secho(f"Creating README.md file", fg=typer.colors.GREEN)
-    _create_readme(project_dir_path)
-    sleep(DELAY_DURATION)
+@app.command()
+def serve(
+    socket_path: Optional[Path] = typer.Option(
+        None,
+        "--socket",
+        dir_okay=False,
+        help="Unix socket to listen on (default: $TAILGEN_SOCKET, or serve.sock in the cache directory).",
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-j",
+        help="Number of projects to scaffold at once (default: one per CPU).",
+        min=1,
+    ),
+) -> None:
+    """Keep tailgen loaded and scaffold projects for 'tailgen init' until stopped."""
+    from tailgen.daemon import DaemonError
+    from tailgen.daemon import serve as serve_forever
 
-    typer.secho("Initializing Git", fg=typer.colors.GREEN)
-    _git_init(project_dir_path)
-    sleep(DELAY_DURATION)
+    try:
+        serve_forever(socket_path, _init_project, workers)
+    except DaemonError as e:
+        output.error(str(e))
+        raise typer.Exit(code=1)
 
-    if framework == "flask":
-        _create_flask_project(project_dir_path)
-        _install_and_configure_tailwindcss(project_dir_path)
 
-    elif framework == "fastapi":
-        _create_fastapi_project(project_dir_path)
-        _install_and_configure_tailwindcss_fastapi(project_dir_path)
+@workspace_app.command("init")
+def workspace_init(
+    root: Path = typer.Argument(
+        Path("."),
+        help="Directory of the workspace (default: the current directory).",
+        file_okay=False,
+    ),
+    frameworks: Optional[List[str]] = typer.Option(
+        None,
+        "--framework",
+        "-f",
+        help="Framework to install up front (default: all).",
+        callback=_valid_frameworks,
+    ),
+    tailwind: str = typer.Option(
+        "npm",
+        "--tailwind",
+        help="Install Tailwind with npm, or use the standalone CLI binary (no Node needed).",
+        callback=_valid_tailwind_mode,
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Build the virtual environment and node_modules from scratch instead of from tailgen's caches.",
+    ),
+    offline: bool = typer.Option(
+        False,
+        "--offline",
+        help="Install dependencies only from the local caches (see 'tailgen cache warm').",
+    ),
+) -> None:
+    """Set up the shared venv, Tailwind and git repository of a workspace.
 
-    else:
-        raise ValueError("Invalid framework selected.")
-    sleep(DELAY_DURATION)
+    Services are then added with 'tailgen init --workspace ROOT'.
+    """
+    from tailgen import workspace
+    from tailgen.scheduler import Stage, StageError, run_stages
+
+    configure(offline=offline, use_cache=not no_cache, tailwind=tailwind)
+    root = root.expanduser().resolve()
+    try:
+        workspace.create(root, tailwind)
+    except workspace.WorkspaceError as e:
+        output.error(str(e))
+        raise typer.Exit(code=1)
+
+    output.step(f"Initializing workspace {root.name}")
+    try:
+        run_stages(
+            [
+                Stage(
+                    "venv",
+                    workspace.create_environment,
+                    (root, frameworks or sorted(VALID_FRAMEWORKS)),
+                    description="Create the shared virtual environment",
+                ),
+                Stage(
+                    "gitignore",
+                    _create_git_ignore,
+                    (root,),
+                    description="Creating .gitignore file",
+                ),
+                Stage("git", _git_init, (root,), description="Initializing Git"),
+                Stage("tailwindcss", workspace.install_tailwind, (root,)),
+            ]
+        )
+    except StageError as error:
+        for name, exc in error.failures:
+            output.error(f"Stage '{name}' failed: {exc}")
+        raise typer.Exit(code=1)
+    output.step(
+        f"Workspace ready. Add services with 'tailgen init --workspace {root}'."
+    )
+
+
+@cache_app.command("warm")
+def cache_warm(
+    frameworks: Optional[List[str]] = typer.Option(
+        None,
+        "--framework",
+        "-f",
+        help="Framework to cache dependencies for (default: all).",
+        callback=_valid_frameworks,
+    ),
+    source: Optional[Path] = typer.Option(
+        None,
+        "--from",
+        help="Take wheels from this directory instead of the package index.",
+        exists=True,
+        file_okay=False,
+    ),
+    tailwind_binary: Optional[Path] = typer.Option(
+        None,
+        "--tailwind-binary",
+        help="Also cache this standalone Tailwind CLI executable.",
+        exists=True,
+        dir_okay=False,
+    ),
+    tailwind_version: str = typer.Option(
+        STANDALONE_TAILWIND_VERSION,
+        "--tailwind-version",
+        help="Tailwind version of the --tailwind-binary executable.",
+    ),
+) -> None:
+    """Download framework dependencies into the local wheelhouse.
+
+    With --tailwind-binary, also cache a standalone Tailwind CLI executable.
+    """
+    from tailgen.process import ProcessError, ProcessTimeout
+    from tailgen.wheelhouse import warm
+
+    if tailwind_binary is not None:
+        from tailgen.standalone import add_binary
+
+        path = add_binary(tailwind_binary, tailwind_version)
+        output.step(f"Cached Tailwind CLI {tailwind_version} at {path}")
+        if not frameworks:
+            return
+
+    for framework in frameworks or sorted(VALID_FRAMEWORKS):
+        output.step(f"Caching {framework} dependencies")
+        try:
+            warm(framework, source)
+        except (ProcessError, ProcessTimeout) as e:
+            output.error(f"Failed to cache {framework} dependencies: {e}")
+            raise typer.Exit(code=1)
+    output.step("Dependencies cached.")
+
+
+@app.command()
+def lock(
+    frameworks: Optional[List[str]] = typer.Option(
+        None,
+        "--framework",
+        "-f",
+        help="Framework to lock (default: all).",
+        callback=_valid_frameworks,
+    ),
+    source: Optional[Path] = typer.Option(
+        None,
+        "--from",
+        help="Resolve only against the wheels in this directory.",
+        exists=True,
+        file_okay=False,
+    ),
+    destination: Optional[Path] = typer.Option(
+        None,
+        "--output-dir",
+        "-o",
+        help="Write the locks here instead of the tailgen cache.",
+        file_okay=False,
+    ),
+) -> None:
+    """Pin framework dependencies, with hashes, for this Python and platform."""
+    from tailgen.lock import resolve_lock
+    from tailgen.process import ProcessError, ProcessTimeout
 
-    update_package_json_with_build_script(project_dir_path)
-    setup_complete(framework)
+    for framework in frameworks or sorted(VALID_FRAMEWORKS):
+        output.step(f"Resolving {framework} dependencies")
+        try:
+            path = resolve_lock(framework, source, destination)
+        except (ProcessError, ProcessTimeout) as e:
+            output.error(f"Failed to lock {framework} dependencies: {e}")
+            raise typer.Exit(code=1)
+        output.step(f"Wrote {path}")
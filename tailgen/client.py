@@ -0,0 +1,221 @@
+"""Hand ``tailgen init`` to a running ``tailgen serve`` (see tailgen.daemon).
+
+This is the whole of ``init`` when a daemon is running: parse the options,
+ask for the project name, send both to the daemon and print what it sends
+back. It imports neither typer nor rich, so the command costs little more
+than starting the interpreter. Anything it does not handle itself (--help,
+--resume, an invalid option, no daemon) it leaves to the regular CLI.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from tailgen import PROFILES, TAILWIND_MODES, VALID_FRAMEWORKS, __version__
+from tailgen.cache import cache_dir
+from tailgen.settings import Settings
+
+SOCKET_ENV = "TAILGEN_SOCKET"
+NO_DAEMON_ENV = "TAILGEN_NO_DAEMON"
+# How long a client waits for the daemon's greeting before going it alone
+CONNECT_TIMEOUT = 1.0
+PROMPT = "Provide a project name\n(Name of the project to initialize. Press enter to use default.)"
+DEFAULT_PROJECT_NAME = "new_project"
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon cannot start or stops answering"""
+
+
+def socket_path() -> Path:
+    """Where the daemon listens, ``$TAILGEN_SOCKET`` if set"""
+    if os.environ.get(SOCKET_ENV):
+        return Path(os.environ[SOCKET_ENV]).expanduser()
+    return cache_dir() / "serve.sock"
+
+
+class Client:
+    """A connection to a running daemon"""
+
+    def __init__(self, connection: socket.socket):
+        self.connection = connection
+        self.file = connection.makefile("rwb")
+        self.version: Optional[str] = None
+
+    def _send(self, message: dict) -> None:
+        self.file.write((json.dumps(message) + "\n").encode())
+        self.file.flush()
+
+    def _receive(self) -> Optional[dict]:
+        line = self.file.readline()
+        return json.loads(line) if line else None
+
+    def init(
+        self,
+        framework: str,
+        project_name: str,
+        output_dir: Path,
+        settings: Settings,
+        timings: bool = False,
+        trace: Optional[Path] = None,
+        workspace: Optional[Path] = None,
+    ) -> int:
+        """Have the daemon scaffold a project, printing its output; returns the exit status"""
+        request = {
+            "command": "init",
+            "framework": framework,
+            "name": project_name,
+            "output_dir": str(output_dir),
+            "settings": settings._asdict(),
+            "timings": timings,
+            "trace": str(trace) if trace else None,
+            "workspace": str(workspace) if workspace else None,
+            "color": sys.stdout.isatty(),
+        }
+        try:
+            self._send(request)
+        except OSError as e:
+            raise DaemonError(f"Lost the connection to the tailgen daemon: {e}")
+        while True:
+            try:
+                message = self._receive()
+            except (OSError, ValueError) as e:
+                raise DaemonError(f"Lost the connection to the tailgen daemon: {e}")
+            if message is None:
+                raise DaemonError(
+                    "The tailgen daemon stopped before the project was done"
+                )
+            if message["type"] == "output":
+                sys.stdout.write(message["text"])
+                sys.stdout.flush()
+            elif message["type"] == "exit":
+                return message["code"]
+
+    def close(self) -> None:
+        self.file.close()
+        self.connection.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def connect(path: Optional[Path] = None) -> Optional[Client]:
+    """Connect to the daemon listening on the socket, if one answers"""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(CONNECT_TIMEOUT)
+    client = Client(connection)
+    try:
+        connection.connect(str(path or socket_path()))
+        hello = client._receive()
+    except (OSError, ValueError):
+        client.close()
+        return None
+    if not hello or hello.get("type") != "hello":
+        client.close()
+        return None
+    # Scaffolds take as long as they take
+    connection.settimeout(None)
+    client.version = hello.get("version")
+    return client
+
+
+def find() -> Optional[Client]:
+    """The daemon to hand ``init`` to: one of this version, unless disabled"""
+    if os.environ.get(NO_DAEMON_ENV):
+        return None
+    client = connect()
+    if client is not None and client.version != __version__:
+        client.close()
+        return None
+    return client
+
+
+class _Unhandled(Exception):
+    pass
+
+
+class _Parser(argparse.ArgumentParser):
+    def error(self, message: str):
+        raise _Unhandled(message)
+
+
+def _parser() -> argparse.ArgumentParser:
+    """The options of ``tailgen init`` (cli.init), minus --resume"""
+    parser = _Parser(add_help=False, allow_abbrev=False)
+    parser.add_argument("-f", "--framework", default="flask", type=str.lower)
+    parser.add_argument("-o", "--output-dir", default=".")
+    parser.add_argument("--tailwind", default="npm", type=str.lower)
+    parser.add_argument("--profile", default="development", type=str.lower)
+    parser.add_argument("--trace", type=Path)
+    parser.add_argument("--workspace", type=Path)
+    for flag in (
+        "--no-cache",
+        "--offline",
+        "--pace",
+        "--timings",
+        "--commit",
+        "--git-cli",
+    ):
+        parser.add_argument(flag, action="store_true")
+    return parser
+
+
+def init(argv: List[str]) -> Optional[int]:
+    """Run ``tailgen init`` through the daemon; None to leave it to the CLI"""
+    try:
+        options = _parser().parse_args(argv)
+    except _Unhandled:
+        return None
+    if (
+        options.framework not in VALID_FRAMEWORKS
+        or options.tailwind not in TAILWIND_MODES
+        or options.profile not in PROFILES
+        or (options.trace is not None and options.trace.is_dir())
+        or (
+            options.workspace is not None
+            and (options.commit or options.output_dir != ".")
+        )
+    ):
+        return None  # the CLI reports these
+
+    client = find()
+    if client is None:
+        return None
+    with client:
+        try:
+            project_name = input(f"{PROMPT} [{DEFAULT_PROJECT_NAME}]: ")
+            settings = Settings(
+                pace=options.pace,
+                offline=options.offline,
+                use_cache=not options.no_cache,
+                tailwind=options.tailwind,
+                profile=options.profile,
+                commit=options.commit,
+                git_cli=options.git_cli,
+            )
+            return client.init(
+                options.framework,
+                project_name or DEFAULT_PROJECT_NAME,
+                Path(options.output_dir).expanduser().resolve(),
+                settings,
+                options.timings,
+                options.trace.expanduser().resolve() if options.trace else None,
+                options.workspace.expanduser().resolve() if options.workspace else None,
+            )
+        except DaemonError as e:
+            print(e)
+            return 1
+        except (KeyboardInterrupt, EOFError):
+            # As click reports an aborted command; the daemon still finishes
+            # a project it has started
+            print("\nAborted!", file=sys.stderr)
+            return 1
@@ -0,0 +1,260 @@
+"""``tailgen serve``: a long-lived process that scaffolds projects for ``init``.
+
+Every ``tailgen init`` otherwise starts from nothing: the interpreter, typer
+and rich, the scaffold modules and the templates. The daemon loads all of
+that once, fills the caches the default scaffold reads, and then listens on
+a Unix socket in the cache directory. ``init`` looks for it before
+prompting; when one answers, a thin client (tailgen.client) asks for the
+project name and hands the options to the daemon, which runs the scaffold on
+one of a fixed number of worker threads and streams the console output back.
+Without a daemon (or with ``$TAILGEN_NO_DAEMON`` set) ``init`` scaffolds in
+its own process as before.
+
+The protocol is one JSON object per line. The daemon greets each connection
+with its version, and a client of another version leaves it alone. The
+client sends one request, then reads ``output`` messages until an ``exit``
+message carrying the exit status.
+
+Requests run in the daemon's environment (PATH, git identity, proxies); only
+the options of ``init`` come from the client, with paths made absolute. A
+client that goes away does not stop its scaffold.
+"""
+
+import contextvars
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import click
+
+from tailgen import VALID_FRAMEWORKS, __version__, output, templates
+from tailgen.client import DaemonError, socket_path
+from tailgen.settings import configure
+
+# Loaded when the daemon starts rather than by its first request
+_PRELOAD = (
+    "tailgen.helpers",
+    "tailgen.environments",
+    "tailgen.journal",
+    "tailgen.scheduler",
+    "tailgen.standalone",
+    "tailgen.production",
+    "tailgen.flask_app",
+    "tailgen.fastapi_app",
+    "rich.console",
+    "rich.table",
+)
+_TEMPLATE_PACKAGES = (templates.COMMON, "tailgen.flask_app", "tailgen.fastapi_app")
+
+# What scaffolds a project: cli._init_project
+Scaffold = Callable[[str, str, str, bool, Optional[Path], Optional[str]], None]
+
+
+_client_stream: contextvars.ContextVar[Optional["_ClientStream"]] = (
+    contextvars.ContextVar("tailgen_client_stream", default=None)
+)
+
+
+class _ClientStream:
+    """Console output of one request, sent to its client as it is written"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.color = False
+        self._connected = True
+        self._lock = threading.Lock()
+
+    def send(self, message: dict) -> None:
+        data = (json.dumps(message) + "\n").encode()
+        with self._lock:
+            if not self._connected:
+                return
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                # The client went away; its scaffold carries on regardless
+                self._connected = False
+
+    def write(self, text: str) -> None:
+        self.send({"type": "output", "text": text})
+
+
+class _Router:
+    """Stand-in for ``sys.stdout`` sending the output of a request to its client"""
+
+    def __init__(self, target):
+        self.target = target
+
+    def write(self, text: str) -> int:
+        # Behave like a text stream (see scheduler._StageStream)
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        stream = _client_stream.get()
+        if stream is None:
+            return self.target.write(text)
+        stream.write(text)
+        return len(text)
+
+    def flush(self) -> None:
+        if _client_stream.get() is None:
+            self.target.flush()
+
+    def isatty(self) -> bool:
+        # Lets click and rich color the output when the client's console can show it
+        stream = _client_stream.get()
+        return self.target.isatty() if stream is None else stream.color
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.target, name)
+
+
+def _scaffold(scaffold: Scaffold, request: dict, stream: _ClientStream) -> int:
+    _client_stream.set(stream)
+    stream.color = bool(request.get("color"))
+    try:
+        if request.get("command") != "init":
+            raise DaemonError(f"Unknown command {request.get('command')!r}")
+        if request.get("framework") not in VALID_FRAMEWORKS:
+            raise DaemonError(f"Unknown framework {request.get('framework')!r}")
+        configure(**request.get("settings", {}))
+        trace = request.get("trace")
+        scaffold(
+            request["framework"],
+            request["name"],
+            request["output_dir"],
+            bool(request.get("timings")),
+            Path(trace) if trace else None,
+            request.get("workspace"),
+        )
+    except click.exceptions.Exit as e:
+        return e.exit_code
+    except Exception as e:
+        output.error(f"tailgen serve could not scaffold the project: {e}")
+        return 1
+    return 0
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        stream = _ClientStream(self.wfile)
+        stream.send({"type": "hello", "version": __version__})
+        try:
+            line = self.rfile.readline()
+        except OSError:
+            line = b""
+        if not line:
+            return  # the client hung up; ``serve`` probes sockets this way
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = {}
+        # A fresh context: settings and timings of earlier requests on the
+        # same worker thread must not leak into this one
+        future = self.server.pool.submit(
+            contextvars.Context().run, _scaffold, self.server.scaffold, request, stream
+        )
+        stream.send({"type": "exit", "code": future.result()})
+
+
+class Server(socketserver.ThreadingUnixStreamServer):
+    """Accepts any number of clients; scaffolds at most ``workers`` projects at once"""
+
+    daemon_threads = True
+
+    def __init__(self, path: Path, scaffold: Scaffold, workers: int):
+        self.scaffold = scaffold
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="tailgen-serve")
+        # Only this user may hand the daemon work
+        umask = os.umask(0o177)
+        try:
+            super().__init__(str(path), _Handler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _warm_up() -> None:
+    """Load what every scaffold needs, so the first request does not pay for it"""
+    for module in _PRELOAD:
+        importlib.import_module(module)
+    for package in _TEMPLATE_PACKAGES:
+        templates._template_set(package)
+
+
+def _fill_caches() -> None:
+    """Fill the caches the default scaffold of each framework reads"""
+    from tailgen.prefetch import _warm
+
+    for framework in sorted(VALID_FRAMEWORKS):
+        _warm(framework)
+
+
+def _answers(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+@contextmanager
+def listening(
+    path: Optional[Path], scaffold: Scaffold, workers: Optional[int] = None
+) -> Iterator[Server]:
+    """A daemon bound to the socket, with stdout routed to its clients"""
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonError("tailgen serve needs Unix domain sockets")
+    path = Path(path or socket_path())
+    if _answers(path):
+        raise DaemonError(f"A tailgen daemon is already listening on {path}")
+    if path.exists() or path.is_symlink():
+        if not path.is_socket():
+            raise DaemonError(f"{path} exists and is not a socket")
+        # Left behind by a daemon that did not shut down cleanly
+        path.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    _warm_up()
+    server = Server(path, scaffold, workers or os.cpu_count() or 1)
+    router = _Router(sys.stdout)
+    sys.stdout = router
+    try:
+        yield server
+    finally:
+        sys.stdout = router.target
+        server.server_close()
+        path.unlink(missing_ok=True)
+
+
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def serve(path: Optional[Path], scaffold: Scaffold, workers: Optional[int]) -> None:
+    """Answer ``init`` requests until interrupted"""
+    with listening(path, scaffold, workers) as server:
+        signal.signal(signal.SIGTERM, _interrupt)
+        threading.Thread(target=_fill_caches, daemon=True).start()
+        output.step(
+            f"Listening on {server.server_address} with " f"{server.workers} worker(s)"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    output.step("Stopped.")
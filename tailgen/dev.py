@@ -0,0 +1,364 @@
+"""``tailgen dev``: the Tailwind watcher, the app server and live reload.
+
+Two processes run under one supervisor: Tailwind in watch mode and the
+framework's development server, both from the project's own tools. A file
+watcher follows ``templates/``, ``static/src/`` and the built CSS, and a
+small server pushes reload events to the browser over server-sent events:
+
+* ``css`` when only ``output.css`` was rewritten: the page swaps its
+  stylesheets in place, without reloading;
+* ``reload`` when a template or script changed: the page reloads, once
+  Tailwind has had a moment to rebuild the CSS for it.
+
+The generated templates load the client script only when the app was
+started with ``TAILGEN_LIVERELOAD`` set, which is what this module does.
+"""
+
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+from tailgen import output
+from tailgen.templates import DEFAULT_PORTS
+from tailgen.build import INPUT_CSS, OUTPUT_CSS, tailwind_command
+from tailgen.watch import watcher
+from tailgen.workspace import find_root, venv_dir
+
+LIVERELOAD_ENV = "TAILGEN_LIVERELOAD"
+DEFAULT_LIVERELOAD_PORT = 35729
+# Changes this close together make one reload; editors save in several steps
+DEBOUNCE = 0.03
+# How much longer a template change waits for Tailwind to rewrite the CSS
+CSS_GRACE = 0.15
+HEARTBEAT = 15.0
+STOP_TIMEOUT = 5.0
+
+CLIENT_SCRIPT = """(function () {
+  var source = new EventSource("%(url)s/events");
+  source.addEventListener("css", function () {
+    document.querySelectorAll('link[rel="stylesheet"]').forEach(function (link) {
+      var url = new URL(link.href);
+      url.searchParams.set("livereload", Date.now());
+      link.href = url.toString();
+    });
+  });
+  source.addEventListener("reload", function () {
+    window.location.reload();
+  });
+})();
+"""
+
+
+class DevError(RuntimeError):
+    """Raised when the development environment cannot be started"""
+
+
+class Broadcaster:
+    """Fans reload events out to every connected browser"""
+
+    def __init__(self):
+        self._clients: List[queue.Queue] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> queue.Queue:
+        events: queue.Queue = queue.Queue()
+        with self._lock:
+            self._clients.append(events)
+        return events
+
+    def unsubscribe(self, events: queue.Queue) -> None:
+        with self._lock:
+            self._clients.remove(events)
+
+    def send(self, event: str, data: Optional[dict] = None) -> None:
+        with self._lock:
+            for events in self._clients:
+                events.put((event, data or {}))
+
+
+def _handler(broadcaster: Broadcaster, url: Callable[[], str]):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path == "/livereload.js":
+                body = (CLIENT_SCRIPT % {"url": url()}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/javascript; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+            elif self.path == "/events":
+                self._stream()
+            else:
+                self.send_error(404)
+
+        def _stream(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-store")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            events = broadcaster.subscribe()
+            try:
+                self.wfile.write(b"retry: 500\n\n")
+                self.wfile.flush()
+                while True:
+                    try:
+                        event, data = events.get(timeout=HEARTBEAT)
+                        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                    except queue.Empty:
+                        message = ": ping\n\n"
+                    self.wfile.write(message.encode("utf-8"))
+                    self.wfile.flush()
+            except OSError:  # the page went away
+                pass
+            finally:
+                broadcaster.unsubscribe(events)
+                self.close_connection = True
+
+    return Handler
+
+
+class LiveReloadServer:
+    """Serves the client script and the event stream on a local port"""
+
+    def __init__(self, broadcaster: Broadcaster, port: int = DEFAULT_LIVERELOAD_PORT):
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", port), _handler(broadcaster, lambda: self.url)
+        )
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def watch_for_reloads(
+    project_dir: Path, broadcaster: Broadcaster, stop: threading.Event
+) -> None:
+    """Turn file changes into reload events until ``stop`` is set"""
+    css = (project_dir / OUTPUT_CSS).resolve()
+    css.parent.mkdir(parents=True, exist_ok=True)
+    roots = [project_dir / "templates", project_dir / INPUT_CSS.parent, css.parent]
+    files = watcher(root.resolve() for root in roots)
+    pending: Set[Path] = set()
+    deadline = None
+    try:
+        while not stop.is_set():
+            timeout = 0.5 if deadline is None else max(0.0, deadline - time.monotonic())
+            changed = {path.resolve() for path in files.read(timeout)}
+            css_written = css in changed
+            changed = {
+                path
+                for path in changed
+                if path.parent != css.parent and not _is_editor_noise(path)
+            }
+            if changed:
+                now = time.monotonic()
+                if pending:
+                    deadline = max(deadline, now + DEBOUNCE)
+                else:
+                    deadline = now + DEBOUNCE + CSS_GRACE
+                pending |= changed
+
+            if css_written and not pending:
+                broadcaster.send("css")
+            elif pending and (css_written or time.monotonic() >= deadline):
+                # Without a CSS write Tailwind found nothing new to build,
+                # but the page itself still changed
+                broadcaster.send("reload", {"files": _names(project_dir, pending)})
+                pending, deadline = set(), None
+    finally:
+        files.close()
+
+
+def _is_editor_noise(path: Path) -> bool:
+    """Swap, backup and probe files editors write next to the real one"""
+    name = path.name
+    return (
+        name.startswith((".", "#"))
+        or name.endswith(("~", ".swp", ".swx", ".tmp"))
+        or name == "4913"
+    )
+
+
+def _names(project_dir: Path, paths: Set[Path]) -> List[str]:
+    root = project_dir.resolve()
+    return sorted(
+        str(path.relative_to(root)) if path.is_relative_to(root) else str(path)
+        for path in paths
+    )
+
+
+def detect_framework(project_dir: Path) -> str:
+    from tailgen.journal import read_journal
+
+    journal = read_journal(project_dir)
+    if journal and journal.get("framework"):
+        return journal["framework"]
+    if (project_dir / "app.py").is_file():
+        return "flask"
+    if (project_dir / "main.py").is_file():
+        return "fastapi"
+    raise DevError(f"{project_dir} does not look like a Flask or FastAPI project")
+
+
+def _python(project_dir: Path) -> str:
+    from tailgen.environments import _venv_executable
+
+    python = _venv_executable(venv_dir(project_dir), "python")
+    return str(python) if python.exists() else sys.executable
+
+
+def server_command(project_dir: Path, framework: str, port: int) -> List[str]:
+    """The framework's development server, with its own code reloading"""
+    python = _python(project_dir)
+    if framework == "flask":
+        return [
+            python,
+            "-m",
+            "flask",
+            "--app",
+            "app",
+            "run",
+            "--debug",
+            "--port",
+            str(port),
+        ]
+    if framework == "fastapi":
+        return [python, "-m", "uvicorn", "main:app", "--reload", "--port", str(port)]
+    raise DevError(f"Unknown framework {framework}")
+
+
+def tailwind_watch_command(
+    project_dir: Path, output_css: Path = OUTPUT_CSS
+) -> List[str]:
+    return [
+        *tailwind_command(project_dir),
+        "-i",
+        f"./{INPUT_CSS.as_posix()}",
+        "-o",
+        f"./{output_css.as_posix()}",
+        "--watch",
+    ]
+
+
+class Supervised:
+    """A long-running child process whose output is forwarded line by line"""
+
+    def __init__(self, name: str, args: Sequence[str], cwd: Path, env: Dict[str, str]):
+        self.name = name
+        try:
+            self.process = subprocess.Popen(
+                list(args),
+                cwd=cwd,
+                env=env,
+                # Tailwind's watch mode exits when its stdin closes
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+        except OSError as e:
+            raise DevError(f"Could not start {name} ({args[0]}): {e}")
+        self._reader = threading.Thread(target=self._forward, daemon=True)
+        self._reader.start()
+
+    def _forward(self) -> None:
+        for line in iter(self.process.stdout.readline, b""):
+            text = line.decode("utf-8", errors="replace").rstrip()
+            output.detail(f"[{self.name}] {text}")
+
+    def poll(self) -> Optional[int]:
+        return self.process.poll()
+
+    def stop(self) -> None:
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self._reader.join(STOP_TIMEOUT)
+
+
+def run(
+    project_dir: Path,
+    port: Optional[int] = None,
+    livereload_port: int = DEFAULT_LIVERELOAD_PORT,
+) -> None:
+    """Run the dev environment until Ctrl-C or until a process dies"""
+    project_dir = Path(project_dir).resolve()
+    framework = detect_framework(project_dir)
+    port = port or DEFAULT_PORTS[framework]
+
+    broadcaster = Broadcaster()
+    try:
+        server = LiveReloadServer(broadcaster, livereload_port)
+    except OSError as e:
+        raise DevError(f"Cannot listen for live reload on port {livereload_port}: {e}")
+    server.start()
+
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    env[LIVERELOAD_ENV] = server.url
+    stop = threading.Event()
+    reloader = threading.Thread(
+        target=watch_for_reloads, args=(project_dir, broadcaster, stop), daemon=True
+    )
+    # A workspace service shares the workspace's Tailwind, which writes the
+    # service's output.css from the workspace root
+    root = find_root(project_dir)
+    if root is not None and root != project_dir:
+        tailwind = tailwind_watch_command(root, project_dir.name / OUTPUT_CSS)
+        tailwind_dir = root
+    else:
+        tailwind = tailwind_watch_command(project_dir)
+        tailwind_dir = project_dir
+    processes: List[Supervised] = []
+    try:
+        processes.append(Supervised("tailwind", tailwind, tailwind_dir, env))
+        processes.append(
+            Supervised(
+                framework,
+                server_command(project_dir, framework, port),
+                project_dir,
+                env,
+            )
+        )
+        reloader.start()
+        output.step(f"Serving {project_dir.name} on http://127.0.0.1:{port}")
+        output.step(f"Live reload on {server.url} (Ctrl-C to stop)")
+        while True:
+            for process in processes:
+                code = process.poll()
+                if code is not None:
+                    raise DevError(f"{process.name} exited with status {code}")
+            time.sleep(0.2)
+    finally:
+        stop.set()
+        for process in reversed(processes):
+            process.stop()
+        if reloader.is_alive():
+            reloader.join(STOP_TIMEOUT)
+        server.stop()
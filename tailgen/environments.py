@@ -0,0 +1,272 @@
+"""Virtual environments for generated projects.
+
+Building a venv and pip-installing a framework into it gives the same result
+every time for a given interpreter and dependency set, so a fully populated
+"golden" venv is kept in the cache per (interpreter, framework, requirements)
+and cloned into each new project with reflinks or hardlinks. Only the files
+that embed the venv's own path (``pyvenv.cfg``, activate scripts and console
+script shebangs) are rewritten, as fresh copies, for the new location.
+"""
+
+import compileall
+import configparser
+import json
+import os
+import re
+import shutil
+import sys
+import venv
+import zipfile
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from tailgen import FRAMEWORK_REQUIREMENTS, output
+from tailgen.cache import FileLock, cache_dir, cache_key, clone_tree, replace_file
+from tailgen.lock import find_lock, lock_install_args, resolve_lock
+from tailgen.process import ProcessError, ProcessTimeout, run_process
+from tailgen.settings import get_settings
+from tailgen.wheelhouse import pip_source_args
+
+# pip's "[notice] A new release of pip is available" lines on stderr
+PIP_NOTICE_PATTERN = re.compile(r"\s*\[notice\]", re.IGNORECASE)
+# Written into a venv once its requirements are installed
+VENV_MARKER = "tailgen-venv.json"
+
+
+def _venv_executable(venv_dir: Path, name: str) -> Path:
+    """Path to an executable inside a virtual environment"""
+    if os.name == "nt":  # Windows
+        return venv_dir / "Scripts" / f"{name}.exe"
+    return venv_dir / "bin" / name  # POSIX (Linux, macOS, etc.)
+
+
+def _scripts_dir(venv_dir: Path) -> Path:
+    return venv_dir / ("Scripts" if os.name == "nt" else "bin")
+
+
+def _site_packages(venv_dir: Path) -> Path:
+    if os.name == "nt":
+        return venv_dir / "Lib" / "site-packages"
+    version = f"python{sys.version_info.major}.{sys.version_info.minor}"
+    return venv_dir / "lib" / version / "site-packages"
+
+
+def _bundled_pip_wheel() -> Optional[Path]:
+    """The pip wheel ensurepip would install, if this Python ships one"""
+    import ensurepip
+
+    wheels = sorted((Path(ensurepip.__file__).parent / "_bundled").glob("pip-*.whl"))
+    return wheels[-1] if wheels else None
+
+
+def _pip_seed() -> Optional[Path]:
+    """The bundled pip, unpacked and byte-compiled once into the cache"""
+    wheel = _bundled_pip_wheel()
+    if wheel is None:
+        return None
+    seed = cache_dir() / "pip" / cache_key(sys.version, wheel.name)
+    if seed.is_dir():
+        return seed
+    with FileLock(seed.with_name(seed.name + ".lock")):
+        if not seed.is_dir():
+            staging = seed.with_name(f".{seed.name}.{os.getpid()}")
+            shutil.rmtree(staging, ignore_errors=True)
+            with zipfile.ZipFile(wheel) as archive:
+                archive.extractall(staging)
+            for dist_info in staging.glob("pip-*.dist-info"):
+                (dist_info / "INSTALLER").write_text("pip\n", encoding="utf-8")
+            compileall.compile_dir(staging, quiet=1)
+            os.replace(staging, seed)
+    return seed
+
+
+def _write_pip_scripts(venv_dir: Path, seed: Path) -> None:
+    """The pip, pip3 and pip3.X commands an install of pip would create"""
+    entry_points = configparser.ConfigParser(delimiters=("=",))
+    entry_points.read(next(seed.glob("pip-*.dist-info")) / "entry_points.txt")
+    module, _, function = entry_points["console_scripts"]["pip"].partition(":")
+    python = _venv_executable(venv_dir, "python")
+    script = (
+        f"#!{python}\n"
+        "import sys\n"
+        f"from {module} import {function}\n"
+        "if __name__ == '__main__':\n"
+        f"    sys.exit({function}())\n"
+    )
+    major, minor = sys.version_info[:2]
+    for name in ("pip", f"pip{major}", f"pip{major}.{minor}"):
+        path = _scripts_dir(venv_dir) / name
+        path.write_text(script, encoding="utf-8")
+        path.chmod(0o755)
+
+
+def _build_venv(venv_dir: Path) -> None:
+    """Create an empty virtual environment with pip.
+
+    The venv is created in this process, without pip, and pip is cloned in
+    from the cache. That replaces two interpreter launches, and ensurepip
+    unpacking its wheel every time, with a few hundred hardlinks. Where
+    there is no bundled wheel to seed from (some distro Pythons), pip's
+    commands would have to be .exe launchers (Windows), or the cache is
+    disabled, ensurepip still does the job.
+    """
+    try:
+        venv.EnvBuilder(with_pip=False, symlinks=os.name != "nt").create(venv_dir)
+        if (_site_packages(venv_dir) / "pip").is_dir():
+            return  # an existing venv that already has pip
+        use_seed = os.name != "nt" and get_settings().use_cache
+        seed = _pip_seed() if use_seed else None
+        if seed is None:
+            run_process([_venv_executable(venv_dir, "python"), "-m", "ensurepip"])
+            return
+        clone_tree(seed, _site_packages(venv_dir))
+        _write_pip_scripts(venv_dir, seed)
+    except (OSError, ProcessError) as e:
+        raise Exception(f"Failed to create environment: {e}")
+
+
+def _pip_install(venv_dir: Path, install_args: Sequence[str]) -> None:
+    """Run ``pip install`` in a virtual environment, streaming its output"""
+    notices = []
+
+    def is_notice(line: str) -> bool:
+        if PIP_NOTICE_PATTERN.match(line):
+            notices.append(line)
+            return True
+        return False
+
+    try:
+        run_process(
+            [_venv_executable(venv_dir, "pip"), "install", *install_args],
+            on_stdout=output.detail,
+            on_stderr=output.detail,
+            ignore_stderr=is_notice,
+        )
+    finally:
+        if notices:
+            output.error("Notice: pip is outdated. Consider updating.")
+
+
+def _framework_lock(framework: str) -> Optional[Path]:
+    """The framework's lock, resolving one into the cache if there is none yet"""
+    lock = find_lock(framework)
+    if lock is not None or get_settings().offline:
+        return lock
+    try:
+        return resolve_lock(framework)
+    except (ProcessError, ProcessTimeout, KeyError, ValueError) as e:
+        output.error(
+            f"Could not pin {framework} dependencies, installing unpinned: {e}"
+        )
+        return None
+
+
+def _install_framework(venv_dir: Path, framework: str) -> None:
+    """Install a framework's requirements, exactly as pinned when locked"""
+    requirements = FRAMEWORK_REQUIREMENTS[framework]
+    sources = pip_source_args(requirements)
+    lock = _framework_lock(framework)
+    if lock is not None:
+        try:
+            _pip_install(venv_dir, [*sources, *lock_install_args(lock)])
+            return
+        except ProcessError as e:
+            # A lock pins one wheel per package; pip rejects it where another
+            # wheel is picked, e.g. a platform the lock was not resolved on
+            output.error(
+                f"Could not install {framework} as locked, installing unpinned: {e}"
+            )
+    _pip_install(venv_dir, [*sources, *requirements])
+
+
+def _read_marker(venv_dir: Path) -> Optional[dict]:
+    try:
+        return json.loads((venv_dir / VENV_MARKER).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_marker(venv_dir: Path, requirements: Sequence[str]) -> None:
+    marker = {"prefix": str(venv_dir), "requirements": list(requirements)}
+    (venv_dir / VENV_MARKER).write_text(json.dumps(marker), encoding="utf-8")
+
+
+def _requirements_installed(venv_dir: Path, requirements: Sequence[str]) -> bool:
+    """Whether the venv was cloned with exactly these requirements installed"""
+    marker = _read_marker(venv_dir)
+    return marker is not None and marker["requirements"] == list(requirements)
+
+
+def _golden_venv_key(
+    framework: str, requirements: Sequence[str], lock: Optional[Path]
+) -> str:
+    pins = lock.read_text(encoding="utf-8") if lock else None
+    return cache_key(
+        os.path.realpath(sys.executable),
+        sys.version,
+        framework,
+        list(requirements),
+        pins,
+    )
+
+
+def _golden_venv(framework: str) -> Path:
+    """Path of the cached venv for a framework, building it on first use"""
+    requirements = FRAMEWORK_REQUIREMENTS[framework]
+    lock = _framework_lock(framework)
+    root = cache_dir() / "venvs" / _golden_venv_key(framework, requirements, lock)
+    venv_dir = root / "venv"
+    if _read_marker(venv_dir) is not None:
+        return venv_dir
+
+    with FileLock(root / "lock"):
+        # Another process may have finished building it while we waited
+        if _read_marker(venv_dir) is not None:
+            return venv_dir
+
+        output.step(f"Building cached {framework} environment (first run only)")
+        shutil.rmtree(venv_dir, ignore_errors=True)
+        _build_venv(venv_dir)
+        _install_framework(venv_dir, framework)
+        _write_marker(venv_dir, requirements)
+    return venv_dir
+
+
+def _rewrite_prefix(venv_dir: Path, old_prefix: str) -> None:
+    """Point pyvenv.cfg, activate scripts and shebangs at the new location"""
+    old = os.fsencode(old_prefix)
+    new = os.fsencode(str(venv_dir))
+    candidates: List[Path] = [venv_dir / "pyvenv.cfg"]
+    candidates += [path for path in _scripts_dir(venv_dir).iterdir()]
+    for path in candidates:
+        if path.is_symlink() or not path.is_file():
+            continue
+        data = path.read_bytes()
+        if old in data:
+            replace_file(path, data.replace(old, new))
+
+
+def _clone_venv(golden_venv: Path, venv_dir: Path) -> None:
+    marker = _read_marker(golden_venv)
+    clone_tree(golden_venv, venv_dir)
+    _rewrite_prefix(venv_dir, marker["prefix"])
+    replace_file(
+        venv_dir / VENV_MARKER,
+        json.dumps({**marker, "prefix": str(venv_dir)}).encode("utf-8"),
+    )
+
+
+def _create_venv(project_dir_path: Path, framework: Optional[str] = None) -> None:
+    """Creates virtual environment
+
+    When a framework is given, the venv is cloned from the cached environment
+    with that framework's requirements already installed.
+    """
+    venv_dir = project_dir_path / "venv"
+    if framework is None or venv_dir.exists():
+        # Never clone over an existing venv; reuse it and let pip top it up
+        _build_venv(venv_dir)
+        return
+
+    _clone_venv(_golden_venv(framework), venv_dir)
+    output.step(f"Cloned cached {framework} environment")
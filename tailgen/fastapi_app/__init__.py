@@ -1,154 +1,76 @@
-import os
 from pathlib import Path
-import re
-import subprocess
-from time import sleep
-import typer
-import shutil
-from tailgen import DELAY_DURATION
-from tailgen.helpers import _get_setup_paths
-from rich.progress import Progress
+from tailgen import FRAMEWORK_REQUIREMENTS, TAILWIND_PACKAGES, output, templates
+from tailgen.environments import _install_framework, _requirements_installed
+from tailgen.helpers import _npm_install
+from tailgen.lock import write_project_lock
+from tailgen.npm_store import StoreError
+from tailgen.process import ProcessError, ProcessTimeout
+from tailgen.settings import get_settings
+from tailgen.standalone import StandaloneError, link_binary
 
-package_path = _get_setup_paths()
+# Destination in the project -> template in setup_files
+APP_FILES = {"main.py": "main.txt", "templates/base.html": "base.txt"}
+TAILWIND_FILES = {"tailwind.config.js": "tailwind_config.txt"}
+PRODUCTION_FILES = {"asgi.py": "asgi.txt", "gunicorn.conf.py": "gunicorn_conf.txt"}
 
 
 def _create_fastapi_project(project_dir: Path) -> None:
     """Create FastAPI Project"""
     venv_dir = project_dir / "venv"
-    pip_executable = venv_dir / ("Scripts/pip.exe" if os.name == "nt" else "bin/pip")
-    install_process = subprocess.Popen(
-        [
-            str(pip_executable),
-            "install",
-            "fastapi[standard]",
-            "Jinja2",
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        universal_newlines=True,
-    )
-    typer.secho("Installing dependencies...", fg=typer.colors.GREEN)
-
-    while install_process.poll() is None:
-        output = install_process.stdout.readline().strip()
-        if output:
-            typer.secho(output, fg=typer.colors.BRIGHT_MAGENTA)
-        sleep(DELAY_DURATION)
-
-    install_process.wait()
-    errors = install_process.stderr.read().strip()
-
-    if errors:
-        # Regular expression to match any notice that starts with "[notice]"
-        pip_notice_pattern = r"\[notice\].*?(\n|$)"
-
-        if re.search(pip_notice_pattern, errors, re.IGNORECASE):
-            typer.secho(
-                "Notice: pip is outdated. Consider updating.", fg=typer.colors.RED
-            )
-
-        # Remove all pip notices from the error message
-        errors = re.sub(pip_notice_pattern, "", errors, flags=re.IGNORECASE).strip()
-
-        # If there are still errors after removing the pip notice, raise an exception
-        if errors:
-            error_message = f"Error installing FastAPI: {errors}"
-            raise RuntimeError(error_message)
-
-    sleep(DELAY_DURATION)
-    typer.secho(
-        "Fastapi[standard] and Jinja installed successfully.", fg=typer.colors.GREEN
-    )
-
-    typer.secho("Creating base FastAPI application...", fg=typer.colors.GREEN)
-    source = Path(package_path.fastapi) / "main.txt"
-    destination = Path(project_dir) / "main.py"
+    requirements = FRAMEWORK_REQUIREMENTS["fastapi"]
+    if _requirements_installed(venv_dir, requirements):
+        output.step(
+            "Fastapi[standard] and Jinja already installed in the cached environment."
+        )
+    else:
+        output.step("Installing dependencies...")
+        try:
+            _install_framework(venv_dir, "fastapi")
+        except (ProcessError, ProcessTimeout) as e:
+            raise RuntimeError(f"Error installing FastAPI: {e}")
 
-    try:
-        shutil.copyfile(source, destination)
+        output.step("Fastapi[standard] and Jinja installed successfully.")
 
-    except Exception as e:
-        raise Exception(f"Failed to create base FastAPI file: {str(e)}")
+    if write_project_lock(project_dir, "fastapi"):
+        output.step("Pinned dependencies written to requirements.lock")
 
-    sleep(DELAY_DURATION)
-    typer.secho("Creating static and templates directories.", fg=typer.colors.GREEN)
-    # create static/ and templates/
+    output.step("Creating base FastAPI application...")
     (project_dir / "static").mkdir(exist_ok=True)
-    (project_dir / "templates").mkdir(exist_ok=True)
-
-    typer.secho("Creating index HTML file", fg=typer.colors.GREEN)
-
-    source = Path(package_path.fastapi) / "base.txt"
-    destination = Path(project_dir) / "templates" / "base.html"
-
     try:
-        shutil.copyfile(source, destination)
-
+        templates.write_templates(
+            project_dir,
+            __name__,
+            APP_FILES,
+            templates.project_variables(project_dir, "fastapi"),
+        )
     except Exception as e:
-        raise Exception(f"Failed to create base HTML file: {str(e)}")
-
-    typer.secho("Completed FastAPI setup", fg=typer.colors.GREEN)
+        raise Exception(f"Failed to create base FastAPI files: {str(e)}")
+    output.step("Completed FastAPI setup")
 
 
 def _install_and_configure_tailwindcss_fastapi(project_dir: Path) -> None:
     """Install and configure Tailwind CSS"""
-    executable_cmd = "C:\\Program Files\\nodejs\\npm.cmd" if os.name == "nt" else "npm"
-    with Progress() as progress:
-        task = progress.add_task("[blue]Installing Tailwind CSS...", total=1)
-
-        # Run the npm install command with the appropriate prefix
-        install_process = subprocess.Popen(
-            [
-                executable_cmd,
-                "install",
-                "tailwindcss",
-                "--save-dev",
-            ],
-            cwd=str(project_dir),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-        )
-
-        # Update progress bar based on output
-        for line in iter(install_process.stdout.readline, ""):
-            progress.update(task, advance=1, color="red")
-
-        # Wait for the process to complete
-        install_process.wait()
-
-        # Check if there were any errors
-    errors = install_process.stderr.read().strip()
-    if errors:
-        typer.secho(
-            f"Errors occurred during installation: {errors}", fg=typer.colors.RED
-        )
-    else:
-        typer.secho("Tailwind CSS installed successfully!", fg=typer.colors.GREEN)
-
-    sleep(DELAY_DURATION)
-
-    typer.secho("Creating Tailwind config file...", fg=typer.colors.GREEN)
-
-    source = Path(package_path.fastapi) / "tailwind_config.txt"
-    destination = project_dir / "tailwind.config.js"
+    output.step("Installing Tailwind CSS...")
     try:
-        shutil.copyfile(source, destination)
-    except Exception as e:
-        raise Exception(f"Failed to create base HTML file: {str(e)}")
-
-    sleep(DELAY_DURATION)
-
-    typer.secho("Creating file for input CSS", fg=typer.colors.GREEN)
-
-    static_dir = project_dir / "static"
-    (static_dir / "src").mkdir(exist_ok=True)
-    with open(static_dir / "src" / "input.css", "w") as f:
-        f.write(
-            """@tailwind base;
-@tailwind components;
-@tailwind utilities;
-"""
+        if get_settings().tailwind == "standalone":
+            link_binary(project_dir)
+        else:
+            _npm_install(project_dir, list(TAILWIND_PACKAGES))
+    except (ProcessError, ProcessTimeout, StoreError, StandaloneError) as e:
+        raise RuntimeError(f"Error installing Tailwind CSS: {e}")
+    output.step("Tailwind CSS installed successfully!")
+
+    output.step("Creating Tailwind config and input CSS files...")
+    variables = templates.project_variables(project_dir, "fastapi")
+    try:
+        templates.write_templates(project_dir, __name__, TAILWIND_FILES, variables)
+        templates.write_templates(
+            project_dir,
+            templates.COMMON,
+            {"static/src/input.css": "input_css.txt"},
+            variables,
         )
+    except Exception as e:
+        raise Exception(f"Failed to create Tailwind files: {str(e)}")
 
-    typer.secho("Completed tailwind config", fg=typer.colors.GREEN)
+    output.step("Completed tailwind config")
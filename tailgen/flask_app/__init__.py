@@ -1,144 +1,76 @@
-import os
 from pathlib import Path
-import re
-import subprocess
-from time import sleep
-import typer
-import shutil
-from tailgen import DELAY_DURATION
-from tailgen.helpers import _get_setup_paths
-from rich.progress import Progress
+from tailgen import FRAMEWORK_REQUIREMENTS, TAILWIND_PACKAGES, output, templates
+from tailgen.environments import _install_framework, _requirements_installed
+from tailgen.helpers import _npm_install
+from tailgen.lock import write_project_lock
+from tailgen.npm_store import StoreError
+from tailgen.process import ProcessError, ProcessTimeout
+from tailgen.settings import get_settings
+from tailgen.standalone import StandaloneError, link_binary
 
-package_path = _get_setup_paths()
+# Destination in the project -> template in setup_files
+APP_FILES = {"app.py": "app.txt", "templates/index.html": "index.txt"}
+TAILWIND_FILES = {"tailwind.config.js": "tailwind_config.txt"}
+PRODUCTION_FILES = {"wsgi.py": "wsgi.txt", "gunicorn.conf.py": "gunicorn_conf.txt"}
 
 
 def _create_flask_project(project_dir: Path) -> None:
     """Create Flask Project"""
     venv_dir = project_dir / "venv"
-    pip_executable = venv_dir / ("Scripts/pip.exe" if os.name == "nt" else "bin/pip")
-    install_process = subprocess.Popen(
-        [str(pip_executable), "install", "flask"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        universal_newlines=True,
-    )
-    typer.secho(
-        "Safely installing Flask and other python dependencies to virtual environment...",
-        fg=typer.colors.GREEN,
-    )
-
-    while install_process.poll() is None:
-        output = install_process.stdout.readline().strip()
-        if output:
-            typer.secho(output, fg=typer.colors.BRIGHT_MAGENTA)
-        sleep(DELAY_DURATION)
-
-    install_process.wait()
-    errors = install_process.stderr.read().strip()
-
-    if errors:
-        # Regular expression to match any notice that starts with "[notice]"
-        pip_notice_pattern = r"\[notice\].*?(\n|$)"
-
-        # Find all pip notices
-        if re.search(pip_notice_pattern, errors, re.IGNORECASE):
-            typer.secho(
-                "Notice: pip is outdated. Consider updating.", fg=typer.colors.RED
-            )
-
-        # Remove all pip notices from the error message
-        errors = re.sub(pip_notice_pattern, "", errors, flags=re.IGNORECASE).strip()
-
-        # If there are still errors after removing the pip notice, raise an exception
-        if errors:
-            error_message = f"Error installing Flask: {errors}"
-            raise RuntimeError(error_message)
+    requirements = FRAMEWORK_REQUIREMENTS["flask"]
+    if _requirements_installed(venv_dir, requirements):
+        output.step("Flask already installed in the cached environment.")
+    else:
+        output.step(
+            "Safely installing Flask and other python dependencies to virtual environment..."
+        )
+        try:
+            _install_framework(venv_dir, "flask")
+        except (ProcessError, ProcessTimeout) as e:
+            raise RuntimeError(f"Error installing Flask: {e}")
 
-    sleep(DELAY_DURATION)
-    typer.secho("Flask installed successfully.", fg=typer.colors.GREEN)
+        output.step("Flask installed successfully.")
 
-    typer.secho("Creating base Flask application...", fg=typer.colors.GREEN)
-    source = Path(package_path.flask) / "app.txt"
-    destination = Path(project_dir) / "app.py"
-    try:
-        shutil.copyfile(source, destination)
-    except Exception as e:
-        raise Exception(f"Failed to create base Flask file: {str(e)}")
+    if write_project_lock(project_dir, "flask"):
+        output.step("Pinned dependencies written to requirements.lock")
 
-    typer.secho("Creating static and templates directories.", fg=typer.colors.GREEN)
-    # create static/ and templates/
+    output.step("Creating base Flask application...")
     (project_dir / "static").mkdir(exist_ok=True)
-    (project_dir / "templates").mkdir(exist_ok=True)
-
-    typer.secho("Creating index HTML file", fg=typer.colors.GREEN)
-    source = Path(package_path.flask) / "index.txt"
-    destination = Path(project_dir) / "templates" / "index.html"
     try:
-        shutil.copyfile(source, destination)
+        templates.write_templates(
+            project_dir,
+            __name__,
+            APP_FILES,
+            templates.project_variables(project_dir, "flask"),
+        )
     except Exception as e:
-        raise Exception(f"Failed to create base Flask file: {str(e)}")
-    sleep(DELAY_DURATION)
-    typer.secho("Completed Flask setup", fg=typer.colors.GREEN)
+        raise Exception(f"Failed to create base Flask files: {str(e)}")
+    output.step("Completed Flask setup")
 
 
 def _install_and_configure_tailwindcss(project_dir: Path) -> None:
     """Install and configure Tailwind CSS"""
-    executable_cmd = "C:\\Program Files\\nodejs\\npm.cmd" if os.name == "nt" else "npm"
-    with Progress() as progress:
-        task = progress.add_task("[blue]Installing Tailwind CSS...", total=1)
-
-        # Run the npm install command with the appropriate prefix
-        install_process = subprocess.Popen(
-            [
-                executable_cmd,
-                "install",
-                "tailwindcss",
-                "--save-dev",
-            ],
-            cwd=str(project_dir),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-        )
-
-        # Update progress bar based on output
-        for line in iter(install_process.stdout.readline, ""):
-            progress.update(task, advance=1, color="red")
-
-        # Wait for the process to complete
-        install_process.wait()
-
-        # Check if there were any errors
-    errors = install_process.stderr.read().strip()
-    if errors:
-        typer.secho(
-            f"Errors occurred during installation: {errors}", fg=typer.colors.RED
-        )
-    else:
-        typer.secho("Tailwind CSS installed successfully!", fg=typer.colors.GREEN)
-
-    sleep(DELAY_DURATION)
-
-    typer.secho("Creating Tailwind config file...", fg=typer.colors.GREEN)
-
-    source = Path(package_path.flask) / "tailwind_config.txt"
-    destination = project_dir / "tailwind.config.js"
+    output.step("Installing Tailwind CSS...")
+    try:
+        if get_settings().tailwind == "standalone":
+            link_binary(project_dir)
+        else:
+            _npm_install(project_dir, list(TAILWIND_PACKAGES))
+    except (ProcessError, ProcessTimeout, StoreError, StandaloneError) as e:
+        raise RuntimeError(f"Error installing Tailwind CSS: {e}")
+    output.step("Tailwind CSS installed successfully!")
+
+    output.step("Creating Tailwind config and input CSS files...")
+    variables = templates.project_variables(project_dir, "flask")
     try:
-        shutil.copyfile(source, destination)
+        templates.write_templates(project_dir, __name__, TAILWIND_FILES, variables)
+        templates.write_templates(
+            project_dir,
+            templates.COMMON,
+            {"static/src/input.css": "input_css.txt"},
+            variables,
+        )
     except Exception as e:
-        raise Exception(f"Failed to create base Flask file: {str(e)}")
+        raise Exception(f"Failed to create Tailwind files: {str(e)}")
 
-    sleep(DELAY_DURATION)
-
-    typer.secho("Creating file for input CSS", fg=typer.colors.GREEN)
-
-    static_dir = project_dir / "static"
-    (static_dir / "src").mkdir(exist_ok=True)
-    with open(static_dir / "src" / "input.css", "w") as f:
-        f.write(
-            """@tailwind base;
-@tailwind components;
-@tailwind utilities;
-"""
-        )
-    typer.secho("Completed tailwind config", fg=typer.colors.GREEN)
+    output.step("Completed tailwind config")
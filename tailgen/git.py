@@ -0,0 +1,288 @@
+"""Git repositories for generated projects, written without running git.
+
+A new repository is a few files: ``HEAD``, a config and empty object and
+ref directories. Its first commit is one blob per file, one tree per
+directory and a commit object (zlib-compressed loose objects), plus an index
+so that ``git status`` starts out clean. tailgen writes all of it directly
+rather than spawning ``git init``, ``git add`` and ``git commit``, and
+commits exactly the files it generated instead of scanning the project.
+Same files, same tree: the initial tree of two projects generated with the
+same options is identical.
+
+Only ``user.name``, ``user.email`` and ``init.defaultBranch`` are read from
+the system and global git config; with ``--git-cli`` the git command does
+everything instead. So it does for a repository that already has commits or
+staged files, whose tree and index are git's to merge with.
+"""
+
+import hashlib
+import os
+import re
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+# What git init names the branch when init.defaultBranch is not set
+DEFAULT_BRANCH = "master"
+COMMIT_MESSAGE = "Initial commit from tailgen"
+_ZERO_SHA = "0" * 40
+_CONFIG_HEADER = re.compile(r'^\[\s*([A-Za-z0-9.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+
+
+class GitError(RuntimeError):
+    """Raised when the repository cannot be written"""
+
+
+class Identity(NamedTuple):
+    name: str
+    email: str
+
+
+def _config_files() -> List[Path]:
+    if os.environ.get("GIT_CONFIG_GLOBAL"):
+        global_files = [Path(os.environ["GIT_CONFIG_GLOBAL"]).expanduser()]
+    else:
+        xdg = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+        global_files = [Path(xdg) / "git" / "config", Path.home() / ".gitconfig"]
+    system = os.environ.get("GIT_CONFIG_SYSTEM", "/etc/gitconfig")
+    if os.environ.get("GIT_CONFIG_NOSYSTEM"):
+        return global_files
+    return [Path(system), *global_files]
+
+
+def _config_value(text: str) -> str:
+    if text.startswith('"'):
+        quoted = re.match(r'"((?:[^"\\]|\\.)*)"', text)
+        if quoted:
+            return re.sub(r"\\(.)", r"\1", quoted.group(1))
+    return re.split(r"\s[#;]", text, maxsplit=1)[0].strip()
+
+
+def read_config() -> Dict[str, str]:
+    """``section.key`` values of the system and global config; later files win"""
+    values: Dict[str, str] = {}
+    for path in _config_files():
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except (OSError, UnicodeDecodeError):
+            continue
+        section = None
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith(("#", ";")):
+                continue
+            header = _CONFIG_HEADER.match(line)
+            if header:
+                section = header.group(1).lower()
+                if header.group(2) is not None:
+                    section += f".{header.group(2)}"
+                continue
+            key, equals, value = line.partition("=")
+            if section and equals:
+                values[f"{section}.{key.strip().lower()}"] = _config_value(
+                    value.strip()
+                )
+    return values
+
+
+def identity(role: str, config: Dict[str, str]) -> Identity:
+    """Who a commit is by, as git works it out (``role`` is AUTHOR or COMMITTER)"""
+    name = os.environ.get(f"GIT_{role}_NAME") or config.get("user.name")
+    email = (
+        os.environ.get(f"GIT_{role}_EMAIL")
+        or config.get("user.email")
+        or os.environ.get("EMAIL")
+    )
+    if not name or not email:
+        raise GitError(
+            "Git does not know who you are. Set user.name and user.email with "
+            "'git config --global', then commit the project yourself."
+        )
+    return Identity(name, email)
+
+
+def _timestamp() -> str:
+    """Now, or $SOURCE_DATE_EPOCH for reproducible commits, as git writes it"""
+    if os.environ.get("SOURCE_DATE_EPOCH"):
+        return f"{int(os.environ['SOURCE_DATE_EPOCH'])} +0000"
+    now = time.time()
+    offset = time.localtime(now).tm_gmtoff // 60
+    sign = "-" if offset < 0 else "+"
+    hours, minutes = divmod(abs(offset), 60)
+    return f"{int(now)} {sign}{hours:02d}{minutes:02d}"
+
+
+def init_repository(project_dir: Path) -> Path:
+    """Create an empty repository, as ``git init`` would; returns its .git"""
+    git_dir = Path(project_dir) / ".git"
+    if (git_dir / "HEAD").exists():
+        return git_dir
+    branch = read_config().get("init.defaultbranch", DEFAULT_BRANCH)
+    for directory in ("objects/info", "objects/pack", "refs/heads", "refs/tags"):
+        (git_dir / directory).mkdir(parents=True, exist_ok=True)
+    core = ["repositoryformatversion = 0", "bare = false", "logallrefupdates = true"]
+    if os.name == "nt":
+        core += ["filemode = false", "symlinks = false", "ignorecase = true"]
+    else:
+        core.append("filemode = true")
+    (git_dir / "config").write_text(
+        "[core]\n" + "".join(f"\t{line}\n" for line in core), encoding="utf-8"
+    )
+    # Written last: a HEAD means the repository is complete
+    (git_dir / "HEAD").write_text(f"ref: refs/heads/{branch}\n", encoding="utf-8")
+    return git_dir
+
+
+def has_history(project_dir: Path) -> bool:
+    """Whether the project's repository has commits or staged files already"""
+    git_dir = Path(project_dir) / ".git"
+    if (git_dir / "index").exists():
+        return True
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return False
+    if not head.startswith("ref: "):
+        return True  # detached at a commit
+    ref = head[len("ref: ") :]
+    if (git_dir / ref).exists():
+        return True
+    try:
+        packed = (git_dir / "packed-refs").read_text(encoding="utf-8")
+    except OSError:
+        return False
+    return any(line.split(" ")[-1] == ref for line in packed.splitlines())
+
+
+def _write_object(git_dir: Path, kind: str, data: bytes) -> bytes:
+    """Store a loose object; returns its binary SHA-1"""
+    raw = f"{kind} {len(data)}\0".encode() + data
+    digest = hashlib.sha1(raw).digest()
+    path = git_dir / "objects" / digest[:1].hex() / digest[1:].hex()
+    if not path.exists():
+        path.parent.mkdir(exist_ok=True)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}")
+        temporary.write_bytes(zlib.compress(raw))
+        os.replace(temporary, path)
+    return digest
+
+
+def _write_tree(git_dir: Path, directory: dict) -> bytes:
+    entries = []
+    for name, value in directory.items():
+        if isinstance(value, dict):
+            # Git orders a directory as if its name ended with a slash
+            entries.append((f"{name}/", b"40000", name, _write_tree(git_dir, value)))
+        else:
+            mode, digest = value
+            entries.append((name, b"%o" % mode, name, digest))
+    entries.sort(key=lambda entry: entry[0].encode())
+    return _write_object(
+        git_dir,
+        "tree",
+        b"".join(
+            mode + b" " + name.encode() + b"\0" + digest
+            for _, mode, name, digest in entries
+        ),
+    )
+
+
+def _index_entry(path: str, stat: os.stat_result, mode: int, digest: bytes) -> bytes:
+    name = path.encode()
+    fields = (
+        int(stat.st_ctime),
+        stat.st_ctime_ns % 1_000_000_000,
+        int(stat.st_mtime),
+        stat.st_mtime_ns % 1_000_000_000,
+        stat.st_dev,
+        stat.st_ino,
+        mode,
+        stat.st_uid,
+        stat.st_gid,
+        stat.st_size,
+    )
+    entry = struct.pack(
+        ">10I20sH",
+        *(field & 0xFFFFFFFF for field in fields),
+        digest,
+        min(len(name), 0xFFF),
+    )
+    entry += name
+    # NUL-terminated and padded to a multiple of eight bytes
+    return entry + b"\0" * (8 - len(entry) % 8)
+
+
+def _write_index(git_dir: Path, entries: List[bytes]) -> None:
+    data = b"DIRC" + struct.pack(">II", 2, len(entries)) + b"".join(entries)
+    temporary = git_dir / f".index.{os.getpid()}"
+    temporary.write_bytes(data + hashlib.sha1(data).digest())
+    os.replace(temporary, git_dir / "index")
+
+
+def commit_files(
+    project_dir: Path, paths: Sequence[str], message: str = COMMIT_MESSAGE
+) -> Optional[str]:
+    """Make these files of the project its repository's first commit.
+
+    Paths are relative to the project, with forward slashes; those that do
+    not exist are left out. Returns the commit's SHA-1, or None if there was
+    nothing to commit. A repository with history (see has_history) is
+    refused, as its tree and index would be replaced by these files.
+    """
+    project_dir = Path(project_dir)
+    config = read_config()
+    author = identity("AUTHOR", config)
+    committer = identity("COMMITTER", config)
+    if has_history(project_dir):
+        raise GitError(
+            f"{project_dir} already has commits or staged files; commit with git"
+        )
+    git_dir = init_repository(project_dir)
+    head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    ref = git_dir / head[len("ref: ") :]
+
+    root: dict = {}
+    index = {}
+    for path in sorted(set(paths), key=str.encode):
+        file = project_dir / path
+        if file.is_symlink() or not file.is_file():
+            continue
+        stat = file.stat()
+        executable = os.name != "nt" and stat.st_mode & 0o111
+        mode = 0o100755 if executable else 0o100644
+        digest = _write_object(git_dir, "blob", file.read_bytes())
+        *parents, name = path.split("/")
+        directory = root
+        for parent in parents:
+            directory = directory.setdefault(parent, {})
+        directory[name] = (mode, digest)
+        index[path] = _index_entry(path, stat, mode, digest)
+    if not index:
+        return None
+
+    tree = _write_tree(git_dir, root).hex()
+    when = _timestamp()
+    lines = [f"tree {tree}"]
+    lines.append(f"author {author.name} <{author.email}> {when}")
+    lines.append(f"committer {committer.name} <{committer.email}> {when}")
+    commit = _write_object(
+        git_dir, "commit", ("\n".join(lines) + f"\n\n{message}\n").encode()
+    ).hex()
+
+    _write_index(git_dir, [index[path] for path in sorted(index, key=str.encode)])
+    ref.parent.mkdir(parents=True, exist_ok=True)
+    temporary = ref.with_name(f".{ref.name}.{os.getpid()}")
+    temporary.write_text(f"{commit}\n", encoding="utf-8")
+    os.replace(temporary, ref)
+
+    reflog = (
+        f"{_ZERO_SHA} {commit} {committer.name} <{committer.email}> "
+        f"{when}\tcommit (initial): {message.splitlines()[0]}\n"
+    )
+    for log in (git_dir / "logs" / "HEAD", git_dir / "logs" / head[len("ref: ") :]):
+        log.parent.mkdir(parents=True, exist_ok=True)
+        with open(log, "a", encoding="utf-8") as file:
+            file.write(reflog)
+    return commit
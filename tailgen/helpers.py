@@ -1,20 +1,24 @@
 import json
 from pathlib import Path
-import subprocess
-import sys
 import os
-from collections import namedtuple
+from typing import List
 
-import typer
 from rich import print
 from rich.panel import Panel
 from rich.console import Console
 from rich.text import Text
 
+from tailgen import git, npm_store, output, templates
+from tailgen.process import ProcessError, ProcessTimeout, run_process
+from tailgen.settings import get_settings
+
+NPM_EXECUTABLE = "C:\\Program Files\\nodejs\\npm.cmd" if os.name == "nt" else "npm"
+GIT_TIMEOUT = 60
+
 console = Console()
 
 
-def setup_complete(framework: str):
+def setup_complete(framework: str, build_command: str = "tailgen build"):
     title_text = Text("🎉 Setup Complete!", justify="center")
     message_text = Text(
         f"\nYour TailwindCSS setup with {framework} is ready to go! 🚀\n",
@@ -23,12 +27,14 @@ def setup_complete(framework: str):
     )
     next_steps = f"""
     Next steps:
-    1. Build CSS from templates: npm run build 
+    1. Build CSS from templates: {build_command}
     2. Activate virtual environment
     3. Start the development server and see the magic.
     4. Customize your TailwindCSS config to suit your needs.
     5. Build something awesome!
     """
+    if get_settings().profile == "production":
+        next_steps += "    Serve in production: venv/bin/gunicorn -c gunicorn.conf.py\n"
 
     panel = Panel.fit(
         message_text + next_steps,
@@ -46,187 +52,106 @@ def _init_project_directory(project_path: Path, project_name: str) -> Path:
     return project_dir
 
 
-def _create_venv(project_dir_path: Path) -> None:
-    """Creates virtual environment"""
-    try:
-        venv_dir = project_dir_path / "venv"
-        subprocess.run([sys.executable, "-m", "venv", str(venv_dir)], check=True)
-
-        # Determine the path to the Python executable in the virtual environment
-        if os.name == "nt":  # Windows
-            python_executable = venv_dir / "Scripts" / "python"
-        else:  # POSIX (Linux, macOS, etc.)
-            python_executable = venv_dir / "bin" / "python"
-
-        # Ensure pip is installed in the virtual environment
-        subprocess.run([str(python_executable), "-m", "ensurepip"], check=True)
-
-    except subprocess.CalledProcessError:
-        raise Exception("Failed to create environment")
-
-
-def _get_setup_paths():
-    SetupPaths = namedtuple("SetupPaths", ["flask", "fastapi"])
-
-    if "__file__" in globals():
-        # Running from the source directory
-        package_path = os.path.dirname(os.path.abspath(__file__))
-        flask_setup_files = os.path.join(package_path, "flask_app", "setup_files")
-        fastapi_setup_files = os.path.join(package_path, "fastapi_app", "setup_files")
-    else:
-        # Running as an installed package
-        import pkg_resources
-
-        flask_setup_files = pkg_resources.resource_filename(
-            "tailgen.flask_app.setup_files", ""
-        )
-        fastapi_setup_files = pkg_resources.resource_filename(
-            "tailgen.fastapi_app.setup_files", ""
-        )
+def _npm_install(project_dir: Path, packages: List[str]) -> None:
+    """Install packages as dev dependencies of the project.
 
-    return SetupPaths(flask=flask_setup_files, fastapi=fastapi_setup_files)
+    node_modules is linked from tailgen's package store unless caching is
+    turned off, in which case npm itself does the install.
+    """
+    settings = get_settings()
+    if settings.use_cache:
+        tree = npm_store.install(project_dir, packages)
+        output.detail(f"Linked {len(tree)} packages from the package store")
+        return
+
+    args = [NPM_EXECUTABLE, "install", *packages, "--save-dev"]
+    if settings.offline:
+        # Use only what is already in npm's own cache
+        args.append("--offline")
+    run_process(
+        args,
+        cwd=project_dir,
+        on_stdout=output.detail,
+        on_stderr=output.detail,
+    )
 
 
 def _create_git_ignore(project_dir: Path) -> None:
     """create .gitignore file in project"""
     try:
-        with open(project_dir / ".gitignore", "w") as f:
-            f.write(
-                """.idea
-.ipynb_checkpoints
-node_modules
-.mypy_cache
-.vscode
-__pycache__
-.pytest_cache
-htmlcov
-dist
-site
-.coverage
-coverage.xml
-.netlify
-test.db
-log.txt
-Pipfile.lock
-env3.*
-env
-docs_build
-site_build
-venv
-docs.zip
-archive.zip
-
-# vim temporary files
-*~
-.*.sw?
-.cache
-
-# macOS
-.DS_Store
-"""
-            )
+        templates.write_templates(
+            project_dir,
+            templates.COMMON,
+            {".gitignore": "gitignore.txt"},
+            templates.project_variables(project_dir),
+        )
     except Exception as e:
-        typer.secho(f"Failed to create .gitignore file: {e}")
+        raise RuntimeError(f"Failed to create .gitignore file: {e}")
 
 
 def _git_init(project_dir: Path) -> None:
     """Initialize project as git repo"""
+    if not get_settings().git_cli:
+        try:
+            git_dir = git.init_repository(project_dir)
+        except OSError as e:
+            raise RuntimeError(f"Failed to initialize git repository: {e}")
+        output.step(f"Initialized empty Git repository in {git_dir.resolve()}")
+        return
     try:
         # Ensure project_dir is a string path compatible with the OS
-        result = subprocess.run(
-            ["git", "init", str(project_dir)],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-            check=True,  # Raises CalledProcessError if git init fails
-        )
+        result = run_process(["git", "init", str(project_dir)], timeout=GIT_TIMEOUT)
 
         # Optionally, print the output for debugging purposes
-        typer.secho(result.stdout, fg=typer.colors.GREEN)
+        output.step("\n".join(result.stdout))
 
-    except subprocess.CalledProcessError as e:
-        typer.secho(
-            f"Failed to initialize git repository: {e.stderr}", fg=typer.colors.RED
-        )
-    except Exception as e:
-        typer.secho(f"Unexpected error: {e}", fg=typer.colors.RED)
+    except (ProcessError, ProcessTimeout) as e:
+        raise RuntimeError(f"Failed to initialize git repository: {e}")
 
 
-def _create_readme(project_dir: Path) -> None:
-    """Create default readme file for project"""
+def _git_commit(project_dir: Path, paths: List[str]) -> None:
+    """Commit the generated files, as the first commit of a new repository"""
     try:
-        with open(project_dir / "README.md", "w") as f:
-            f.write(
-                """# Project Title
-
-Simple overview of use/purpose.
-
-## Description
-
-An in-depth paragraph about your project and overview of use.
-
-## Getting Started
-
-### Dependencies
-
-* Describe any prerequisites, libraries, OS version, etc., needed before installing program.
-* ex. Windows 10
-
-### Installing
-
-* How/where to download your program
-* Any modifications needed to be made to files/folders
-
-### Executing program
-
-* How to run the program
-* Step-by-step bullets
-```
-code blocks for commands
-```
-
-## Help
-
-Any advise for common problems or issues.
-```
-command to run if program contains helper info
-```
-
-## Authors
-
-Contributors names and contact info
-
-ex. Dominique Pizzie  
-ex. [@DomPizzie](https://twitter.com/dompizzie)
-
-## Version History
-
-* 0.2
-    * Various bug fixes and optimizations
-    * See [commit change]() or See [release history]()
-* 0.1
-    * Initial Release
-
-## License
-
-This project is licensed under the [NAME HERE] License - see the LICENSE.md file for details
-
-## Acknowledgments
-
-Inspiration, code snippets, etc.
-"""
+        # git merges into an existing history; tailgen only writes first commits
+        if get_settings().git_cli or git.has_history(project_dir):
+            existing = [path for path in paths if (project_dir / path).is_file()]
+            run_process(
+                ["git", "add", "--", *existing], cwd=project_dir, timeout=GIT_TIMEOUT
             )
+            run_process(
+                ["git", "commit", "--quiet", "-m", git.COMMIT_MESSAGE],
+                cwd=project_dir,
+                timeout=GIT_TIMEOUT,
+            )
+        elif git.commit_files(project_dir, paths) is None:
+            return
+        output.step(f"Committed the generated files: {git.COMMIT_MESSAGE}")
+    except (ProcessError, ProcessTimeout, git.GitError, OSError) as e:
+        raise RuntimeError(f"Failed to commit the generated files: {e}")
+
 
+def _create_readme(project_dir: Path) -> None:
+    """Create default readme file for project"""
+    try:
+        templates.write_templates(
+            project_dir,
+            templates.COMMON,
+            {"README.md": "readme.txt"},
+            templates.project_variables(project_dir),
+        )
     except Exception as e:
-        typer.secho(f"Failed to create readme file: {e}", fg=typer.colors.RED)
+        raise RuntimeError(f"Failed to create readme file: {e}")
 
 
 def update_package_json_with_build_script(project_dir: Path):
     package_json_path = project_dir / "package.json"
 
     try:
+        # The manifest of an earlier `tailgen build` would keep the app on the
+        # CSS of that build; without it the app serves output.css itself
         build_cmd = (
-            "npx tailwindcss -i ./static/src/input.css -o ./static/dist/css/output.css"
+            "node -e \"require('fs').rmSync('static/dist/manifest.json', {force: true})\""
+            " && npx tailwindcss -i ./static/src/input.css -o ./static/dist/css/output.css"
         )
         with open(package_json_path, "r", encoding="utf-8") as file:
             package_json = json.load(file)
@@ -239,6 +164,6 @@ def update_package_json_with_build_script(project_dir: Path):
         with open(package_json_path, "w", encoding="utf-8") as file:
             json.dump(package_json, file, indent=2)
 
-        typer.secho("Build script added to package.json", fg=typer.colors.GREEN)
+        output.step("Build script added to package.json")
     except Exception as error:
-        typer.secho(f"Error updating package.json: {error}", fg=typer.colors.RED)
+        raise RuntimeError(f"Error updating package.json: {error}")
@@ -0,0 +1,118 @@
+"""Checkpoint journal that makes ``tailgen init`` resumable.
+
+Each project keeps ``.tailgen/journal.json`` with the steps that completed,
+each with a fingerprint of its inputs. When init runs again over the same
+directory, a step is skipped if its fingerprint still matches, the files it
+produces are still there and nothing it depends on had to run again.
+Everything else - the step that failed, steps that never ran, steps made
+stale by a different framework or tailgen version - runs as usual.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from tailgen import FRAMEWORK_REQUIREMENTS, __version__, output
+from tailgen.cache import cache_key
+from tailgen.settings import get_settings
+
+JOURNAL_PATH = Path(".tailgen") / "journal.json"
+JOURNAL_VERSION = 1
+
+
+def read_journal(project_dir: Path) -> Optional[dict]:
+    try:
+        journal = json.loads((project_dir / JOURNAL_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(journal, dict) or journal.get("version") != JOURNAL_VERSION:
+        return None
+    return journal
+
+
+class Journal:
+    """The checkpoints of one project directory"""
+
+    def __init__(self, project_dir: Path, framework: str):
+        self.project_dir = Path(project_dir)
+        self.framework = framework
+        journal = read_journal(self.project_dir) or {}
+        self._steps: Dict[str, dict] = journal.get("steps", {})
+        self._ran: set = set()
+        self._lock = threading.Lock()
+
+    def fingerprint(self, name: str) -> str:
+        """What a step's result depends on besides the steps it requires"""
+        settings = get_settings()
+        return cache_key(
+            name,
+            self.framework,
+            __version__,
+            list(FRAMEWORK_REQUIREMENTS[self.framework]),
+            settings.use_cache,
+            settings.tailwind,
+            settings.profile,
+            settings.offline,
+            settings.git_cli,
+        )
+
+    def is_complete(
+        self, name: str, outputs: Sequence[str], requires: Sequence[str] = ()
+    ) -> bool:
+        entry = self._steps.get(name)
+        return (
+            entry is not None
+            and entry.get("fingerprint") == self.fingerprint(name)
+            and not self._ran.intersection(requires)
+            and all((self.project_dir / path).exists() for path in outputs)
+        )
+
+    def record(self, name: str) -> None:
+        with self._lock:
+            self._ran.add(name)
+            self._steps[name] = {
+                "fingerprint": self.fingerprint(name),
+                "completed_at": time.time(),
+            }
+            self._save()
+
+    def _save(self) -> None:
+        path = self.project_dir / JOURNAL_PATH
+        # Nothing to checkpoint before the project directory exists
+        if not self.project_dir.is_dir():
+            return
+        path.parent.mkdir(exist_ok=True)
+        journal = {
+            "version": JOURNAL_VERSION,
+            "tailgen": __version__,
+            "framework": self.framework,
+            "tailwind": get_settings().tailwind,
+            "profile": get_settings().profile,
+            "commit": get_settings().commit,
+            "steps": self._steps,
+        }
+        temporary = path.with_name(f".{path.name}.{os.getpid()}")
+        temporary.write_text(json.dumps(journal, indent=2), encoding="utf-8")
+        os.replace(temporary, path)
+
+    def step(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        outputs: Sequence[str],
+        requires: Sequence[str] = (),
+    ) -> Callable[..., Any]:
+        """Wrap a step so it is skipped when complete and recorded when done"""
+
+        def run(*args, **kwargs):
+            if self.is_complete(name, outputs, requires):
+                output.detail(f"Already done in an earlier run, skipping {name}")
+                return None
+            result = func(*args, **kwargs)
+            self.record(name)
+            return result
+
+        return run
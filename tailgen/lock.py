@@ -0,0 +1,143 @@
+"""Hash-pinned dependency locks for each framework.
+
+A lock lists every package a framework needs at an exact version with its
+sha256, for one interpreter and platform: the wheels, and so the hashes,
+differ between Python versions, CPUs and glibc and musl Linux. Installing
+from it with ``--no-deps --require-hashes`` skips pip's resolver entirely and
+gives the same environment every time. Locks shipped with tailgen are used
+only where their tag matches exactly; for other interpreters or platforms one
+is resolved once and kept in the cache. ``tailgen lock`` regenerates them.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import sys
+import sysconfig
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlparse
+
+from tailgen import FRAMEWORK_REQUIREMENTS
+from tailgen.cache import cache_dir
+from tailgen.process import run_process
+
+SHIPPED_LOCKS_DIR = Path(__file__).parent / "locks"
+PROJECT_LOCK_NAME = "requirements.lock"
+
+
+def _platform_tag() -> str:
+    """The platform wheels are picked for, telling glibc and musl Linux apart"""
+    name = sysconfig.get_platform()
+    if name.startswith("linux-"):
+        machine = name.split("-", 1)[1]
+        if machine == "x86_64" and sys.maxsize <= 2**32:
+            machine = "i686"
+        libc = "manylinux" if platform.libc_ver()[0] == "glibc" else "musllinux"
+        return f"{libc}_{machine}"
+    return name.replace("-", "_").replace(".", "_")
+
+
+def lock_tag() -> str:
+    """Interpreter and platform a lock is valid for, e.g. cp311-manylinux_x86_64"""
+    abiflags = sysconfig.get_config_var("abiflags") or ""
+    major, minor = sys.version_info[:2]
+    interpreter = f"{sys.implementation.name[:2]}{major}{minor}{abiflags}"
+    return f"{interpreter}-{_platform_tag()}"
+
+
+def lock_name(framework: str) -> str:
+    return f"{framework}-{lock_tag()}.lock"
+
+
+def find_lock(framework: str) -> Optional[Path]:
+    """The lock to install a framework from, preferring a regenerated one"""
+    for directory in (cache_dir() / "locks", SHIPPED_LOCKS_DIR):
+        path = directory / lock_name(framework)
+        if path.is_file():
+            return path
+    return None
+
+
+def _normalize(name: str) -> str:
+    return name.lower().replace("_", "-").replace(".", "-")
+
+
+def _sha256(item: dict) -> str:
+    archive_info = item["download_info"].get("archive_info", {})
+    if "sha256" in archive_info.get("hashes", {}):
+        return archive_info["hashes"]["sha256"]
+    if archive_info.get("hash", "").startswith("sha256="):
+        return archive_info["hash"][len("sha256=") :]
+
+    # Wheels found in a local directory come without a hash; compute it
+    url = urlparse(item["download_info"]["url"])
+    if url.scheme != "file":
+        raise RuntimeError(f"pip reported no hash for {url.geturl()}")
+    return hashlib.sha256(Path(unquote(url.path)).read_bytes()).hexdigest()
+
+
+def _format_lock(framework: str, pins: Dict[str, tuple]) -> str:
+    lines = [
+        f"# Generated by 'tailgen lock' for {framework} ({lock_tag()}). Do not edit.",
+        f"# Requirements: {' '.join(FRAMEWORK_REQUIREMENTS[framework])}",
+    ]
+    for name in sorted(pins):
+        version, sha256 = pins[name]
+        lines.append(f"{name}=={version} \\")
+        lines.append(f"    --hash=sha256:{sha256}")
+    return "\n".join(lines) + "\n"
+
+
+def resolve_lock(
+    framework: str, source: Optional[Path] = None, destination: Optional[Path] = None
+) -> Path:
+    """Resolve a framework's requirements once and write them out as a lock.
+
+    Resolution uses this interpreter's pip, against the package index or only
+    the wheels in ``source``. The lock goes to the cache unless a destination
+    directory is given.
+    """
+    with tempfile.TemporaryDirectory() as temporary:
+        report_path = Path(temporary) / "report.json"
+        args = [sys.executable, "-m", "pip", "install", "--dry-run"]
+        args += ["--ignore-installed", "--disable-pip-version-check"]
+        args += ["--report", report_path]
+        if source is not None:
+            args += ["--no-index", "--find-links", Path(source).resolve()]
+        run_process([*args, *FRAMEWORK_REQUIREMENTS[framework]])
+        report = json.loads(report_path.read_text(encoding="utf-8"))
+
+    pins = {
+        _normalize(item["metadata"]["name"]): (
+            item["metadata"]["version"],
+            _sha256(item),
+        )
+        for item in report["install"]
+    }
+
+    directory = Path(destination) if destination else cache_dir() / "locks"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / lock_name(framework)
+    # Write then rename, so concurrent runs never read half a lock
+    temporary = path.with_name(f".{path.name}.{os.getpid()}")
+    temporary.write_text(_format_lock(framework, pins), encoding="utf-8")
+    os.replace(temporary, path)
+    return path
+
+
+def lock_install_args(lock: Path) -> List[str]:
+    """``pip install`` arguments that install exactly what a lock pins"""
+    return ["--no-deps", "--require-hashes", "-r", str(lock)]
+
+
+def write_project_lock(project_dir: Path, framework: str) -> bool:
+    """Copy the framework's lock into a generated project, if there is one"""
+    lock = find_lock(framework)
+    if lock is None:
+        return False
+    shutil.copyfile(lock, project_dir / PROJECT_LOCK_NAME)
+    return True
@@ -0,0 +1,619 @@
+"""Content-addressed store for npm packages.
+
+Instead of running ``npm install`` per project, each package tarball is
+fetched once, checked against its integrity hash and unpacked into the cache
+under that hash. A project's ``node_modules`` is then assembled from the
+store with hardlinks (as pnpm does), and ``package.json`` and
+``package-lock.json`` are written to match, so ``npm ci`` would produce the
+same tree.
+
+Packages come from the npm registry (``npm_config_registry`` or the public
+one) or, when ``TAILGEN_NPM_SOURCE`` names a directory, from the ``.tgz``
+files in it. Resolutions are remembered too, so a populated store works
+offline; online, one older than ``RESOLUTION_MAX_AGE`` is made again, so
+new releases are picked up.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tarfile
+import time
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from tailgen.cache import FileLock, cache_dir, cache_key, clone_tree
+from tailgen.settings import get_settings
+
+SOURCE_ENV = "TAILGEN_NPM_SOURCE"
+DEFAULT_REGISTRY = "https://registry.npmjs.org"
+REQUEST_TIMEOUT = 60
+# A saved resolution is used without asking the registry for this many seconds
+RESOLUTION_MAX_AGE = 24 * 60 * 60
+_COMPLETE_MARKER = ".tailgen-complete"
+
+_NODE_PLATFORMS = {"win32": "win32", "darwin": "darwin"}
+_NODE_ARCHS = {"x86_64": "x64", "amd64": "x64", "aarch64": "arm64", "arm64": "arm64"}
+
+
+class StoreError(RuntimeError):
+    """Raised when a package cannot be resolved, fetched or verified"""
+
+
+# --- Versions and ranges -----------------------------------------------------
+# Enough of node-semver for the ranges found in real package.json files:
+# x-ranges, ^, ~, comparators, hyphen ranges and ||.
+
+_VERSION = re.compile(
+    r"^\s*v?(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?\s*$"
+)
+_PARTIAL = re.compile(
+    r"^v?(\d+|[xX*])?(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?"
+    r"(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$"
+)
+
+
+def _prerelease_key(prerelease: Optional[str]) -> tuple:
+    if not prerelease:
+        return (1,)
+    parts = tuple(
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in prerelease.split(".")
+    )
+    return (0, parts)
+
+
+def parse_version(text: str) -> Optional[tuple]:
+    """Sortable key of an exact version, or None if it isn't one"""
+    match = _VERSION.match(text)
+    if not match:
+        return None
+    major, minor, patch, prerelease = match.groups()
+    return (int(major), int(minor), int(patch), _prerelease_key(prerelease))
+
+
+def _floor(major, minor=0, patch=0) -> tuple:
+    """Key below every version, prereleases included, of major.minor.patch"""
+    return (major, minor, patch, (0, ((0, 0, ""),)))
+
+
+def _comparators(text: str) -> List[Tuple[str, tuple]]:
+    """Translate one comparator (``^1.2``, ``>=3``, ``1.x``...) into bounds"""
+    match = re.match(r"^(\^|~>?|>=|<=|>|<|=)?\s*(.*)$", text)
+    operator, rest = match.group(1) or "", match.group(2)
+    partial = _PARTIAL.match(rest)
+    if not partial:
+        raise ValueError(f"Invalid version range: {text}")
+    wild = lambda part: part is None or part in ("x", "X", "*")  # noqa: E731
+    raw_major, raw_minor, raw_patch, prerelease = partial.groups()
+    if wild(raw_major):
+        # "*", "x" or "" match everything; "<*" and ">*" match nothing
+        if operator in ("<", ">"):
+            return [("<", _floor(0))]
+        return []
+    major = int(raw_major)
+    minor = None if wild(raw_minor) else int(raw_minor)
+    patch = None if wild(raw_patch) or minor is None else int(raw_patch)
+    exact = (major, minor or 0, patch or 0, _prerelease_key(prerelease))
+
+    if operator in ("", "="):
+        if minor is None:
+            return [(">=", _floor(major)), ("<", _floor(major + 1))]
+        if patch is None:
+            return [(">=", _floor(major, minor)), ("<", _floor(major, minor + 1))]
+        return [("=", exact)]
+    if operator == "^":
+        if major > 0 or minor is None:
+            upper = _floor(major + 1)
+        elif minor > 0 or patch is None:
+            upper = _floor(0, minor + 1)
+        else:
+            upper = _floor(0, 0, patch + 1)
+        return [(">=", exact), ("<", upper)]
+    if operator in ("~", "~>"):
+        upper = _floor(major + 1) if minor is None else _floor(major, minor + 1)
+        return [(">=", exact), ("<", upper)]
+    if operator == ">":
+        if minor is None:
+            return [(">=", _floor(major + 1))]
+        if patch is None:
+            return [(">=", _floor(major, minor + 1))]
+        return [(">", exact)]
+    if operator == "<":
+        return [("<", exact if patch is not None else _floor(major, minor or 0))]
+    if operator == "<=":
+        if minor is None:
+            return [("<", _floor(major + 1))]
+        if patch is None:
+            return [("<", _floor(major, minor + 1))]
+        return [("<=", exact)]
+    return [(">=", exact)]  # ">="
+
+
+def _parse_range(text: str) -> List[List[Tuple[str, tuple]]]:
+    alternatives = []
+    for part in (text or "*").split("||"):
+        part = re.sub(r"(\^|~>?|>=|<=|>|<|=)\s+", r"\1", part.strip())
+        hyphen = re.match(r"^(\S+)\s+-\s+(\S+)$", part)
+        if hyphen:
+            comparators = _comparators(">=" + hyphen.group(1))
+            comparators += _comparators("<=" + hyphen.group(2))
+        else:
+            comparators = []
+            for token in part.split():
+                comparators += _comparators(token)
+        alternatives.append(comparators)
+    return alternatives
+
+
+def satisfies(version: str, range_text: str) -> bool:
+    key = parse_version(version)
+    if key is None:
+        return False
+    try:
+        alternatives = _parse_range(range_text)
+    except ValueError:
+        return False
+    checks = {
+        "=": lambda a, b: a == b,
+        ">": lambda a, b: a > b,
+        ">=": lambda a, b: a >= b,
+        "<": lambda a, b: a < b,
+        "<=": lambda a, b: a <= b,
+    }
+    for comparators in alternatives:
+        if not all(checks[op](key, bound) for op, bound in comparators):
+            continue
+        # Prereleases only match ranges that name a prerelease of that version
+        if key[3] != (1,) and not any(
+            bound[:3] == key[:3] and bound[3] != (1,) and op != "<"
+            for op, bound in comparators
+        ):
+            continue
+        return True
+    return False
+
+
+# --- Package sources ----------------------------------------------------------
+
+
+class PackageVersion(NamedTuple):
+    name: str
+    version: str
+    manifest: dict
+    tarball: str  # URL or local path
+    integrity: str
+
+
+def _integrity(data: bytes) -> str:
+    return "sha512-" + base64.b64encode(hashlib.sha512(data).digest()).decode()
+
+
+def _read_manifest(tarball: bytes) -> dict:
+    with tarfile.open(fileobj=io.BytesIO(tarball), mode="r:gz") as archive:
+        for member in archive:
+            parts = member.name.split("/")
+            if len(parts) == 2 and parts[1] == "package.json":
+                return json.load(archive.extractfile(member))
+    raise StoreError("Tarball has no package.json")
+
+
+class TarballDirectory:
+    """A directory of ``npm pack`` tarballs standing in for the registry"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._packages: Optional[Dict[str, Dict[str, PackageVersion]]] = None
+
+    @property
+    def id(self) -> str:
+        return f"dir:{self.path.resolve()}"
+
+    def versions(self, name: str) -> Dict[str, PackageVersion]:
+        if self._packages is None:
+            self._packages = {}
+            for tarball in sorted(self.path.glob("*.tgz")):
+                data = tarball.read_bytes()
+                manifest = _read_manifest(data)
+                package = PackageVersion(
+                    manifest["name"],
+                    manifest["version"],
+                    manifest,
+                    str(tarball.resolve()),
+                    _integrity(data),
+                )
+                self._packages.setdefault(package.name, {})[package.version] = package
+        return self._packages.get(name, {})
+
+    def latest(self, name: str) -> Optional[str]:
+        return None
+
+    def fetch(self, package: PackageVersion) -> bytes:
+        return Path(package.tarball).read_bytes()
+
+    def resolved_url(self, package: PackageVersion) -> str:
+        return Path(package.tarball).as_uri()
+
+
+class Registry:
+    """The npm registry HTTP API"""
+
+    def __init__(self, url: str = DEFAULT_REGISTRY):
+        self.url = url.rstrip("/")
+        self._packuments: Dict[str, dict] = {}
+
+    @property
+    def id(self) -> str:
+        return self.url
+
+    def _packument(self, name: str) -> dict:
+        if name not in self._packuments:
+            request = urllib.request.Request(
+                f"{self.url}/{urllib.parse.quote(name, safe='@')}",
+                headers={"Accept": "application/vnd.npm.install-v1+json"},
+            )
+            try:
+                with urllib.request.urlopen(
+                    request, timeout=REQUEST_TIMEOUT
+                ) as response:
+                    self._packuments[name] = json.load(response)
+            except OSError as e:
+                raise StoreError(f"Could not fetch {name} from {self.url}: {e}")
+        return self._packuments[name]
+
+    def versions(self, name: str) -> Dict[str, PackageVersion]:
+        return {
+            version: PackageVersion(
+                name,
+                version,
+                manifest,
+                manifest["dist"]["tarball"],
+                manifest["dist"].get("integrity", ""),
+            )
+            for version, manifest in self._packument(name).get("versions", {}).items()
+        }
+
+    def latest(self, name: str) -> Optional[str]:
+        return self._packument(name).get("dist-tags", {}).get("latest")
+
+    def fetch(self, package: PackageVersion) -> bytes:
+        try:
+            with urllib.request.urlopen(
+                package.tarball, timeout=REQUEST_TIMEOUT
+            ) as response:
+                return response.read()
+        except OSError as e:
+            raise StoreError(f"Could not download {package.tarball}: {e}")
+
+    def resolved_url(self, package: PackageVersion) -> str:
+        return package.tarball
+
+
+def default_source():
+    source = os.environ.get(SOURCE_ENV)
+    if source and "://" not in source:
+        return TarballDirectory(Path(source).expanduser())
+    return Registry(source or os.environ.get("npm_config_registry") or DEFAULT_REGISTRY)
+
+
+# --- Resolution ---------------------------------------------------------------
+
+
+def _split_spec(spec: str) -> Tuple[str, str]:
+    """``tailwindcss@^3`` -> (``tailwindcss``, ``^3``)"""
+    at = spec.find("@", 1)
+    if at == -1:
+        return spec, ""
+    return spec[:at], spec[at + 1 :]
+
+
+def _supported_here(manifest: dict) -> bool:
+    """Whether a package's ``os``/``cpu`` fields allow this machine"""
+    system = _NODE_PLATFORMS.get(sys.platform, "linux")
+    machine = _NODE_ARCHS.get(platform.machine().lower())
+    for field, value in (("os", system), ("cpu", machine)):
+        allowed = manifest.get(field)
+        if not allowed or value is None:
+            continue
+        if f"!{value}" in allowed:
+            return False
+        if any(not item.startswith("!") for item in allowed) and value not in allowed:
+            return False
+    return True
+
+
+def _pick(source, name: str, range_text: str) -> Optional[PackageVersion]:
+    versions = source.versions(name)
+    if not range_text or range_text == "latest":
+        latest = source.latest(name)
+        if latest in versions:
+            return versions[latest]
+        range_text = "*"
+    matching = [v for v in versions if satisfies(v, range_text)]
+    if not matching:
+        return None
+    return versions[max(matching, key=parse_version)]
+
+
+def resolve(source, specs: Sequence[str]) -> Dict[str, dict]:
+    """Resolve specs into a hoisted tree keyed by install path.
+
+    Each package goes as high up ``node_modules`` as it can without clashing
+    with another version, as npm does. The result has the shape of the
+    ``packages`` section of a version 3 ``package-lock.json``.
+    """
+    tree: Dict[str, dict] = {}
+    queue = []
+    for spec in specs:
+        name, range_text = _split_spec(spec)
+        queue.append(("", name, range_text, False))
+
+    while queue:
+        parent, name, range_text, optional = queue.pop(0)
+
+        # Node looks in parent/node_modules, then each ancestor's, then the top
+        location = None
+        ancestor = parent
+        while location is None:
+            candidate = f"{ancestor}/node_modules/{name}".lstrip("/")
+            if candidate in tree:
+                location = candidate
+            elif not ancestor:
+                break
+            elif "/node_modules/" in ancestor:
+                ancestor = ancestor.rsplit("/node_modules/", 1)[0]
+            else:
+                ancestor = ""
+        if location and satisfies(tree[location]["version"], range_text or "*"):
+            continue
+
+        package = _pick(source, name, range_text)
+        if package is None or not _supported_here(package.manifest):
+            if optional:
+                continue
+            raise StoreError(f"No version of {name} matches '{range_text or '*'}'")
+
+        # Hoist to the top unless another version is visible from the parent
+        if location is None:
+            path = f"node_modules/{name}"
+        elif parent:
+            path = f"{parent}/node_modules/{name}"
+        else:
+            raise StoreError(f"Conflicting requirements for {name}")
+        manifest = package.manifest
+        tree[path] = {
+            "version": package.version,
+            "resolved": source.resolved_url(package),
+            "integrity": package.integrity,
+            "dev": True,
+        }
+        for field in ("dependencies", "optionalDependencies", "bin", "engines"):
+            if manifest.get(field):
+                tree[path][field] = manifest[field]
+        if isinstance(tree[path].get("bin"), str):
+            tree[path]["bin"] = {name.split("/")[-1]: tree[path]["bin"]}
+
+        optional_names = set(manifest.get("optionalDependencies", {}))
+        peers_meta = manifest.get("peerDependenciesMeta", {})
+        children = dict(manifest.get("peerDependencies", {}))
+        children.update(manifest.get("dependencies", {}))
+        children.update(manifest.get("optionalDependencies", {}))
+        for child, child_range in sorted(children.items()):
+            is_optional = child in optional_names or peers_meta.get(child, {}).get(
+                "optional", False
+            )
+            queue.append((path, child, child_range, is_optional))
+    return tree
+
+
+# --- Store --------------------------------------------------------------------
+
+
+def store_dir() -> Path:
+    return cache_dir() / "npm"
+
+
+def _package_dir(integrity: str) -> Path:
+    digest = hashlib.sha256(integrity.encode("utf-8")).hexdigest()
+    return store_dir() / "packages" / digest[:2] / digest
+
+
+def _extract(data: bytes, destination: Path) -> None:
+    """Unpack a tarball, dropping its top directory (usually ``package/``)"""
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as archive:
+        for member in archive:
+            parts = Path(member.name).parts[1:]
+            if not parts or ".." in parts or member.name.startswith("/"):
+                continue
+            target = destination.joinpath(*parts)
+            if member.isdir():
+                target.mkdir(parents=True, exist_ok=True)
+            elif member.isfile():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with archive.extractfile(member) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                # Store files are shared by hardlink; make scripts executable once
+                os.chmod(target, 0o755 if member.mode & 0o111 else 0o644)
+
+
+def _verify(package_name: str, data: bytes, integrity: str) -> None:
+    algorithm, _, expected = integrity.partition("-")
+    if algorithm not in hashlib.algorithms_guaranteed:
+        raise StoreError(f"Unsupported integrity for {package_name}: {integrity}")
+    actual = base64.b64encode(hashlib.new(algorithm, data).digest()).decode()
+    if actual != expected:
+        raise StoreError(f"Integrity check failed for {package_name}")
+
+
+def _ensure_in_store(source, path: str, entry: dict) -> Path:
+    """The store directory holding a package, fetching it if necessary"""
+    directory = _package_dir(entry["integrity"])
+    if (directory / _COMPLETE_MARKER).exists():
+        return directory
+    if source is None:
+        raise StoreError(f"{path} is not in the package store; run once online")
+
+    name = path.rsplit("node_modules/", 1)[-1]
+    package = PackageVersion(
+        name, entry["version"], {}, _tarball_location(entry), entry["integrity"]
+    )
+    data = source.fetch(package)
+    _verify(name, data, entry["integrity"])
+    with FileLock(directory.with_name(directory.name + ".lock")):
+        if not (directory / _COMPLETE_MARKER).exists():
+            shutil.rmtree(directory, ignore_errors=True)
+            _extract(data, directory)
+            (directory / _COMPLETE_MARKER).touch()
+    return directory
+
+
+def _tarball_location(entry: dict) -> str:
+    resolved = entry["resolved"]
+    if resolved.startswith("file:"):
+        return urllib.request.url2pathname(urllib.parse.urlparse(resolved).path)
+    return resolved
+
+
+def _resolution_path(source_id: str, specs: Sequence[str]) -> Path:
+    return store_dir() / "resolutions" / f"{cache_key(source_id, list(specs))}.json"
+
+
+def _load_resolution(source_id: str, specs: Sequence[str]) -> Optional[Dict[str, dict]]:
+    try:
+        return json.loads(
+            _resolution_path(source_id, specs).read_text(encoding="utf-8")
+        )
+    except (OSError, ValueError):
+        return None
+
+
+def _resolution_expired(source_id: str, specs: Sequence[str]) -> bool:
+    try:
+        saved = _resolution_path(source_id, specs).stat().st_mtime
+    except OSError:
+        return True
+    return time.time() - saved > RESOLUTION_MAX_AGE
+
+
+def _save_resolution(
+    source_id: str, specs: Sequence[str], tree: Dict[str, dict]
+) -> None:
+    path = _resolution_path(source_id, specs)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}")
+    temporary.write_text(json.dumps(tree, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(temporary, path)
+
+
+# --- Projects -----------------------------------------------------------------
+
+
+def _link_bins(node_modules: Path, tree: Dict[str, dict]) -> None:
+    bin_dir = node_modules / ".bin"
+    for path, entry in tree.items():
+        if path.count("node_modules/") != 1 or not entry.get("bin"):
+            continue
+        package = path[len("node_modules/") :]
+        for command, script in entry["bin"].items():
+            bin_dir.mkdir(exist_ok=True)
+            target = Path("..", package, script)
+            link = bin_dir / command
+            if os.name == "nt":
+                link.with_suffix(".cmd").write_text(
+                    f'@node "%~dp0\\{target}" %*\r\n', encoding="utf-8"
+                )
+                continue
+            if link.is_symlink() or link.exists():
+                link.unlink()
+            os.symlink(target, link)
+
+
+def _write_package_files(
+    project_dir: Path, specs: Sequence[str], tree: Dict[str, dict]
+) -> None:
+    package_json_path = project_dir / "package.json"
+    try:
+        package_json = json.loads(package_json_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        package_json = {}
+
+    dev_dependencies = package_json.setdefault("devDependencies", {})
+    for spec in specs:
+        name, range_text = _split_spec(spec)
+        if not range_text or range_text == "latest":
+            # npm install --save-dev records a caret range on what it picked
+            range_text = f"^{tree[f'node_modules/{name}']['version']}"
+        dev_dependencies[name] = range_text
+    package_json["devDependencies"] = dict(sorted(dev_dependencies.items()))
+    package_json_path.write_text(
+        json.dumps(package_json, indent=2) + "\n", encoding="utf-8"
+    )
+
+    root = {"name": package_json.get("name", project_dir.name)}
+    root["devDependencies"] = package_json["devDependencies"]
+    package_lock = {
+        "name": root["name"],
+        "lockfileVersion": 3,
+        "requires": True,
+        "packages": {"": root, **dict(sorted(tree.items()))},
+    }
+    (project_dir / "package-lock.json").write_text(
+        json.dumps(package_lock, indent=2) + "\n", encoding="utf-8"
+    )
+
+
+def fetch(specs: Sequence[str], source=None) -> Dict[str, dict]:
+    """Resolve the specs and make sure every package of the tree is in the store.
+
+    Runs under a lock per resolution, so a second caller (another project of
+    a batch, or ``init``'s prefetch) waits for the first instead of
+    downloading the same tarballs again.
+    """
+    offline = get_settings().offline
+    source = source or default_source()
+    resolution = _resolution_path(source.id, specs)
+    with FileLock(resolution.with_suffix(".lock")):
+        tree = _load_resolution(source.id, specs)
+        if tree is None and offline:
+            raise StoreError(
+                f"No cached resolution for {' '.join(specs)}; run once online first"
+            )
+        if tree is None or (not offline and _resolution_expired(source.id, specs)):
+            try:
+                tree = resolve(source, specs)
+            except StoreError:
+                if tree is None:
+                    raise
+                # The registry is unreachable; the saved resolution still works
+            else:
+                _save_resolution(source.id, specs, tree)
+        for path, entry in tree.items():
+            _ensure_in_store(None if offline else source, path, entry)
+    return tree
+
+
+def install(project_dir: Path, specs: Sequence[str], source=None) -> Dict[str, dict]:
+    """Materialise ``node_modules`` for the specs from the store.
+
+    Returns the installed tree, keyed by path as in ``package-lock.json``.
+    """
+    tree = fetch(specs, source)
+    node_modules = project_dir / "node_modules"
+    for path, entry in sorted(tree.items()):
+        package_dir = _package_dir(entry["integrity"])
+        destination = project_dir / path
+        if destination.exists():
+            shutil.rmtree(destination)
+        clone_tree(package_dir, destination)
+        (destination / _COMPLETE_MARKER).unlink()
+    _link_bins(node_modules, tree)
+    _write_package_files(project_dir, specs, tree)
+    return tree
@@ -0,0 +1,28 @@
+"""Console output for tailgen commands.
+
+Messages are written the moment the work they describe happens. The old
+half-second pause after each step survives only as the opt-in ``--pace`` mode.
+"""
+
+from time import sleep
+
+import typer
+
+from tailgen import DELAY_DURATION
+from tailgen.settings import get_settings
+
+
+def step(message: str) -> None:
+    """Report a step of the scaffold"""
+    typer.secho(message, fg=typer.colors.GREEN)
+    if get_settings().pace:
+        sleep(DELAY_DURATION)
+
+
+def detail(message: str) -> None:
+    """Report a line of output from a tool tailgen is running"""
+    typer.secho(message, fg=typer.colors.BRIGHT_MAGENTA)
+
+
+def error(message: str) -> None:
+    typer.secho(message, fg=typer.colors.RED)
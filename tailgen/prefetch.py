@@ -0,0 +1,97 @@
+"""Warm the caches a scaffold reads while ``init`` waits for the project name.
+
+None of what a project is installed from depends on its name: the cached
+venv is keyed by framework, npm packages by their integrity hash and the
+standalone Tailwind CLI by version. So ``init`` starts a worker process on
+them as soon as the options are parsed. The stages need no hand-off: they
+look in the same caches, and where the worker is still busy they wait on the
+cache's file lock for it instead of doing the work a second time.
+
+Failures in the worker are ignored; the stage that needs the artifact then
+does the work itself and reports the error.
+"""
+
+import multiprocessing
+import os
+import signal
+import sys
+from typing import Callable, List, Optional
+
+from tailgen import TAILWIND_PACKAGES
+from tailgen.settings import Settings, configure, get_settings
+
+STOP_TIMEOUT = 5.0
+
+
+def _tasks(framework: str) -> List[Callable[[], object]]:
+    """What the stages for this framework and these settings will read from the caches"""
+    settings = get_settings()
+    tasks: List[Callable[[], object]] = []
+    if settings.use_cache:
+        from tailgen.environments import _golden_venv
+
+        tasks.append(lambda: _golden_venv(framework))
+    if settings.tailwind == "standalone":
+        from tailgen.standalone import ensure_binary
+
+        tasks.append(ensure_binary)
+    elif settings.use_cache:
+        from tailgen import npm_store
+
+        tasks.append(lambda: npm_store.fetch(list(TAILWIND_PACKAGES)))
+    return tasks
+
+
+def _warm(framework: str) -> None:
+    for task in _tasks(framework):
+        try:
+            task()
+        except Exception:
+            pass  # left for the stage to retry and report
+
+
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def _worker(framework: str, settings: Settings) -> None:
+    # Unwind on terminate() as on Ctrl-C, so tools being run are killed and
+    # cache locks released; partial cache entries are redone on next use
+    signal.signal(signal.SIGTERM, _interrupt)
+    # Keep progress messages from landing in the middle of the prompt
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    configure(**settings._asdict())
+    try:
+        _warm(framework)
+    except KeyboardInterrupt:
+        pass
+
+
+class Prefetch:
+    """The worker warming the caches for one ``init``"""
+
+    def __init__(self, framework: str):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self.process = multiprocessing.Process(
+            target=_worker, args=(framework, get_settings()), daemon=True
+        )
+        self.process.start()
+
+    def stop(self) -> None:
+        """Stop the worker if it is still running and wait for it to exit"""
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(STOP_TIMEOUT)
+            if self.process.is_alive():
+                self.process.kill()
+        self.process.join()
+
+
+def start(framework: str) -> Optional[Prefetch]:
+    """Start prefetching, if there is a person at the prompt to overlap with"""
+    if not sys.stdin.isatty() or not _tasks(framework):
+        return None
+    return Prefetch(framework)
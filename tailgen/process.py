@@ -0,0 +1,222 @@
+"""Run external tools (pip, npm, git) and stream their output.
+
+Both pipes are drained at the same time, so a tool that writes a lot to
+stderr can never fill the pipe buffer and stall while we wait on stdout.
+Only the last few lines of each stream are kept for error messages.
+"""
+
+import os
+import queue
+import selectors
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+
+from tailgen import timing
+
+DEFAULT_TIMEOUT = 600
+TAIL_LINES = 50
+# Longest partial line kept in memory before it is emitted as a line anyway
+MAX_LINE_LENGTH = 64 * 1024
+_READ_SIZE = 64 * 1024
+
+LineCallback = Callable[[str], None]
+
+
+class ProcessResult(NamedTuple):
+    args: List[str]
+    returncode: int
+    stdout: List[str]
+    stderr: List[str]
+
+
+class ProcessError(RuntimeError):
+    """Raised when a process exits with a non-zero status"""
+
+    def __init__(self, result: ProcessResult):
+        self.result = result
+        details = "\n".join(result.stderr or result.stdout)
+        message = f"{result.args[0]} exited with status {result.returncode}"
+        super().__init__(f"{message}: {details}" if details else message)
+
+
+class ProcessTimeout(RuntimeError):
+    """Raised when a process runs past its timeout and has been killed"""
+
+    def __init__(self, args: List[str], timeout: float):
+        self.command = args
+        self.timeout = timeout
+        super().__init__(f"{args[0]} did not finish within {timeout:g} seconds")
+
+
+class _LineSplitter:
+    """Turn chunks of bytes into lines, holding back the unfinished tail"""
+
+    def __init__(self, callback: Callable[[str], None]):
+        self._callback = callback
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> None:
+        self._pending += chunk
+        *lines, self._pending = self._pending.split(b"\n")
+        for line in lines:
+            self._emit(line)
+        if len(self._pending) > MAX_LINE_LENGTH:
+            self._emit(self._pending)
+            self._pending = b""
+
+    def close(self) -> None:
+        if self._pending:
+            self._emit(self._pending)
+            self._pending = b""
+
+    def _emit(self, line: bytes) -> None:
+        self._callback(line.decode("utf-8", errors="replace").rstrip("\r"))
+
+
+def _drain_with_selectors(splitters, deadline) -> bool:
+    """Read both pipes until EOF; returns False if the deadline passed first"""
+    with selectors.DefaultSelector() as selector:
+        for stream, splitter in splitters.items():
+            selector.register(stream, selectors.EVENT_READ, splitter)
+
+        while selector.get_map():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, _READ_SIZE)
+                if chunk:
+                    key.data.feed(chunk)
+                else:
+                    selector.unregister(key.fileobj)
+                    key.data.close()
+    return True
+
+
+def _drain_with_threads(splitters, deadline) -> bool:
+    """Fallback for platforms whose selectors cannot wait on pipes (Windows)"""
+    chunks: "queue.Queue" = queue.Queue()
+
+    def reader(stream, splitter):
+        for chunk in iter(lambda: stream.read1(_READ_SIZE), b""):
+            chunks.put((splitter, chunk))
+        chunks.put((splitter, None))
+
+    for stream, splitter in splitters.items():
+        threading.Thread(target=reader, args=(stream, splitter), daemon=True).start()
+
+    open_streams = len(splitters)
+    while open_streams:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            return False
+        try:
+            splitter, chunk = chunks.get(timeout=remaining)
+        except queue.Empty:
+            return False
+        if chunk is None:
+            splitter.close()
+            open_streams -= 1
+        else:
+            splitter.feed(chunk)
+    return True
+
+
+def run_process(
+    args: Sequence[Union[str, Path]],
+    cwd: Optional[Path] = None,
+    env: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    on_stdout: Optional[LineCallback] = None,
+    on_stderr: Optional[LineCallback] = None,
+    ignore_stderr: Optional[Callable[[str], bool]] = None,
+    check: bool = True,
+) -> ProcessResult:
+    """Run a command, passing each output line to a callback as it arrives.
+
+    Lines for which ``ignore_stderr`` returns True are dropped from stderr
+    before they reach ``on_stderr`` or the result. Raises ProcessTimeout if
+    the command outlives ``timeout`` seconds and, when ``check`` is set,
+    ProcessError if it exits with a non-zero status.
+    """
+    args = [str(arg) for arg in args]
+    with timing.span(_span_name(args), "subprocess", command=args) as span_args:
+        result = _run(
+            args, cwd, env, timeout, on_stdout, on_stderr, ignore_stderr, span_args
+        )
+    if check and result.returncode != 0:
+        raise ProcessError(result)
+    return result
+
+
+def _span_name(args: List[str]) -> str:
+    """A short label for a command, e.g. 'python -m pip install'"""
+    words = [Path(args[0]).stem]
+    for arg in args[1:]:
+        if len(words) == 4 or arg.startswith("--") or os.sep in arg:
+            break
+        words.append(arg)
+    return " ".join(words)
+
+
+def _run(args, cwd, env, timeout, on_stdout, on_stderr, ignore_stderr, span_args):
+    stdout_tail: deque = deque(maxlen=TAIL_LINES)
+    stderr_tail: deque = deque(maxlen=TAIL_LINES)
+
+    def stdout_line(line: str) -> None:
+        stdout_tail.append(line)
+        if on_stdout:
+            on_stdout(line)
+
+    def stderr_line(line: str) -> None:
+        if ignore_stderr and ignore_stderr(line):
+            return
+        stderr_tail.append(line)
+        if on_stderr:
+            on_stderr(line)
+
+    process = subprocess.Popen(
+        args,
+        cwd=str(cwd) if cwd else None,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    splitters = {
+        process.stdout: _LineSplitter(stdout_line),
+        process.stderr: _LineSplitter(stderr_line),
+    }
+    deadline = None if timeout is None else time.monotonic() + timeout
+    drain = _drain_with_threads if os.name == "nt" else _drain_with_selectors
+
+    try:
+        finished = drain(splitters, deadline)
+        if finished:
+            remaining = (
+                None if deadline is None else max(deadline - time.monotonic(), 0)
+            )
+            try:
+                process.wait(remaining)
+            except subprocess.TimeoutExpired:
+                finished = False
+        if not finished:
+            process.kill()
+            process.wait()
+            span_args["timed_out"] = True
+            raise ProcessTimeout(args, timeout)
+    except BaseException:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        raise
+    finally:
+        process.stdout.close()
+        process.stderr.close()
+
+    span_args["exit_code"] = process.returncode
+    return ProcessResult(args, process.returncode, list(stdout_tail), list(stderr_tail))
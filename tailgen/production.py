@@ -0,0 +1,54 @@
+"""The production profile: a gunicorn config and a WSGI/ASGI entry point.
+
+``tailgen init --profile production`` adds these on top of the usual
+scaffold and installs the server into the project's venv. The config sizes
+workers and threads from the CPUs available when the server starts, not
+when the project was generated, so the same files fit any machine.
+"""
+
+import importlib
+import os
+from pathlib import Path
+
+from tailgen import PRODUCTION_REQUIREMENTS, output, templates
+from tailgen.environments import _pip_install
+from tailgen.process import ProcessError, ProcessTimeout
+from tailgen.wheelhouse import pip_source_args
+
+
+def _install_server(venv_dir: Path, framework: str) -> bool:
+    """Install the production server into a venv; False if it was left out"""
+    requirements = PRODUCTION_REQUIREMENTS[framework]
+    if os.name == "nt":
+        output.detail("gunicorn does not run on Windows; skipping its install")
+        return False
+    try:
+        sources = pip_source_args(requirements)
+    except RuntimeError as e:
+        # Offline, and 'tailgen cache warm' has not collected the server yet
+        output.error(f"{e} Or install them into venv yourself.")
+        return False
+    try:
+        _pip_install(venv_dir, [*sources, *requirements])
+    except (ProcessError, ProcessTimeout) as e:
+        raise RuntimeError(f"Error installing {' '.join(requirements)}: {e}")
+    return True
+
+
+def _create_production_profile(project_dir: Path, framework: str) -> None:
+    """Install the production server and write its config and entry point"""
+    output.step("Installing production server...")
+    _install_server(project_dir / "venv", framework)
+    _write_production_files(project_dir, framework)
+
+
+def _write_production_files(project_dir: Path, framework: str) -> None:
+    package = f"tailgen.{framework}_app"
+    files = importlib.import_module(package).PRODUCTION_FILES
+    templates.write_templates(
+        project_dir,
+        package,
+        files,
+        templates.project_variables(project_dir, framework),
+    )
+    output.step(f"Wrote {', '.join(files)}")
@@ -0,0 +1,207 @@
+"""Dependency-aware stage scheduler used by ``tailgen init``"""
+
+import contextvars
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from tailgen import output, timing
+
+# Output of the run and index of the stage whose code is running in the
+# current thread, if any
+_current_stage: contextvars.ContextVar[Optional[Tuple["_OrderedOutput", int]]] = (
+    contextvars.ContextVar("tailgen_current_stage", default=None)
+)
+
+
+class Stage(NamedTuple):
+    """A named unit of work and the stages it depends on"""
+
+    name: str
+    func: Callable[..., Any]
+    args: Tuple[Any, ...] = ()
+    requires: Tuple[str, ...] = ()
+    description: Optional[str] = None
+
+
+class StageError(RuntimeError):
+    """Raised when one or more stages failed"""
+
+    def __init__(self, failures: List[Tuple[str, BaseException]], skipped: List[str]):
+        self.failures = failures
+        self.skipped = skipped
+        names = ", ".join(name for name, _ in failures)
+        super().__init__(f"Stage(s) failed: {names}")
+
+
+class _OrderedOutput:
+    """Console output of concurrently running stages, in declaration order.
+
+    The earliest unfinished stage writes straight through to the console; the
+    output of later stages is buffered and released once every stage declared
+    before them has finished, so the console reads the same as a serial run.
+    """
+
+    def __init__(self, target, count: int):
+        self.target = target
+        self._buffers: List[List[str]] = [[] for _ in range(count)]
+        self._finished = [False] * count
+        self._head = 0
+        self._lock = threading.Lock()
+
+    def write(self, index: int, text: str) -> None:
+        with self._lock:
+            if index == self._head:
+                self.target.write(text)
+            else:
+                self._buffers[index].append(text)
+
+    def finish(self, index: int) -> None:
+        with self._lock:
+            self._finished[index] = True
+            while self._head < len(self._finished):
+                self.target.write("".join(self._buffers[self._head]))
+                self._buffers[self._head].clear()
+                if not self._finished[self._head]:
+                    break
+                self._head += 1
+            self.target.flush()
+
+
+class _StageStream:
+    """Stand-in for ``sys.stdout`` that routes writes to the running stage.
+
+    One is installed while any run is in progress; runs in other threads (as
+    in ``tailgen serve``) share it, each stage finding its run's output
+    through the context.
+    """
+
+    def __init__(self, target):
+        self.target = target
+
+    def write(self, text: str) -> int:
+        # Behave like a text stream: click probes for binary streams by
+        # writing b"", which must fail rather than end up in a buffer
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        current = _current_stage.get()
+        if current is None:
+            self.target.write(text)
+        else:
+            ordered, index = current
+            ordered.write(index, text)
+        return len(text)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.target, name)
+
+
+_stage_stream: Optional[_StageStream] = None
+_runs = 0
+_stage_stream_lock = threading.Lock()
+
+
+@contextmanager
+def _routed_stdout() -> Iterator[Any]:
+    """Install the stage stream for the duration of a run; yields the real stdout"""
+    global _stage_stream, _runs
+    with _stage_stream_lock:
+        if _runs == 0:
+            _stage_stream = _StageStream(sys.stdout)
+            sys.stdout = _stage_stream
+        _runs += 1
+        target = _stage_stream.target
+    try:
+        yield target
+    finally:
+        with _stage_stream_lock:
+            _runs -= 1
+            if _runs == 0:
+                sys.stdout = _stage_stream.target
+                _stage_stream = None
+
+
+def _validate(stages: List[Stage]) -> None:
+    seen = set()
+    for stage in stages:
+        if stage.name in seen:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        for dependency in stage.requires:
+            if dependency not in seen:
+                raise ValueError(
+                    f"Stage {stage.name} requires {dependency}, "
+                    "which must be declared before it."
+                )
+        seen.add(stage.name)
+
+
+def run_stages(
+    stages: List[Stage], max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """Run stages concurrently, each as soon as the stages it requires are done.
+
+    Returns the result of every stage keyed by name. If any stage raises, the
+    stages depending on it are skipped, the independent ones still run, and a
+    StageError describing the failures is raised once everything has settled.
+    """
+    _validate(stages)
+    index_of = {stage.name: i for i, stage in enumerate(stages)}
+    results: Dict[str, Any] = {}
+    failures: List[Tuple[str, BaseException]] = []
+    skipped: List[str] = []
+    pending = list(range(len(stages)))
+    running = {}
+
+    with _routed_stdout() as stdout:
+        ordered = _OrderedOutput(stdout, len(stages))
+
+        def run(index: int) -> Any:
+            _current_stage.set((ordered, index))
+            try:
+                stage = stages[index]
+                with timing.span(stage.name):
+                    if stage.description:
+                        output.step(stage.description)
+                    return stage.func(*stage.args)
+            finally:
+                ordered.finish(index)
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(stages) or 1) as pool:
+            while pending or running:
+                for index in list(pending):
+                    stage = stages[index]
+                    blocked = [
+                        name
+                        for name in stage.requires
+                        if name in skipped or name in dict(failures)
+                    ]
+                    if blocked:
+                        pending.remove(index)
+                        skipped.append(stage.name)
+                        ordered.finish(index)
+                    elif all(name in results for name in stage.requires):
+                        pending.remove(index)
+                        context = contextvars.copy_context()
+                        running[pool.submit(context.run, run, index)] = index
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = stages[running.pop(future)]
+                    error = future.exception()
+                    if error is None:
+                        results[stage.name] = future.result()
+                    else:
+                        failures.append((stage.name, error))
+
+    if failures:
+        failures.sort(key=lambda failure: index_of[failure[0]])
+        raise StageError(failures, skipped)
+    return results
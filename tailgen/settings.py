@@ -0,0 +1,41 @@
+"""Options of the current tailgen run that the stages need to see.
+
+They live in a context variable rather than being passed through every
+stage function; the scheduler copies the context into its worker threads.
+"""
+
+import contextvars
+from typing import NamedTuple
+
+
+class Settings(NamedTuple):
+    # Pause briefly after each step message (for demos and screencasts)
+    pace: bool = False
+    # Install only from the local caches, never from the network
+    offline: bool = False
+    # Reuse the cached venvs and npm package store
+    use_cache: bool = True
+    # How projects get Tailwind: "npm" (node_modules) or "standalone" (CLI binary)
+    tailwind: str = "npm"
+    # "production" also writes a gunicorn config and a WSGI/ASGI entry point
+    profile: str = "development"
+    # Commit the generated files as the repository's first commit
+    commit: bool = False
+    # Run the git command instead of writing the repository directly
+    git_cli: bool = False
+
+
+_settings: contextvars.ContextVar[Settings] = contextvars.ContextVar(
+    "tailgen_settings", default=Settings()
+)
+
+
+def get_settings() -> Settings:
+    return _settings.get()
+
+
+def configure(**options) -> Settings:
+    """Set the settings for the rest of this run; others take their defaults"""
+    settings = Settings(**options)
+    _settings.set(settings)
+    return settings
@@ -0,0 +1,166 @@
+"""The standalone Tailwind CLI, for projects that do without Node.
+
+Tailwind publishes a single self-contained executable per platform with
+each release. tailgen keeps one copy per version in its cache, links it
+into projects as ``bin/tailwindcss`` and writes a build script that runs it
+directly, so building CSS needs neither npm nor npx. A download is checked
+against the release's ``sha256sums.txt`` before it is cached, and refused
+when that cannot be fetched. Offline machines can
+seed the cache from a downloaded file with
+``tailgen cache warm --tailwind-binary FILE``.
+"""
+
+import hashlib
+import os
+import platform
+import shutil
+import stat
+import sys
+import urllib.request
+from pathlib import Path
+from typing import Optional
+
+from tailgen import STANDALONE_TAILWIND_VERSION, templates
+from tailgen.cache import FileLock, cache_dir
+from tailgen.settings import get_settings
+
+DEFAULT_VERSION = STANDALONE_TAILWIND_VERSION
+RELEASES_URL = "https://github.com/tailwindlabs/tailwindcss/releases/download"
+DOWNLOAD_TIMEOUT = 120
+
+# Where the project reaches the binary, relative to the project directory
+PROJECT_BINARY = Path("bin") / ("tailwindcss.exe" if os.name == "nt" else "tailwindcss")
+BUILD_SCRIPT = "build_css.cmd" if os.name == "nt" else "build_css.sh"
+
+
+class StandaloneError(RuntimeError):
+    """Raised when the standalone Tailwind CLI cannot be provided"""
+
+
+def asset_name() -> str:
+    """Name of this platform's executable in a Tailwind release"""
+    machine = platform.machine().lower()
+    arch = {
+        "x86_64": "x64",
+        "amd64": "x64",
+        "arm64": "arm64",
+        "aarch64": "arm64",
+        "armv7l": "armv7",
+    }.get(machine)
+    if sys.platform.startswith("linux") and arch:
+        return f"tailwindcss-linux-{arch}"
+    if sys.platform == "darwin" and arch in ("x64", "arm64"):
+        return f"tailwindcss-macos-{arch}"
+    if os.name == "nt" and arch in ("x64", "arm64"):
+        return f"tailwindcss-windows-{arch}.exe"
+    raise StandaloneError(
+        f"Tailwind does not publish a standalone CLI for {sys.platform} {machine}"
+    )
+
+
+def cached_binary(version: str = DEFAULT_VERSION) -> Path:
+    return cache_dir() / "tailwind" / version / asset_name()
+
+
+def _install(data_source, destination: Path, sha256: Optional[str] = None) -> None:
+    """Copy a file-like object into the cache as an executable, atomically.
+
+    With ``sha256``, the copy is checked before it takes the cached name, so
+    nothing ever runs a binary that does not match.
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temporary = destination.with_name(f".{destination.name}.{os.getpid()}")
+    digest = hashlib.sha256()
+    with open(temporary, "wb") as file:
+        for chunk in iter(lambda: data_source.read(1024 * 1024), b""):
+            digest.update(chunk)
+            file.write(chunk)
+    if sha256 is not None and digest.hexdigest() != sha256:
+        temporary.unlink()
+        raise StandaloneError(f"Checksum mismatch for {destination.name}")
+    mode = os.stat(temporary).st_mode
+    os.chmod(temporary, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.replace(temporary, destination)
+
+
+def add_binary(source: Path, version: str = DEFAULT_VERSION) -> Path:
+    """Put a Tailwind CLI executable downloaded by hand into the cache"""
+    destination = cached_binary(version)
+    with FileLock(destination.with_name("lock")), open(source, "rb") as file:
+        _install(file, destination)
+    return destination
+
+
+def _expected_sha256(version: str, name: str) -> str:
+    url = f"{RELEASES_URL}/v{version}/sha256sums.txt"
+    try:
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response:
+            sums = response.read().decode("utf-8")
+    except OSError as e:
+        raise StandaloneError(
+            f"Could not fetch {url} to verify the Tailwind CLI: {e}. Download "
+            f"{name} by hand and run 'tailgen cache warm --tailwind-binary FILE'."
+        )
+    for line in sums.splitlines():
+        digest, _, filename = line.strip().partition("  ")
+        if filename.lstrip("*./") == name:
+            return digest
+    raise StandaloneError(f"{url} has no checksum for {name}")
+
+
+def _download(version: str, destination: Path) -> None:
+    name = asset_name()
+    url = f"{RELEASES_URL}/v{version}/{name}"
+    expected = _expected_sha256(version, name)
+    try:
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response:
+            _install(response, destination, expected)
+    except OSError as e:
+        raise StandaloneError(f"Could not download {url}: {e}")
+
+
+def ensure_binary(version: str = DEFAULT_VERSION) -> Path:
+    """The cached executable for a version, downloading it if needed"""
+    binary = cached_binary(version)
+    if binary.is_file():
+        return binary
+    with FileLock(binary.with_name("lock")):
+        if not binary.is_file():
+            if get_settings().offline:
+                raise StandaloneError(
+                    f"Tailwind CLI {version} is not cached. Download {asset_name()} "
+                    "from the Tailwind release and run "
+                    "'tailgen cache warm --tailwind-binary FILE'."
+                )
+            _download(version, binary)
+    return binary
+
+
+def link_binary(project_dir: Path, version: str = DEFAULT_VERSION) -> Path:
+    """Make the cached executable available as the project's bin/tailwindcss"""
+    binary = ensure_binary(version)
+    link = project_dir / PROJECT_BINARY
+    link.parent.mkdir(exist_ok=True)
+    if link.is_symlink() or link.exists():
+        link.unlink()
+    try:
+        link.symlink_to(binary)
+    except OSError:  # e.g. Windows without symlink rights
+        try:
+            os.link(binary, link)
+        except OSError:
+            shutil.copy2(binary, link)
+    return link
+
+
+def write_build_script(project_dir: Path) -> None:
+    """Write the script that builds the project's CSS with bin/tailwindcss"""
+    template = "build_css_cmd.txt" if os.name == "nt" else "build_css_sh.txt"
+    templates.write_templates(
+        project_dir,
+        templates.COMMON,
+        {BUILD_SCRIPT: template},
+        templates.project_variables(project_dir),
+    )
+    script = project_dir / BUILD_SCRIPT
+    os.chmod(script, os.stat(script).st_mode | stat.S_IXUSR | stat.S_IXGRP)
@@ -0,0 +1,73 @@
+"""Files tailgen writes into new projects.
+
+Templates are the ``setup_files`` shipped inside the ``tailgen`` package and
+its framework subpackages. Each directory is read through
+``importlib.resources`` the first time one of its templates is needed and
+then kept in memory, so generating many projects reads every template once.
+
+Templates use ``string.Template`` placeholders (``$project_name``, ``$title``,
+``$port``). Unknown placeholders and the Jinja ``{{ ... }}`` syntax of the HTML
+templates are left untouched.
+"""
+
+import functools
+from importlib import resources
+from pathlib import Path
+from string import Template
+from typing import Dict, Mapping
+
+COMMON = "tailgen"
+
+DEFAULT_PORTS = {"flask": 5000, "fastapi": 8000}
+
+
+@functools.lru_cache(maxsize=None)
+def _template_set(package: str) -> Dict[str, str]:
+    """Every template in a package's setup_files, read in one go"""
+    directory = resources.files(package) / "setup_files"
+    return {
+        entry.name: entry.read_text(encoding="utf-8")
+        for entry in directory.iterdir()
+        if entry.is_file()
+    }
+
+
+def get_template(package: str, name: str) -> str:
+    try:
+        return _template_set(package)[name]
+    except KeyError:
+        raise KeyError(f"No template {name} in {package}") from None
+
+
+def render(text: str, variables: Mapping[str, object]) -> str:
+    return Template(text).safe_substitute(variables)
+
+
+def project_variables(project_dir: Path, framework: str = "flask") -> Dict[str, object]:
+    """Values substituted into a project's templates"""
+    name = Path(project_dir).name
+    return {
+        "project_name": name,
+        "title": name.replace("_", " ").replace("-", " ").title(),
+        "port": DEFAULT_PORTS[framework],
+    }
+
+
+def write_templates(
+    project_dir: Path,
+    package: str,
+    files: Mapping[str, str],
+    variables: Mapping[str, object],
+) -> None:
+    """Render templates into a project.
+
+    ``files`` maps each destination, relative to the project, to the name of
+    the template in ``package`` that fills it.
+    """
+    project_dir = Path(project_dir)
+    for destination, name in files.items():
+        path = project_dir / destination
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            render(get_template(package, name), variables), encoding="utf-8"
+        )
@@ -0,0 +1,174 @@
+"""Timing spans for the steps of a scaffold.
+
+Spans are only collected while a Recorder is active (``tailgen init
+--timings`` or ``--trace``); otherwise ``span`` costs next to nothing. The
+active recorder and the enclosing span live in context variables, which the
+scheduler copies into its worker threads, so a subprocess started by a stage
+nests under that stage even when several stages run at once.
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+
+class Span(NamedTuple):
+    id: int
+    parent: Optional[int]
+    name: str
+    category: str
+    thread: int
+    start: int  # perf_counter_ns
+    end: int
+    args: Dict[str, Any]
+
+    @property
+    def seconds(self) -> float:
+        return (self.end - self.start) / 1e9
+
+
+class Recorder:
+    """Collects the spans of one run"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread_names: Dict[int, str] = {}
+
+    def next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+            self._thread_names.setdefault(span.thread, threading.current_thread().name)
+
+    def children(self, parent: Optional[int]) -> List[Span]:
+        return sorted(
+            (span for span in self.spans if span.parent == parent),
+            key=lambda span: span.start,
+        )
+
+    def trace_events(self) -> List[dict]:
+        """The spans as Chrome trace events (chrome://tracing, Perfetto)"""
+        if not self.spans:
+            return []
+        origin = min(span.start for span in self.spans)
+        pid = os.getpid()
+        tids = {thread: tid for tid, thread in enumerate(self._thread_names, start=1)}
+        events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tids[thread],
+                "args": {"name": name},
+            }
+            for thread, name in self._thread_names.items()
+        ]
+        for span in sorted(self.spans, key=lambda span: (span.start, -span.end)):
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": (span.start - origin) / 1000,
+                    "dur": (span.end - span.start) / 1000,
+                    "pid": pid,
+                    "tid": tids[span.thread],
+                    "args": span.args,
+                }
+            )
+        return events
+
+    def write_trace(self, path: Path) -> None:
+        trace = {"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}
+        Path(path).write_text(json.dumps(trace, indent=1), encoding="utf-8")
+
+
+_recorder: contextvars.ContextVar[Optional[Recorder]] = contextvars.ContextVar(
+    "tailgen_recorder", default=None
+)
+_parent: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "tailgen_parent_span", default=None
+)
+
+
+@contextmanager
+def recording(recorder: Optional[Recorder]) -> Iterator[Optional[Recorder]]:
+    """Collect spans into ``recorder`` (nothing is collected if it is None)"""
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+@contextmanager
+def span(name: str, category: str = "stage", **args) -> Iterator[Dict[str, Any]]:
+    """Time the enclosed block.
+
+    Yields the span's arguments so the block can add to them (an exit code,
+    say). A block that raises is recorded with the exception in ``error``.
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        yield args
+        return
+
+    span_id = recorder.next_id()
+    parent = _parent.get()
+    token = _parent.set(span_id)
+    start = time.perf_counter_ns()
+    try:
+        yield args
+    except BaseException as e:
+        args.setdefault("error", f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        end = time.perf_counter_ns()
+        _parent.reset(token)
+        recorder.add(
+            Span(
+                span_id,
+                parent,
+                name,
+                category,
+                threading.get_ident(),
+                start,
+                end,
+                args,
+            )
+        )
+
+
+def timings_table(recorder: Recorder):
+    """A table of every span, nested spans indented under their parent"""
+    from rich.table import Table
+
+    table = Table(title="Timings")
+    table.add_column("Step")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Result")
+
+    def add_rows(parent: Optional[int], depth: int) -> None:
+        for child in recorder.children(parent):
+            if "error" in child.args:
+                result = "[red]failed[/red]"
+            elif "exit_code" in child.args:
+                result = f"exit {child.args['exit_code']}"
+            else:
+                result = "ok"
+            table.add_row("  " * depth + child.name, f"{child.seconds:.2f}", result)
+            add_rows(child.id, depth + 1)
+
+    add_rows(None, 0)
+    return table
@@ -0,0 +1,158 @@
+"""Wait for files to change under a set of directories.
+
+On Linux the kernel reports changes through inotify, so a change is seen
+the moment the file is written instead of on the next poll. Elsewhere the
+directories are rescanned a few times a second.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+POLL_INTERVAL = 0.1
+
+# From <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_IGNORED = 0x8000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+# Files count as changed once closed after writing, not on every write nor
+# when created; creation is only followed to watch new directories
+_MASK = (
+    _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+)
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Changed paths from inotify, with a watch on every subdirectory"""
+
+    def __init__(self, roots: Iterable[Path]):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories: Dict[int, Path] = {}
+        for root in roots:
+            self._watch_tree(Path(root))
+
+    def _watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _MASK)
+        if wd >= 0:
+            self._directories[wd] = directory
+
+    def _watch_tree(self, root: Path) -> None:
+        if not root.is_dir():
+            return
+        self._watch(root)
+        for directory, subdirectories, _ in os.walk(root):
+            for name in subdirectories:
+                self._watch(Path(directory) / name)
+
+    def read(self, timeout: Optional[float]) -> Set[Path]:
+        """Paths changed since the last call, waiting up to ``timeout``"""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            directory = self._directories.get(wd)
+            if mask & _IN_IGNORED:
+                self._directories.pop(wd, None)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(name) if name else directory
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                # Files may land in a new directory before it is watched
+                self._watch_tree(path)
+                changed.update(p for p in path.rglob("*") if p.is_file())
+                continue
+            if mask & _IN_CREATE:
+                # Still empty; its CLOSE_WRITE follows once it is written
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Changed paths found by comparing modification times"""
+
+    def __init__(self, roots: Iterable[Path], interval: float = POLL_INTERVAL):
+        self._roots = [Path(root) for root in roots]
+        self._interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, tuple]:
+        snapshot = {}
+        for root in self._roots:
+            for directory, _, files in os.walk(root):
+                for name in files:
+                    path = Path(directory) / name
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read(self, timeout: Optional[float]) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            wait = self._interval
+            if deadline is not None:
+                wait = min(wait, max(0.0, deadline - time.monotonic()))
+            time.sleep(wait)
+
+    def close(self) -> None:
+        pass
+
+
+def watcher(roots: Iterable[Path]):
+    """The fastest watcher this platform supports"""
+    roots = list(roots)
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):  # no inotify, e.g. in some sandboxes
+            pass
+    return PollingWatcher(roots)
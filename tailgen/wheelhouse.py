@@ -0,0 +1,89 @@
+"""Local wheelhouse of framework dependencies.
+
+``tailgen cache warm`` downloads the wheels pinned in a framework's lock, and
+those of its production server, into the cache (or copies them from a local
+directory). While that copy is fresh, and always with ``--offline``, pip
+installs from it with ``--no-index --find-links`` instead of resolving and
+downloading against the package index.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from tailgen import FRAMEWORK_REQUIREMENTS, PRODUCTION_REQUIREMENTS, output
+from tailgen.cache import FileLock, cache_dir, cache_key
+from tailgen.lock import find_lock, lock_install_args, resolve_lock
+from tailgen.process import run_process
+from tailgen.settings import get_settings
+
+# A warmed wheelhouse is used without --offline for this many seconds
+MAX_AGE = 7 * 24 * 60 * 60
+
+
+def wheelhouse_dir() -> Path:
+    return cache_dir() / "wheelhouse"
+
+
+def _index_path() -> Path:
+    return wheelhouse_dir() / "index.json"
+
+
+def _read_index() -> dict:
+    try:
+        return json.loads(_index_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def warmed_at(requirements: Sequence[str]) -> Optional[float]:
+    """When the wheels for these requirements were last collected, if ever"""
+    return _read_index().get(cache_key(list(requirements)))
+
+
+def warm(framework: str, source: Optional[Path] = None) -> None:
+    """Collect the wheels pinned in a framework's lock and its production server.
+
+    With a source directory, wheels (and the lock, if one has to be resolved)
+    are taken only from there, so this works without the package index.
+    """
+    lock = find_lock(framework) or resolve_lock(framework, source)
+    directory = wheelhouse_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    args = [sys.executable, "-m", "pip", "download", "--disable-pip-version-check"]
+    args += ["--dest", directory]
+    if source is not None:
+        args += ["--no-index", "--find-links", Path(source).resolve()]
+
+    # The production server is not locked; its wheels are whatever pip resolves
+    downloads = {
+        FRAMEWORK_REQUIREMENTS[framework]: lock_install_args(lock),
+        PRODUCTION_REQUIREMENTS[framework]: list(PRODUCTION_REQUIREMENTS[framework]),
+    }
+    with FileLock(directory / "lock"):
+        index = _read_index()
+        for requirements, packages in downloads.items():
+            run_process([*args, *packages], on_stdout=output.detail)
+            index[cache_key(list(requirements))] = time.time()
+        _index_path().write_text(json.dumps(index, indent=2), encoding="utf-8")
+
+
+def pip_source_args(requirements: Sequence[str]) -> List[str]:
+    """Extra ``pip install`` arguments to install from the wheelhouse.
+
+    Empty when the wheelhouse should not be used, in which case pip goes to
+    the package index as usual.
+    """
+    warmed = warmed_at(requirements)
+    if get_settings().offline:
+        if warmed is None:
+            raise RuntimeError(
+                f"No cached wheels for {' '.join(requirements)}. "
+                "Run 'tailgen cache warm' while online, or point it at a "
+                "directory of wheels with --from."
+            )
+    elif warmed is None or time.time() - warmed > MAX_AGE:
+        return []
+    return ["--no-index", "--find-links", str(wheelhouse_dir())]
@@ -0,0 +1,265 @@
+"""Workspaces: many services in one directory sharing their tools.
+
+A workspace is laid out as::
+
+    platform/
+        tailgen-workspace.json   its services and what the venv has installed
+        tailwind.config.js       content globs matching every service
+        static/src/input.css
+        venv/                    one environment for every service
+        node_modules/            (bin/tailwindcss with --tailwind standalone)
+        billing/                 app.py, templates/, static/, requirements.lock
+        admin/                   main.py, templates/, static/, ...
+
+``tailgen workspace init`` sets up the root once. ``tailgen init
+--workspace`` then only writes the files of a service directly under the
+root; the shared venv gets a framework installed the first time a service
+uses it, and the Tailwind config needs no change because its globs match
+any service.
+
+``tailgen build`` of a workspace, or of any of its services, runs Tailwind
+once over every service and gives each service the result as its own
+``output.css``, fingerprinted and precompressed as for a single project.
+Each service thereby carries the classes of the others too: a little more
+CSS per service in return for one build instead of one per service.
+"""
+
+import importlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence
+
+from tailgen import FRAMEWORK_REQUIREMENTS, TAILWIND_PACKAGES, output, templates
+from tailgen.build import OUTPUT_CSS, compile_css, fingerprint_assets, precompress
+from tailgen.cache import FileLock
+from tailgen.settings import get_settings
+
+MANIFEST = "tailgen-workspace.json"
+MANIFEST_VERSION = 1
+LOCK_PATH = Path(".tailgen") / "workspace.lock"
+# Destination in the workspace -> template in tailgen's setup_files
+TAILWIND_FILES = {
+    "tailwind.config.js": "workspace_tailwind_config.txt",
+    "static/src/input.css": "input_css.txt",
+}
+
+
+class WorkspaceError(RuntimeError):
+    """Raised when a directory cannot be used as a workspace"""
+
+
+def read_manifest(root: Path) -> Optional[dict]:
+    try:
+        manifest = json.loads((Path(root) / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(root: Path, manifest: dict) -> None:
+    path = root / MANIFEST
+    temporary = path.with_name(f".{path.name}.{os.getpid()}")
+    temporary.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    os.replace(temporary, path)
+
+
+def find_root(project_dir: Path) -> Optional[Path]:
+    """The workspace a directory is the root or a service of, if any"""
+    project_dir = Path(project_dir).resolve()
+    for candidate in (project_dir, project_dir.parent):
+        if read_manifest(candidate) is not None:
+            return candidate
+    return None
+
+
+def venv_dir(project_dir: Path) -> Path:
+    """The venv a project runs in: its own, or its workspace's"""
+    project_dir = Path(project_dir)
+    own = project_dir / "venv"
+    if own.exists():
+        return own
+    root = find_root(project_dir)
+    return own if root is None else root / "venv"
+
+
+def create(root: Path, tailwind: str) -> None:
+    """Make a directory a workspace, or check an existing one is set up alike"""
+    root.mkdir(parents=True, exist_ok=True)
+    with FileLock(root / LOCK_PATH):
+        manifest = read_manifest(root)
+        if manifest is None:
+            _write_manifest(
+                root,
+                {
+                    "version": MANIFEST_VERSION,
+                    "tailwind": tailwind,
+                    "installed": [],
+                    "services": {},
+                },
+            )
+        elif manifest["tailwind"] != tailwind:
+            raise WorkspaceError(
+                f"{root} is a workspace with --tailwind {manifest['tailwind']}"
+            )
+
+
+def require(root: Path) -> dict:
+    """The manifest of a workspace, which must exist"""
+    manifest = read_manifest(root)
+    if manifest is None:
+        raise WorkspaceError(
+            f"{root} is not a tailgen workspace; create one with "
+            f"'tailgen workspace init {root}'"
+        )
+    return manifest
+
+
+def _install_once(root: Path, name: str, install: Callable[[], Optional[bool]]):
+    """Run ``install`` unless the workspace venv already has ``name``.
+
+    Services created at the same time wait for each other here, so each
+    thing is installed once. ``install`` returns False when it left the
+    install to the user, in which case it is not recorded.
+    """
+    with FileLock(root / LOCK_PATH):
+        manifest = require(root)
+        if name in manifest["installed"]:
+            return
+        if install() is False:
+            return
+        manifest["installed"].append(name)
+        _write_manifest(root, manifest)
+
+
+def install_framework(root: Path, framework: str) -> None:
+    """Install a framework into the workspace venv, the first time it is needed"""
+    from tailgen.environments import _install_framework, _requirements_installed
+    from tailgen.process import ProcessError, ProcessTimeout
+
+    venv = root / "venv"
+
+    def install() -> None:
+        if _requirements_installed(venv, FRAMEWORK_REQUIREMENTS[framework]):
+            return  # cloned from the cached environment with it
+        output.step(f"Installing {framework} into the workspace environment...")
+        try:
+            _install_framework(venv, framework)
+        except (ProcessError, ProcessTimeout) as e:
+            raise RuntimeError(f"Error installing {framework}: {e}")
+
+    _install_once(root, framework, install)
+
+
+def create_environment(root: Path, frameworks: Sequence[str]) -> None:
+    """Create the shared venv with each framework installed"""
+    from tailgen.environments import _create_venv
+
+    _create_venv(root, frameworks[0] if get_settings().use_cache else None)
+    for framework in frameworks:
+        install_framework(root, framework)
+
+
+def install_tailwind(root: Path) -> None:
+    """Install Tailwind and write the config and input.css every service shares"""
+    from tailgen.helpers import _npm_install
+    from tailgen.npm_store import StoreError
+    from tailgen.process import ProcessError, ProcessTimeout
+    from tailgen.standalone import StandaloneError, link_binary
+
+    output.step("Installing Tailwind CSS...")
+    try:
+        if get_settings().tailwind == "standalone":
+            link_binary(root)
+        else:
+            _npm_install(root, list(TAILWIND_PACKAGES))
+    except (ProcessError, ProcessTimeout, StoreError, StandaloneError) as e:
+        raise RuntimeError(f"Error installing Tailwind CSS: {e}")
+    # A config of the user's own is kept
+    files = {
+        destination: template
+        for destination, template in TAILWIND_FILES.items()
+        if not (root / destination).exists()
+    }
+    templates.write_templates(
+        root, templates.COMMON, files, templates.project_variables(root)
+    )
+    output.step("Tailwind CSS installed for the whole workspace")
+
+
+def create_service(service_dir: Path, framework: str) -> None:
+    """Write a service's app, templates and dependency lock"""
+    from tailgen.lock import write_project_lock
+
+    package = f"tailgen.{framework}_app"
+    output.step(f"Creating {framework} service {service_dir.name}...")
+    (service_dir / "static").mkdir(exist_ok=True)
+    templates.write_templates(
+        service_dir,
+        package,
+        importlib.import_module(package).APP_FILES,
+        templates.project_variables(service_dir, framework),
+    )
+    write_project_lock(service_dir, framework)
+
+
+def create_production_profile(root: Path, service_dir: Path, framework: str) -> None:
+    """Write a service's production files; the server goes into the shared venv"""
+    from tailgen.production import _install_server, _write_production_files
+
+    _install_once(
+        root,
+        f"{framework}:production",
+        lambda: _install_server(root / "venv", framework),
+    )
+    _write_production_files(service_dir, framework)
+
+
+def add_service(root: Path, name: str, framework: str) -> None:
+    """Record a service in the workspace manifest"""
+    with FileLock(root / LOCK_PATH):
+        manifest = require(root)
+        manifest["services"][name] = framework
+        manifest["services"] = dict(sorted(manifest["services"].items()))
+        _write_manifest(root, manifest)
+
+
+def services(root: Path) -> Dict[str, Path]:
+    """The directory of every service that still exists, by name"""
+    return {
+        name: root / name
+        for name in require(root)["services"]
+        if (root / name).is_dir()
+    }
+
+
+def _copy_css(css: bytes, service_dir: Path) -> bool:
+    target = service_dir / OUTPUT_CSS
+    try:
+        if target.read_bytes() == css:
+            return False
+    except OSError:
+        target.parent.mkdir(parents=True, exist_ok=True)
+    temporary = target.with_name(f".{target.name}.{os.getpid()}")
+    temporary.write_bytes(css)
+    os.replace(temporary, target)
+    return True
+
+
+def build(root: Path, minify: bool = True, force: bool = False) -> Dict[Path, bool]:
+    """Build the CSS of every service with one Tailwind run.
+
+    Returns whether each service's output.css was rewritten.
+    """
+    root = Path(root).resolve()
+    require(root)
+    built = compile_css(root, minify, force).built
+    css = (root / OUTPUT_CSS).read_bytes()
+    rewritten = {}
+    for service_dir in services(root).values():
+        rewritten[service_dir] = _copy_css(css, service_dir) or built
+        fingerprint_assets(service_dir)
+        precompress(service_dir)
+    return rewritten
@@ -0,0 +1,108 @@
+import base64
+import hashlib
+import io
+import json
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+
+def make_wheel(directory: Path, name: str, version: str, requires=()) -> Path:
+    """Build a minimal pure-Python wheel so pip can install it offline"""
+    dist_info = f"{name}-{version}.dist-info"
+    files = {
+        f"{name}/__init__.py": f"__version__ = {version!r}\n",
+        f"{dist_info}/METADATA": "\n".join(
+            ["Metadata-Version: 2.1", f"Name: {name}", f"Version: {version}"]
+            + [f"Requires-Dist: {requirement}" for requirement in requires]
+        )
+        + "\n",
+        f"{dist_info}/WHEEL": "Wheel-Version: 1.0\nRoot-Is-Purelib: true\nTag: py3-none-any\n",
+    }
+    record = []
+    for path, content in files.items():
+        digest = hashlib.sha256(content.encode()).digest()
+        encoded = base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+        record.append(f"{path},sha256={encoded},{len(content.encode())}")
+    record.append(f"{dist_info}/RECORD,,")
+    files[f"{dist_info}/RECORD"] = "\n".join(record) + "\n"
+
+    wheel = Path(directory) / f"{name}-{version}-py3-none-any.whl"
+    with zipfile.ZipFile(wheel, "w") as archive:
+        for path, content in files.items():
+            archive.writestr(path, content)
+    return wheel
+
+
+def make_tarball(directory: Path, name: str, version: str, **manifest) -> Path:
+    """Build an ``npm pack`` style tarball with a package.json and an index.js"""
+    files = {
+        "package/package.json": json.dumps(
+            {"name": name, "version": version, **manifest}
+        ),
+        "package/index.js": f"module.exports = {json.dumps(version)};\n",
+    }
+    for script in (manifest.get("bin") or {}).values():
+        files[f"package/{script}"] = "#!/usr/bin/env node\n"
+
+    tarball = Path(directory) / f"{name.replace('/', '-')}-{version}.tgz"
+    with tarfile.open(tarball, "w:gz") as archive:
+        for path, content in files.items():
+            data = content.encode()
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            info.mode = 0o755 if "bin" in path else 0o644
+            archive.addfile(info, io.BytesIO(data))
+    return tarball
+
+
+@pytest.fixture(autouse=True)
+def no_daemon(monkeypatch):
+    """Keep init from handing projects to a `tailgen serve` the developer runs"""
+    monkeypatch.setenv("TAILGEN_NO_DAEMON", "1")
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the tailgen cache at an empty temporary directory"""
+    monkeypatch.setenv("TAILGEN_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def no_shipped_locks(tmp_path, monkeypatch):
+    """Hide the locks shipped with tailgen so locks are resolved from scratch"""
+    monkeypatch.setattr("tailgen.lock.SHIPPED_LOCKS_DIR", tmp_path / "no-locks")
+
+
+@pytest.fixture
+def wheel_dir(tmp_path):
+    """A directory of wheels standing in for the package index"""
+    directory = tmp_path / "wheels"
+    directory.mkdir()
+    make_wheel(directory, "flask", "9.0.0", requires=["werkzeug>=1"])
+    make_wheel(directory, "werkzeug", "9.0.0")
+    make_wheel(directory, "gunicorn", "9.0.0")
+    return directory
+
+
+@pytest.fixture
+def tarball_dir(tmp_path, monkeypatch):
+    """A directory of npm tarballs standing in for the registry"""
+    directory = tmp_path / "tarballs"
+    directory.mkdir()
+    make_tarball(
+        directory,
+        "tailwindcss",
+        "3.4.0",
+        bin={"tailwindcss": "lib/cli.js"},
+        dependencies={"picocolors": "^1.0.0", "lilconf": "^1"},
+    )
+    make_tarball(directory, "picocolors", "1.0.0")
+    make_tarball(directory, "picocolors", "1.1.0")
+    make_tarball(directory, "picocolors", "0.2.1")
+    make_tarball(directory, "lilconf", "1.0.0", dependencies={"picocolors": "^0.2.0"})
+    monkeypatch.setenv("TAILGEN_NPM_SOURCE", str(directory))
+    return directory
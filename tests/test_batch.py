@@ -0,0 +1,116 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from tailgen import cli
+from tailgen.batch import ManifestError, ProjectSpec, load_manifest, run_batch
+from tailgen.settings import configure
+
+runner = CliRunner()
+
+
+@pytest.fixture(autouse=True)
+def reset_settings():
+    # Projects run with their own settings, which stay set after the batch
+    yield
+    configure()
+
+
+MANIFEST = """
+[defaults]
+framework = "fastapi"
+output_dir = "services"
+
+[[project]]
+name = "billing"
+
+[[project]]
+name = "admin"
+framework = "flask"
+output_dir = "/srv/apps"
+no_cache = true
+"""
+
+
+def write_project(spec: ProjectSpec) -> None:
+    """Stand-in for the scaffold that is cheap enough to run in many processes"""
+    print(f"generating {spec.name}")
+    if spec.name == "broken":
+        raise RuntimeError("no space left")
+    target = spec.output_dir / spec.name
+    target.mkdir(parents=True)
+    (target / "framework.txt").write_text(spec.framework)
+
+
+def test_load_manifest_applies_defaults(tmp_path):
+    manifest = tmp_path / "manifest.toml"
+    manifest.write_text(MANIFEST)
+
+    billing, admin = load_manifest(manifest)
+
+    assert billing == ProjectSpec("billing", "fastapi", tmp_path / "services")
+    assert admin == ProjectSpec("admin", "flask", Path("/srv/apps"), no_cache=True)
+
+
+@pytest.mark.parametrize(
+    "manifest",
+    [
+        "[[project]]\nframework = 'flask'\n",
+        "[[project]]\nname = 'a'\nframework = 'django'\n",
+        "[[project]]\nname = 'a'\ncolour = 'blue'\n",
+        "[[project]]\nname = 'a'\n[[project]]\nname = 'a'\n",
+        "[defaults]\nframework = 'flask'\n",
+    ],
+)
+def test_load_manifest_rejects_bad_entries(tmp_path, manifest):
+    path = tmp_path / "manifest.toml"
+    path.write_text(manifest)
+    with pytest.raises(ManifestError):
+        load_manifest(path)
+
+
+def test_run_batch_uses_worker_processes(tmp_path):
+    specs = [
+        ProjectSpec(name, "flask", tmp_path) for name in ("one", "broken", "three")
+    ]
+
+    results = run_batch(specs, write_project, workers=3)
+
+    assert [result.spec.name for result in results] == ["one", "broken", "three"]
+    assert results[0].error is None and results[2].error is None
+    assert results[1].error == "no space left"
+    assert results[1].log == "generating broken\n"
+    assert (tmp_path / "three" / "framework.txt").read_text() == "flask"
+
+
+def test_batch_command_generates_each_project(tmp_path):
+    manifest = tmp_path / "manifest.toml"
+    manifest.write_text(MANIFEST.replace("/srv/apps", str(tmp_path / "apps")))
+
+    with patch("tailgen.cli._create_venv") as mock_create_venv, patch(
+        "tailgen.cli._create_git_ignore"
+    ), patch("tailgen.cli._create_readme"), patch("tailgen.cli._git_init"), patch(
+        "tailgen.cli._create_flask_project"
+    ) as mock_create_flask, patch(
+        "tailgen.cli._create_fastapi_project"
+    ) as mock_create_fastapi, patch(
+        "tailgen.cli._install_and_configure_tailwindcss"
+    ), patch(
+        "tailgen.cli._install_and_configure_tailwindcss_fastapi"
+    ), patch(
+        "tailgen.cli.update_package_json_with_build_script"
+    ):
+        result = runner.invoke(cli.app, ["batch", str(manifest), "--workers", "1"])
+
+    assert result.exit_code == 0, result.stdout
+    assert "billing done" in result.stdout and "admin done" in result.stdout
+    mock_create_fastapi.assert_called_once_with(tmp_path / "services" / "billing")
+    mock_create_flask.assert_called_once_with(tmp_path / "apps" / "admin")
+    # no_cache in the manifest builds a plain venv for that project only
+    assert mock_create_venv.call_args_list[0].args == (
+        tmp_path / "services" / "billing",
+        "fastapi",
+    )
+    assert mock_create_venv.call_args_list[1].args == (tmp_path / "apps" / "admin",)
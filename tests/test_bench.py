@@ -0,0 +1,157 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from tailgen import bench, cli, fastapi_app, flask_app, templates
+
+runner = CliRunner()
+
+PAGE = b'<html><link href="/static/dist/css/output.0123456789ab.css" rel="stylesheet">'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        self.send_response(200)
+        if self.path == "/chunked":
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in (b"body {", b"}"):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer((bench.HOST, 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_percentile():
+    values = [float(n) for n in range(1, 101)]
+    assert bench.percentile(values, 0.5) == 50
+    assert bench.percentile(values, 0.99) == 99
+    assert bench.percentile([7.0], 0.95) == 7
+    assert bench.percentile([], 0.5) == 0
+
+
+def test_stylesheet_path():
+    assert bench.stylesheet_path(PAGE.decode()) == (
+        "/static/dist/css/output.0123456789ab.css"
+    )
+    assert (
+        bench.stylesheet_path(
+            '<link rel="stylesheet" href="http://127.0.0.1:5000/static/app.css">'
+        )
+        == "/static/app.css"
+    )
+    assert bench.stylesheet_path("<html></html>") == "/static/dist/css/output.css"
+
+
+def test_load_measures_each_path(server):
+    results = bench.load(
+        server, ["/", "/chunked"], concurrency=4, duration=0.3, warmup=0.1
+    )
+    for path in ("/", "/chunked", "total"):
+        stats = results[path]
+        assert stats["requests"] > 0
+        assert stats["errors"] == 0
+        assert 0 < stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+    assert results["total"]["requests"] == (
+        results["/"]["requests"] + results["/chunked"]["requests"]
+    )
+
+
+def test_load_counts_error_responses(server):
+    results = bench.load(server, ["/missing"], concurrency=2, duration=0.2, warmup=0)
+    assert results["/missing"]["requests"] == 0
+    assert results["/missing"]["errors"] > 0
+
+
+def test_load_backs_off_while_the_server_is_down():
+    port = bench.free_port()  # nothing listens there
+    results = bench.load(port, ["/"], concurrency=4, duration=0.5, warmup=0)
+    assert results["/"]["requests"] == 0
+    # A handful of attempts per connection, not one per event loop turn
+    assert 0 < results["/"]["errors"] <= 4 * 8
+
+
+def test_production_server_needs_the_profile(tmp_path):
+    with pytest.raises(bench.BenchError):
+        bench.server_for(tmp_path, "flask", 5000, "production")
+    command, kind = bench.server_for(tmp_path, "fastapi", 5000, "auto")
+    assert kind == "dev"
+    assert "--reload" not in command
+
+
+@patch("tailgen.bench.run")
+def test_bench_command_writes_json(run, tmp_path):
+    stats = dict.fromkeys(
+        ("requests", "errors", "requests_per_second", "mean_ms", "p50_ms"), 0
+    )
+    stats.update(requests=10, p95_ms=1.0, p99_ms=2.0)
+    run.return_value = {
+        "project": "shop",
+        "framework": "flask",
+        "server": "dev",
+        "concurrency": 2,
+        "duration": 1.0,
+        "cpus": 1,
+        "results": {"/": stats, "total": stats},
+    }
+    result = runner.invoke(
+        cli.app, ["bench", str(tmp_path), "-c", "2", "-d", "1", "--server", "dev"]
+    )
+    assert result.exit_code == 0, result.stdout
+    run.assert_called_once_with(tmp_path, 2, 1.0, 1.0, "dev", None)
+    report = json.loads((tmp_path / ".tailgen" / "bench.json").read_text())
+    assert report["results"]["/"]["requests"] == 10
+
+
+@pytest.mark.parametrize(
+    "framework, module, requirements",
+    [
+        ("flask", flask_app, ("flask",)),
+        ("fastapi", fastapi_app, ("fastapi", "jinja2", "uvicorn")),
+    ],
+)
+def test_bench_generated_app(tmp_path, framework, module, requirements):
+    for requirement in requirements:
+        pytest.importorskip(requirement)
+    project_dir = tmp_path / "shop"
+    project_dir.mkdir()
+    templates.write_templates(
+        project_dir,
+        module.__name__,
+        module.APP_FILES,
+        templates.project_variables(project_dir, framework),
+    )
+    css = project_dir / "static" / "dist" / "css" / "output.css"
+    css.parent.mkdir(parents=True)
+    css.write_text("body{margin:0}")
+
+    report = bench.run(project_dir, concurrency=2, duration=0.5, warmup=0.1)
+    assert report["server"] == "dev"
+    assert set(report["results"]) == {"/", "/static/dist/css/output.css", "total"}
+    assert report["results"]["total"]["errors"] == 0
+    assert report["results"]["/static/dist/css/output.css"]["requests"] > 0
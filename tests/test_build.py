@@ -0,0 +1,167 @@
+import gzip
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from tailgen import build, cli
+
+runner = CliRunner()
+
+CONFIG = """module.exports = {
+  content: [
+    "./templates/**/*.html",
+    './static/src/**/*.{js,ts}',
+    "!./templates/drafts/**",
+  ],
+}
+"""
+
+# Stands in for the standalone CLI: writes the output and counts its runs
+FAKE_TAILWIND = """#!/bin/sh
+echo run >> runs.log
+mkdir -p static/dist/css
+echo "$@" > static/dist/css/output.css
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "templates" / "drafts").mkdir(parents=True)
+    (tmp_path / "templates" / "index.html").write_text('<p class="p-4"></p>')
+    (tmp_path / "templates" / "drafts" / "wip.html").write_text("")
+    (tmp_path / "static" / "src").mkdir(parents=True)
+    (tmp_path / "static" / "src" / "input.css").write_text("@tailwind base;\n")
+    (tmp_path / "static" / "src" / "app.ts").write_text("")
+    (tmp_path / "tailwind.config.js").write_text(CONFIG)
+    binary = tmp_path / "bin" / "tailwindcss"
+    binary.parent.mkdir()
+    binary.write_text(FAKE_TAILWIND)
+    binary.chmod(0o755)
+    return tmp_path
+
+
+def runs(project):
+    log = project / "runs.log"
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+def test_content_globs():
+    assert build.content_globs(CONFIG) == [
+        "./templates/**/*.html",
+        "./static/src/**/*.{js,ts}",
+        "!./templates/drafts/**",
+    ]
+    assert build.content_globs("module.exports = {content: {files: ['a.html']}}") == [
+        "a.html"
+    ]
+    assert build.content_globs("module.exports = require('./shared')") is None
+
+
+def test_input_files_follow_globs(project):
+    files = build.input_files(project.resolve(), build.content_globs(CONFIG))
+    assert [path.relative_to(project.resolve()).as_posix() for path in files] == [
+        "static/src/app.ts",
+        "static/src/input.css",
+        "tailwind.config.js",
+        "templates/index.html",
+    ]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fake CLI is a shell script")
+def test_build_skips_when_nothing_changed(project):
+    assert build.build_css(project).built
+    assert "--minify" in (project / build.OUTPUT_CSS).read_text()
+    assert not build.build_css(project).built
+    assert runs(project) == 1
+
+    # A file outside the content globs changes nothing
+    (project / "templates" / "drafts" / "wip.html").write_text('<p class="m-2">')
+    (project / "notes.txt").write_text("")
+    assert not build.build_css(project).built
+
+    (project / "templates" / "index.html").write_text('<p class="p-8"></p>')
+    assert build.build_css(project).built
+    assert runs(project) == 2
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fake CLI is a shell script")
+def test_build_reruns_for_missing_output_or_other_flags(project):
+    build.build_css(project)
+    os.remove(project / build.OUTPUT_CSS)
+    assert build.build_css(project).built
+    assert build.build_css(project, minify=False).built
+    assert build.build_css(project, minify=False, force=True).built
+    assert runs(project) == 4
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fake CLI is a shell script")
+def test_build_command(project):
+    result = runner.invoke(cli.app, ["build", str(project)])
+    assert result.exit_code == 0, result.stdout
+    assert "Built" in result.stdout
+
+    result = runner.invoke(cli.app, ["build", str(project)])
+    assert result.exit_code == 0
+    assert "up to date" in result.stdout
+
+
+def test_build_command_without_config(tmp_path):
+    result = runner.invoke(cli.app, ["build", str(tmp_path)])
+    assert result.exit_code == 1
+    assert "tailwind.config.js" in result.stdout
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fake CLI is a shell script")
+def test_build_fingerprints_the_css(project):
+    build.build_css(project)
+    manifest = json.loads((project / build.MANIFEST).read_text())
+    first = manifest["dist/css/output.css"]
+    assert re.fullmatch(r"dist/css/output\.[0-9a-f]{12}\.css", first)
+    assert (project / "static" / first).read_bytes() == (
+        project / build.OUTPUT_CSS
+    ).read_bytes()
+
+    (project / "static" / "dist" / "css" / "output.min.css").write_text("")
+    build.build_css(project, minify=False)
+    manifest = json.loads((project / build.MANIFEST).read_text())
+    second = manifest["dist/css/output.css"]
+    assert second != first
+    # Besides the precompressed siblings, which depend on brotli being installed
+    files = {
+        path.name
+        for path in (project / "static/dist/css").iterdir()
+        if path.suffix not in (".gz", ".br")
+    }
+    assert files == {
+        "output.css",
+        Path(second).name,
+        "output.min.css",
+    }
+
+
+def test_precompress_writes_smaller_siblings(tmp_path, monkeypatch):
+    monkeypatch.setattr(build, "brotli", None)
+    dist = tmp_path / build.DIST_DIR / "css"
+    dist.mkdir(parents=True)
+    css = dist / "output.css"
+    css.write_text(".p-4 { padding: 1rem }\n" * 100)
+    (dist / "tiny.css").write_text("p{}")
+
+    assert build.precompress(tmp_path) == [dist / "output.css.gz"]
+    assert gzip.decompress((dist / "output.css.gz").read_bytes()) == css.read_bytes()
+    assert build.precompress(tmp_path) == []
+
+    # A sibling left by a build with brotli no longer matches the file
+    (dist / "output.css.br").write_bytes(b"stale")
+    os.utime(dist / "output.css.br", ns=(0, 0))
+    build.precompress(tmp_path)
+    assert not (dist / "output.css.br").exists()
+
+    css.unlink()
+    build.precompress(tmp_path)
+    assert sorted(path.name for path in dist.iterdir()) == ["tiny.css"]
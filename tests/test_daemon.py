@@ -0,0 +1,146 @@
+import socket
+import threading
+from contextlib import contextmanager
+
+import pytest
+import typer
+
+from tailgen import client, daemon, output
+from tailgen.scheduler import Stage, run_stages
+from tailgen.settings import Settings, get_settings
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets"
+)
+
+
+@pytest.fixture
+def socket_path(tmp_path, monkeypatch):
+    monkeypatch.delenv("TAILGEN_NO_DAEMON")
+    monkeypatch.setenv("TAILGEN_SOCKET", str(tmp_path / "serve.sock"))
+    return tmp_path / "serve.sock"
+
+
+@contextmanager
+def serving(scaffold, workers=2):
+    with daemon.listening(None, scaffold, workers) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            yield server
+        finally:
+            server.shutdown()
+            thread.join()
+
+
+def test_client_gets_output_and_exit_status(socket_path, capsys):
+    def scaffold(framework, name, output_dir, timings, trace, workspace):
+        output.step(f"{framework} {name} in {output_dir} ({get_settings().tailwind})")
+        raise typer.Exit(code=3)
+
+    with serving(scaffold):
+        assert socket_path.stat().st_mode & 0o777 == 0o600
+        with client.find() as connection:
+            settings = Settings(tailwind="standalone")
+            assert connection.init("flask", "demo", "/srv", settings) == 3
+    assert capsys.readouterr().out == "flask demo in /srv (standalone)\n"
+    assert not socket_path.exists()
+
+
+def test_concurrent_requests_keep_their_output_apart(socket_path, capsys):
+    both_running = threading.Barrier(2, timeout=5)
+
+    def scaffold(framework, name, output_dir, timings, trace, workspace):
+        def work(part):
+            if part == "venv":
+                both_running.wait()
+            output.step(f"{name} {part}")
+
+        run_stages([Stage("venv", work, ("venv",)), Stage("npm", work, ("npm",))])
+
+    received = {}
+
+    # Read each client's messages directly rather than through sys.stdout
+    def collect(name):
+        connection = client.find()
+        connection._send(
+            {
+                "command": "init",
+                "framework": "flask",
+                "name": name,
+                "output_dir": "/srv",
+                "settings": {},
+            }
+        )
+        text = []
+        while True:
+            message = connection._receive()
+            if message["type"] == "exit":
+                break
+            text.append(message["text"])
+        connection.close()
+        received[name] = (message["code"], "".join(text))
+
+    with serving(scaffold):
+        threads = [threading.Thread(target=collect, args=(n,)) for n in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert received == {"a": (0, "a venv\na npm\n"), "b": (0, "b venv\nb npm\n")}
+
+
+def test_serve_refuses_to_start_twice_and_replaces_stale_sockets(socket_path):
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(socket_path))
+    stale.close()
+
+    with serving(lambda *args: None):
+        with pytest.raises(daemon.DaemonError, match="already listening"):
+            with daemon.listening(None, lambda *args: None):
+                pass
+
+
+def test_init_hands_the_project_to_the_daemon(socket_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("builtins.input", lambda prompt: "demo")
+    calls = []
+
+    def scaffold(*args):
+        calls.append(args)
+        output.step("scaffolded")
+
+    with serving(scaffold):
+        assert client.init(["-f", "FastAPI", "-o", "out", "--timings"]) == 0
+    assert calls == [("fastapi", "demo", str(tmp_path / "out"), True, None, None)]
+
+
+def test_init_hands_workspace_services_to_the_daemon(
+    socket_path, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("builtins.input", lambda prompt: "billing")
+    calls = []
+
+    with serving(lambda *args: calls.append(args)):
+        assert client.init(["--workspace", "platform"]) == 0
+        # A service is always created in the workspace itself
+        assert client.init(["--workspace", "platform", "-o", "out"]) is None
+    assert calls == [
+        ("flask", "billing", str(tmp_path), False, None, str(tmp_path / "platform"))
+    ]
+
+
+@pytest.mark.parametrize(
+    "argv", [["--help"], ["--resume"], ["-f", "django"], ["--framework"]]
+)
+def test_init_leaves_what_it_does_not_handle_to_the_cli(socket_path, argv):
+    with serving(lambda *args: None):
+        assert client.init(argv) is None
+
+
+def test_init_without_a_daemon_is_left_to_the_cli(socket_path, monkeypatch):
+    assert client.init([]) is None
+    with serving(lambda *args: None):
+        monkeypatch.setenv("TAILGEN_NO_DAEMON", "1")
+        assert client.init([]) is None
@@ -0,0 +1,137 @@
+import http.client
+import queue
+import threading
+import time
+
+import pytest
+from typer.testing import CliRunner
+
+from tailgen import cli, dev, watch
+from tailgen.build import OUTPUT_CSS
+
+runner = CliRunner()
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def make_watcher(request):
+    if request.param == "inotify":
+        try:
+            watch.InotifyWatcher([])
+        except (OSError, AttributeError):
+            pytest.skip("inotify is not available")
+        return watch.InotifyWatcher
+    return lambda roots: watch.PollingWatcher(roots, interval=0.01)
+
+
+def test_watcher_sees_changes_in_new_directories(make_watcher, tmp_path):
+    files = make_watcher([tmp_path])
+    try:
+        assert files.read(0.05) == set()
+        (tmp_path / "index.html").write_text("a")
+        assert tmp_path / "index.html" in files.read(1)
+
+        (tmp_path / "partials").mkdir()
+        (tmp_path / "partials" / "nav.html").write_text("b")
+        seen = set()
+        deadline = time.monotonic() + 2
+        while tmp_path / "partials" / "nav.html" not in seen:
+            assert time.monotonic() < deadline
+            seen |= files.read(0.2)
+    finally:
+        files.close()
+
+
+@pytest.fixture
+def reloads(tmp_path):
+    """Events sent while watch_for_reloads follows a project in tmp_path"""
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "static" / "src").mkdir(parents=True)
+    broadcaster = dev.Broadcaster()
+    events = broadcaster.subscribe()
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=dev.watch_for_reloads, args=(tmp_path, broadcaster, stop)
+    )
+    thread.start()
+    time.sleep(0.2)  # let the watcher start before anything changes
+    yield events
+    stop.set()
+    thread.join()
+
+
+def test_template_change_reloads_the_page(tmp_path, reloads):
+    start = time.monotonic()
+    (tmp_path / "templates" / "index.html").write_text("<p></p>")
+    event, data = reloads.get(timeout=2)
+    assert (event, data) == ("reload", {"files": ["templates/index.html"]})
+    assert time.monotonic() - start < 1
+
+
+def test_css_rewrite_swaps_stylesheets(tmp_path, reloads):
+    (tmp_path / OUTPUT_CSS).write_text("p {}")
+    assert reloads.get(timeout=2) == ("css", {})
+
+
+def test_first_build_swaps_stylesheets_once_written(tmp_path, reloads):
+    with open(tmp_path / OUTPUT_CSS, "w") as css:
+        # Nothing is sent for the still empty file
+        with pytest.raises(queue.Empty):
+            reloads.get(timeout=0.3)
+        css.write("p {}")
+    assert reloads.get(timeout=2) == ("css", {})
+    with pytest.raises(queue.Empty):
+        reloads.get(timeout=0.5)
+
+
+def test_template_and_css_change_reload_once(tmp_path, reloads):
+    (tmp_path / "templates" / "index.html").write_text('<p class="m-1"></p>')
+    (tmp_path / OUTPUT_CSS).write_text(".m-1 {}")
+    assert reloads.get(timeout=2)[0] == "reload"
+    with pytest.raises(queue.Empty):
+        reloads.get(timeout=0.5)
+
+
+def test_editor_swap_files_are_ignored(tmp_path, reloads):
+    (tmp_path / "templates" / ".index.html.swp").write_text("")
+    with pytest.raises(queue.Empty):
+        reloads.get(timeout=0.5)
+
+
+def test_livereload_server_streams_events():
+    broadcaster = dev.Broadcaster()
+    server = dev.LiveReloadServer(broadcaster, port=0)
+    server.start()
+    try:
+        host, port = server.url.rsplit(":", 1)
+        connection = http.client.HTTPConnection("127.0.0.1", int(port), timeout=5)
+        connection.request("GET", "/livereload.js")
+        script = connection.getresponse().read().decode()
+        assert f"{server.url}/events" in script
+
+        connection = http.client.HTTPConnection("127.0.0.1", int(port), timeout=5)
+        connection.request("GET", "/events")
+        response = connection.getresponse()
+        assert response.getheader("Content-Type") == "text/event-stream"
+        assert response.readline() == b"retry: 500\n"
+        response.readline()
+
+        broadcaster.send("css")
+        assert response.readline() == b"event: css\n"
+        assert response.readline() == b"data: {}\n"
+        connection.close()
+    finally:
+        server.stop()
+
+
+def test_server_command_per_framework(tmp_path):
+    (tmp_path / "main.py").write_text("")
+    assert dev.detect_framework(tmp_path) == "fastapi"
+    command = dev.server_command(tmp_path, "fastapi", 8000)
+    assert command[1:] == ["-m", "uvicorn", "main:app", "--reload", "--port", "8000"]
+    assert dev.server_command(tmp_path, "flask", 5000)[1:4] == ["-m", "flask", "--app"]
+
+
+def test_dev_outside_a_project_fails(tmp_path):
+    result = runner.invoke(cli.app, ["dev", str(tmp_path)])
+    assert result.exit_code == 1
+    assert "does not look like a Flask or FastAPI project" in result.stdout
@@ -0,0 +1,139 @@
+import os
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from tailgen import FRAMEWORK_REQUIREMENTS
+from tailgen.cache import clone_tree
+from tailgen.process import ProcessError, ProcessResult
+from tailgen.settings import configure
+from tailgen.environments import (
+    _build_venv,
+    _bundled_pip_wheel,
+    _create_venv,
+    _install_framework,
+    _requirements_installed,
+    _site_packages,
+    _venv_executable,
+)
+
+
+def fake_build_venv(venv_dir: Path) -> None:
+    """Lay out the files of a venv that embed its location"""
+    scripts = _venv_executable(venv_dir, "python").parent
+    scripts.mkdir(parents=True)
+    (venv_dir / "pyvenv.cfg").write_text(f"command = python -m venv {venv_dir}\n")
+    (scripts / "activate").write_text(f'VIRTUAL_ENV="{venv_dir}"\n')
+    site_packages = venv_dir / "lib" / "site-packages"
+    site_packages.mkdir(parents=True)
+    (site_packages / "pip.py").write_text("# pip\n")
+
+
+def fake_pip_install(venv_dir: Path, packages) -> None:
+    scripts = _venv_executable(venv_dir, "python").parent
+    (scripts / "flask").write_text(f"#!{scripts / 'python'}\nimport flask\n")
+    (venv_dir / "lib" / "site-packages" / "flask.py").write_text("# flask\n")
+
+
+def test_second_project_clones_cached_venv(tmp_path, cache_dir):
+    with patch(
+        "tailgen.environments._build_venv", side_effect=fake_build_venv
+    ) as mock_build, patch(
+        "tailgen.environments._install_framework", side_effect=fake_pip_install
+    ) as mock_pip, patch(
+        "tailgen.environments._framework_lock", return_value=None
+    ):
+        _create_venv(tmp_path / "first", "flask")
+        _create_venv(tmp_path / "second", "flask")
+
+    mock_build.assert_called_once()
+    mock_pip.assert_called_once()
+
+    venv_dir = tmp_path / "second" / "venv"
+    scripts = _venv_executable(venv_dir, "python").parent
+    assert str(venv_dir) in (venv_dir / "pyvenv.cfg").read_text()
+    assert (scripts / "activate").read_text() == f'VIRTUAL_ENV="{venv_dir}"\n'
+    assert (scripts / "flask").read_text().startswith(f"#!{scripts / 'python'}\n")
+    assert (venv_dir / "lib" / "site-packages" / "flask.py").read_text() == "# flask\n"
+    assert _requirements_installed(venv_dir, FRAMEWORK_REQUIREMENTS["flask"])
+    assert not _requirements_installed(venv_dir, FRAMEWORK_REQUIREMENTS["fastapi"])
+
+    # Rewriting a clone must never leak back into the cached copy
+    golden = next((cache_dir / "venvs").iterdir()) / "venv"
+    assert str(golden) in (golden / "pyvenv.cfg").read_text()
+
+
+def test_rejected_lock_falls_back_to_unpinned(tmp_path, cache_dir):
+    lock = tmp_path / "flask.lock"
+    mismatch = ProcessResult(["pip"], 1, [], ["THESE PACKAGES DO NOT MATCH THE HASHES"])
+    with patch("tailgen.environments._framework_lock", return_value=lock), patch(
+        "tailgen.environments._pip_install",
+        side_effect=[ProcessError(mismatch), None],
+    ) as pip_install:
+        _install_framework(tmp_path / "venv", "flask")
+
+    assert "--require-hashes" in pip_install.call_args_list[0].args[1]
+    assert pip_install.call_args_list[1].args[1] == list(
+        FRAMEWORK_REQUIREMENTS["flask"]
+    )
+
+
+def test_clone_tree_shares_data_and_keeps_symlinks(tmp_path):
+    source = tmp_path / "source"
+    (source / "lib").mkdir(parents=True)
+    (source / "lib" / "module.py").write_text("x = 1\n")
+    os.symlink("lib", source / "lib64")
+
+    clone_tree(source, tmp_path / "clone")
+
+    clone = tmp_path / "clone"
+    assert (clone / "lib" / "module.py").read_text() == "x = 1\n"
+    assert os.readlink(clone / "lib64") == "lib"
+
+
+@pytest.mark.skipif(
+    os.name == "nt" or _bundled_pip_wheel() is None,
+    reason="pip is seeded only from a bundled wheel, and not on Windows",
+)
+def test_build_venv_seeds_pip_from_the_cache(tmp_path, cache_dir):
+    with patch("tailgen.environments.run_process") as run_process:
+        _build_venv(tmp_path / "first" / "venv")
+        _build_venv(tmp_path / "second" / "venv")
+    run_process.assert_not_called()  # no ensurepip
+
+    assert len(list((cache_dir / "pip").glob("*/pip"))) == 1
+    venv_dir = tmp_path / "second" / "venv"
+    version = subprocess.run(
+        [_venv_executable(venv_dir, "pip"), "--version"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert str(_site_packages(venv_dir)) in version
+
+
+def test_build_venv_falls_back_to_ensurepip(tmp_path, cache_dir):
+    venv_dir = tmp_path / "venv"
+    with patch("tailgen.environments._bundled_pip_wheel", return_value=None), patch(
+        "tailgen.environments.run_process"
+    ) as run_process:
+        _build_venv(venv_dir)
+    run_process.assert_called_once_with(
+        [_venv_executable(venv_dir, "python"), "-m", "ensurepip"]
+    )
+
+
+def test_build_venv_without_cache_uses_ensurepip(tmp_path, cache_dir):
+    venv_dir = tmp_path / "venv"
+    configure(use_cache=False)
+    try:
+        with patch("tailgen.environments.run_process") as run_process:
+            _build_venv(venv_dir)
+    finally:
+        configure()
+    run_process.assert_called_once_with(
+        [_venv_executable(venv_dir, "python"), "-m", "ensurepip"]
+    )
+    assert not (cache_dir / "pip").exists()
@@ -0,0 +1,160 @@
+import shutil
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from tailgen import cli, git
+from tailgen.helpers import _git_commit
+
+runner = CliRunner()
+
+FILES = {
+    ".gitignore": "venv\n",
+    "app.py": "from flask import Flask\n",
+    "templates/index.html": "<p></p>\n",
+    "static/src/input.css": "@tailwind base;\n",
+}
+
+needs_git = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+
+@pytest.fixture
+def gitconfig(tmp_path, monkeypatch):
+    """An isolated global git config with an identity"""
+    config = tmp_path / "gitconfig"
+    config.write_text(
+        '[user]\n\tname = "Ada Lovelace" # comment\n\temail = ada@example.com\n'
+        '[remote "origin"]\n\turl = x\n'
+    )
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(config))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for variable in ("NAME", "EMAIL"):
+        for role in ("AUTHOR", "COMMITTER"):
+            monkeypatch.delenv(f"GIT_{role}_{variable}", raising=False)
+    monkeypatch.delenv("EMAIL", raising=False)
+    return config
+
+
+def scaffold(project_dir: Path) -> Path:
+    for path, content in FILES.items():
+        (project_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (project_dir / path).write_text(content)
+    (project_dir / "build.sh").write_text("#!/bin/sh\n")
+    (project_dir / "build.sh").chmod(0o755)
+    (project_dir / "venv").mkdir()
+    (project_dir / "venv" / "pyvenv.cfg").write_text("home = /usr\n")
+    return project_dir
+
+
+def run_git(project_dir, *args) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=project_dir, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def test_identity_from_config(gitconfig):
+    config = git.read_config()
+    assert config["remote.origin.url"] == "x"
+    assert git.identity("AUTHOR", config) == ("Ada Lovelace", "ada@example.com")
+
+
+def test_commit_needs_an_identity(tmp_path, gitconfig):
+    gitconfig.write_text("")
+    with pytest.raises(git.GitError):
+        git.commit_files(scaffold(tmp_path), list(FILES))
+    assert not (tmp_path / ".git").exists()
+
+
+def test_init_uses_the_default_branch(tmp_path, gitconfig):
+    gitconfig.write_text("[init]\n\tdefaultBranch = main\n")
+    git_dir = git.init_repository(tmp_path)
+    assert (git_dir / "HEAD").read_text() == "ref: refs/heads/main\n"
+
+
+@needs_git
+def test_commit_is_what_git_would_write(tmp_path, gitconfig):
+    project_dir = scaffold(tmp_path / "ours")
+    commit = git.commit_files(project_dir, [*FILES, "build.sh", "README.md"])
+
+    assert run_git(project_dir, "rev-parse", "HEAD") == commit
+    run_git(project_dir, "fsck", "--strict")
+    # The index matches the files on disk; the venv is ignored
+    assert run_git(project_dir, "status", "--porcelain") == ""
+    assert "100755 blob" in run_git(project_dir, "ls-tree", "HEAD", "build.sh")
+    assert run_git(project_dir, "log", "--format=%an <%ae>|%s") == (
+        f"Ada Lovelace <ada@example.com>|{git.COMMIT_MESSAGE}"
+    )
+
+    theirs = scaffold(tmp_path / "theirs")
+    run_git(theirs, "init", "--quiet")
+    run_git(theirs, "add", *FILES, "build.sh")
+    assert run_git(theirs, "write-tree") == run_git(
+        project_dir, "rev-parse", "HEAD^{tree}"
+    )
+
+
+@needs_git
+def test_commit_into_existing_history_keeps_it(tmp_path, gitconfig):
+    project_dir = scaffold(tmp_path / "project")
+    run_git(project_dir, "init", "--quiet")
+    (project_dir / "keep.txt").write_text("kept\n")
+    run_git(project_dir, "add", "keep.txt")
+    run_git(project_dir, "commit", "--quiet", "-m", "Earlier work")
+    (project_dir / "staged.txt").write_text("staged\n")
+    run_git(project_dir, "add", "staged.txt")
+
+    assert git.has_history(project_dir)
+    with pytest.raises(git.GitError, match="already has commits"):
+        git.commit_files(project_dir, ["app.py"])
+
+    _git_commit(project_dir, ["app.py"])
+    assert run_git(project_dir, "log", "--format=%s") == (
+        f"{git.COMMIT_MESSAGE}\nEarlier work"
+    )
+    assert run_git(project_dir, "ls-files").split() == [
+        "app.py",
+        "keep.txt",
+        "staged.txt",
+    ]
+
+
+def test_same_files_same_commit(tmp_path, gitconfig, monkeypatch):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    first = git.commit_files(scaffold(tmp_path / "first"), list(FILES))
+    second = git.commit_files(scaffold(tmp_path / "second"), list(FILES))
+    assert first == second
+
+
+@patch("tailgen.cli.setup_complete")
+@patch("tailgen.cli._git_commit")
+@patch("tailgen.cli.update_package_json_with_build_script")
+@patch("tailgen.cli._install_and_configure_tailwindcss")
+@patch("tailgen.cli._create_flask_project")
+@patch("tailgen.cli._git_init")
+@patch("tailgen.cli._create_readme")
+@patch("tailgen.cli._create_git_ignore")
+@patch("tailgen.cli._create_venv")
+def test_init_commit_runs_last_with_the_generated_files(
+    _venv,
+    _gitignore,
+    _readme,
+    _git,
+    _create_project,
+    _tailwind,
+    package_json,
+    git_commit,
+    _complete,
+    tmp_path,
+):
+    result = runner.invoke(
+        cli.app, ["init", "--commit", "-o", str(tmp_path)], input="shop\n"
+    )
+    assert result.exit_code == 0, result.stdout
+    package_json.assert_called_once()
+    project_dir, paths = git_commit.call_args.args
+    assert project_dir == tmp_path / "shop"
+    assert {".gitignore", "README.md", "app.py", "package.json"} <= set(paths)
+    assert not any(path.startswith(("venv", "node_modules", ".git/")) for path in paths)
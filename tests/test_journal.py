@@ -0,0 +1,123 @@
+import json
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from tailgen import cli
+from tailgen.journal import Journal
+from tailgen.settings import configure
+
+runner = CliRunner()
+
+STAGE_OUTPUTS = {
+    "_create_venv": ["venv/pyvenv.cfg"],
+    "_create_git_ignore": [".gitignore"],
+    "_create_readme": ["README.md"],
+    "_git_init": [".git/HEAD"],
+    "_create_flask_project": ["app.py", "templates/index.html"],
+    "_install_and_configure_tailwindcss": [
+        "tailwind.config.js",
+        "static/src/input.css",
+        "node_modules/tailwindcss/package.json",
+    ],
+    "update_package_json_with_build_script": ["package.json"],
+}
+
+
+def fake_stage(paths, fail=False):
+    """A stage that creates its output files, or fails before doing so"""
+
+    def run(project_dir, *args):
+        if fail:
+            raise RuntimeError("npm ran out of memory")
+        for path in paths:
+            (project_dir / path).parent.mkdir(parents=True, exist_ok=True)
+            (project_dir / path).write_text("")
+
+    return MagicMock(side_effect=run)
+
+
+def run_init(args, failing=(), real=()):
+    with ExitStack() as stack:
+        mocks = {
+            name: stack.enter_context(
+                patch(f"tailgen.cli.{name}", fake_stage(paths, name in failing))
+            )
+            for name, paths in STAGE_OUTPUTS.items()
+            if name not in real
+        }
+        stack.enter_context(patch("tailgen.cli.setup_complete"))
+        result = runner.invoke(cli.app, ["init", *args], input="shop\n")
+    return result, mocks
+
+
+def test_resume_only_reruns_unfinished_steps(tmp_path):
+    result, _ = run_init(
+        ["-o", str(tmp_path)], failing={"_install_and_configure_tailwindcss"}
+    )
+    assert result.exit_code == 1
+
+    result, mocks = run_init(["--resume", "-o", str(tmp_path / "shop")])
+    assert result.exit_code == 0, result.stdout
+    rerun = {name for name, mock in mocks.items() if mock.called}
+    assert rerun == {
+        "_install_and_configure_tailwindcss",
+        "update_package_json_with_build_script",
+    }
+
+
+def test_resume_reruns_a_step_that_failed_with_its_output_present(tmp_path):
+    project = tmp_path / "shop"
+    project.mkdir()
+    # Left unreadable by an earlier npm run, so no build script can be added
+    (project / "package.json").write_text("{")
+    real = {"update_package_json_with_build_script"}
+    result, _ = run_init(["-o", str(tmp_path)], real=real)
+    assert result.exit_code == 1
+    assert "Error updating package.json" in result.stdout
+
+    (project / "package.json").write_text("{}")
+    result, mocks = run_init(["--resume", "-o", str(project)], real=real)
+    assert result.exit_code == 0, result.stdout
+    assert not any(mock.called for mock in mocks.values())
+    assert "build" in json.loads((project / "package.json").read_text())["scripts"]
+
+
+def test_plain_rerun_repairs_missing_outputs(tmp_path):
+    run_init(["-o", str(tmp_path)])
+    (tmp_path / "shop" / "README.md").unlink()
+
+    result, mocks = run_init(["-o", str(tmp_path)])
+    assert result.exit_code == 0
+    assert [name for name, mock in mocks.items() if mock.called] == ["_create_readme"]
+
+
+def test_resume_without_journal_fails(tmp_path):
+    result = runner.invoke(cli.app, ["init", "--resume", "-o", str(tmp_path)])
+    assert result.exit_code == 1
+    assert "No interrupted tailgen project" in result.stdout
+
+
+def test_steps_rerun_after_their_requirements(tmp_path):
+    (tmp_path / "venv").mkdir()
+    (tmp_path / "venv" / "pyvenv.cfg").write_text("")
+    (tmp_path / "app.py").write_text("")
+    journal = Journal(tmp_path, "flask")
+    journal.record("venv")
+    journal.record("flask")
+
+    journal = Journal(tmp_path, "flask")
+    assert journal.is_complete("flask", ["app.py"], requires=["venv"])
+    journal.record("venv")
+    assert not journal.is_complete("flask", ["app.py"], requires=["venv"])
+
+    # A different framework invalidates every checkpoint
+    assert not Journal(tmp_path, "fastapi").is_complete("venv", ["venv/pyvenv.cfg"])
+
+    # So do different settings
+    journal = Journal(tmp_path, "flask")
+    for setting in ({"profile": "production"}, {"offline": True}, {"git_cli": True}):
+        configure(**setting)
+        assert not journal.is_complete("venv", ["venv/pyvenv.cfg"])
+    configure()
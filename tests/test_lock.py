@@ -0,0 +1,49 @@
+import hashlib
+from unittest.mock import patch
+
+import pytest
+
+from tailgen.lock import (
+    find_lock,
+    lock_install_args,
+    lock_tag,
+    resolve_lock,
+    write_project_lock,
+)
+
+pytestmark = pytest.mark.usefixtures("no_shipped_locks")
+
+
+def test_resolve_lock_pins_versions_and_hashes(tmp_path, cache_dir, wheel_dir):
+    assert find_lock("flask") is None
+
+    lock = resolve_lock("flask", source=wheel_dir)
+
+    assert find_lock("flask") == lock
+    flask, werkzeug = (
+        hashlib.sha256((wheel_dir / f"{name}-9.0.0-py3-none-any.whl").read_bytes())
+        for name in ("flask", "werkzeug")
+    )
+    assert lock.read_text().splitlines()[2:] == [
+        "flask==9.0.0 \\",
+        f"    --hash=sha256:{flask.hexdigest()}",
+        "werkzeug==9.0.0 \\",
+        f"    --hash=sha256:{werkzeug.hexdigest()}",
+    ]
+    assert lock_install_args(lock) == ["--no-deps", "--require-hashes", "-r", str(lock)]
+
+    project = tmp_path / "project"
+    project.mkdir()
+    assert write_project_lock(project, "flask")
+    assert (project / "requirements.lock").read_text() == lock.read_text()
+
+
+@pytest.mark.parametrize(
+    "libc, tag",
+    [(("glibc", "2.36"), "manylinux_x86_64"), (("", ""), "musllinux_x86_64")],
+)
+def test_lock_tag_tells_musl_from_glibc(libc, tag):
+    with patch("sysconfig.get_platform", return_value="linux-x86_64"), patch(
+        "platform.libc_ver", return_value=libc
+    ):
+        assert lock_tag().endswith(f"-{tag}")
@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+from tailgen import npm_store
+from tailgen.npm_store import satisfies
+from tailgen.settings import configure
+from tests.conftest import make_tarball
+
+
+@pytest.fixture(autouse=True)
+def reset_settings():
+    yield
+    configure()
+
+
+def test_satisfies_common_ranges():
+    assert satisfies("1.4.2", "^1.2.3")
+    assert not satisfies("2.0.0", "^1.2.3")
+    assert satisfies("0.2.9", "^0.2.3") and not satisfies("0.3.0", "^0.2.3")
+    assert satisfies("1.2.9", "~1.2.3") and not satisfies("1.3.0", "~1.2.3")
+    assert satisfies("8.4.31", ">=8.0.9 <9") and satisfies("3.1.0", "^2 || ^3")
+    assert not satisfies("4.0.0-beta.1", "^4.0.0")
+    assert satisfies("4.0.0-beta.2", "^4.0.0-beta.1")
+
+
+def test_install_links_node_modules_from_store(tmp_path, cache_dir, tarball_dir):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+
+    npm_store.install(first, ["tailwindcss"])
+    npm_store.install(second, ["tailwindcss"])
+
+    modules = second / "node_modules"
+    assert (
+        json.loads((modules / "picocolors" / "package.json").read_text())["version"]
+        == "1.1.0"
+    )
+    nested = modules / "lilconf" / "node_modules" / "picocolors" / "package.json"
+    assert json.loads(nested.read_text())["version"] == "0.2.1"
+    assert os.readlink(modules / ".bin" / "tailwindcss") == os.path.join(
+        "..", "tailwindcss", "lib", "cli.js"
+    )
+
+    # Both projects share the store's copy of each file
+    index = "node_modules/tailwindcss/index.js"
+    assert os.stat(first / index).st_ino == os.stat(second / index).st_ino
+
+    package_json = json.loads((second / "package.json").read_text())
+    assert package_json["devDependencies"] == {"tailwindcss": "^3.4.0"}
+    lock = json.loads((second / "package-lock.json").read_text())
+    entry = lock["packages"]["node_modules/tailwindcss"]
+    assert entry["version"] == "3.4.0"
+    assert entry["integrity"].startswith("sha512-")
+
+
+def test_populated_store_works_offline(tmp_path, cache_dir, tarball_dir):
+    npm_store.install(tmp_path, ["tailwindcss"])
+    shutil.rmtree(tarball_dir)
+
+    configure(offline=True)
+    offline_project = tmp_path / "offline"
+    offline_project.mkdir()
+    npm_store.install(offline_project, ["tailwindcss"])
+    assert (
+        offline_project / "node_modules" / "tailwindcss" / "lib" / "cli.js"
+    ).exists()
+
+
+def test_expired_resolution_picks_up_new_releases(tmp_path, cache_dir, tarball_dir):
+    def installed(project):
+        project.mkdir()
+        npm_store.install(project, ["tailwindcss"])
+        package_json = project / "node_modules" / "tailwindcss" / "package.json"
+        return json.loads(package_json.read_text())["version"]
+
+    assert installed(tmp_path / "first") == "3.4.0"
+    make_tarball(tarball_dir, "tailwindcss", "3.4.1", dependencies={})
+    assert installed(tmp_path / "second") == "3.4.0"
+
+    expired = time.time() - npm_store.RESOLUTION_MAX_AGE - 60
+    for resolution in (cache_dir / "npm" / "resolutions").glob("*.json"):
+        os.utime(resolution, (expired, expired))
+    assert installed(tmp_path / "third") == "3.4.1"
+
+    # Without the registry, an expired resolution is still used
+    for resolution in (cache_dir / "npm" / "resolutions").glob("*.json"):
+        os.utime(resolution, (expired, expired))
+    shutil.rmtree(tarball_dir)
+    assert installed(tmp_path / "fourth") == "3.4.1"
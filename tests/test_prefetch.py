@@ -0,0 +1,87 @@
+import io
+import multiprocessing
+import time
+from unittest.mock import MagicMock, patch
+
+import click
+import pytest
+from typer.testing import CliRunner
+
+from tailgen import cli, npm_store, prefetch
+from tailgen.settings import configure
+
+runner = CliRunner()
+
+fork_only = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="the worker must inherit the test's patches",
+)
+
+
+@pytest.fixture(autouse=True)
+def default_settings():
+    configure()
+    yield
+    configure()
+
+
+def _sleep(framework, settings):
+    time.sleep(60)
+
+
+def test_tasks_follow_the_settings():
+    assert len(prefetch._tasks("flask")) == 2  # cached venv, npm packages
+    configure(use_cache=False)
+    assert prefetch._tasks("flask") == []
+    configure(use_cache=False, tailwind="standalone")
+    from tailgen.standalone import ensure_binary
+
+    assert prefetch._tasks("flask") == [ensure_binary]
+
+
+def test_failed_task_is_left_to_the_stage():
+    done = MagicMock()
+    with patch(
+        "tailgen.prefetch._tasks", return_value=[MagicMock(side_effect=OSError), done]
+    ):
+        prefetch._warm("flask")
+    done.assert_called_once_with()
+
+
+def test_no_prefetch_without_a_terminal():
+    with patch("sys.stdin", io.StringIO("shop\n")):
+        assert prefetch.start("flask") is None
+
+
+@fork_only
+def test_worker_fills_the_package_store(cache_dir, tarball_dir, tmp_path):
+    with patch("tailgen.environments._golden_venv") as golden_venv:
+        worker = prefetch.Prefetch("flask")
+        worker.process.join(30)
+    assert worker.process.exitcode == 0
+
+    # Everything is in the store now, so the stage needs no source at all
+    configure(offline=True)
+    tree = npm_store.install(tmp_path, ["tailwindcss"])
+    assert "node_modules/tailwindcss" in tree
+    golden_venv.assert_not_called()  # ran in the worker, not here
+
+
+@fork_only
+def test_stop_ends_a_running_worker():
+    with patch("tailgen.prefetch._worker", _sleep):
+        worker = prefetch.Prefetch("flask")
+    start = time.monotonic()
+    worker.stop()
+    assert not worker.process.is_alive()
+    assert time.monotonic() - start < prefetch.STOP_TIMEOUT
+
+
+@patch("tailgen.cli.typer.prompt", side_effect=click.exceptions.Abort)
+@patch("tailgen.prefetch.start")
+def test_init_stops_prefetch_when_the_prompt_is_aborted(start, _prompt, tmp_path):
+    result = runner.invoke(cli.app, ["init", "-o", str(tmp_path)])
+    assert result.exit_code != 0
+    start.assert_called_once_with("flask")
+    start.return_value.stop.assert_called_once_with()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,54 @@
+import sys
+
+import pytest
+
+from tailgen.process import TAIL_LINES, ProcessError, ProcessTimeout, run_process
+
+
+def python(code: str):
+    return [sys.executable, "-c", code]
+
+
+def test_chatty_stderr_does_not_deadlock():
+    """Far more stderr than a pipe buffer holds, written before any stdout"""
+    code = (
+        "import sys\n"
+        "for i in range(20000): sys.stderr.write('warning %d\\n' % i)\n"
+        "print('done')"
+    )
+    result = run_process(python(code), timeout=30)
+    assert result.stdout == ["done"]
+    assert len(result.stderr) == TAIL_LINES
+    assert result.stderr[-1] == "warning 19999"
+
+
+def test_lines_are_streamed_and_notices_filtered():
+    code = (
+        "import sys\n"
+        "print('Collecting flask', flush=True)\n"
+        "sys.stderr.write('[notice] A new release of pip is available\\n')\n"
+        "sys.stderr.write('WARNING: something\\n')"
+    )
+    seen = []
+    result = run_process(
+        python(code),
+        on_stdout=seen.append,
+        on_stderr=seen.append,
+        ignore_stderr=lambda line: line.startswith("[notice]"),
+    )
+    assert sorted(seen) == ["Collecting flask", "WARNING: something"]
+    assert result.stderr == ["WARNING: something"]
+
+
+def test_non_zero_exit_raises_with_stderr():
+    code = "import sys; sys.stderr.write('No matching distribution\\n'); sys.exit(1)"
+    with pytest.raises(ProcessError, match="No matching distribution"):
+        run_process(python(code))
+
+    result = run_process(python("import sys; sys.exit(3)"), check=False)
+    assert result.returncode == 3
+
+
+def test_timeout_kills_process():
+    with pytest.raises(ProcessTimeout):
+        run_process(python("import time; time.sleep(30)"), timeout=0.5)
@@ -0,0 +1,124 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from tailgen import cli, fastapi_app, flask_app, production, templates
+
+runner = CliRunner()
+
+FRAMEWORKS = {"flask": flask_app, "fastapi": fastapi_app}
+
+
+def scaffold(project_dir, framework):
+    """Write the app and production files, with the server install skipped"""
+    module = FRAMEWORKS[framework]
+    project_dir.mkdir()
+    (project_dir / "static").mkdir()
+    templates.write_templates(
+        project_dir,
+        module.__name__,
+        module.APP_FILES,
+        templates.project_variables(project_dir, framework),
+    )
+    with patch("tailgen.production._pip_install") as pip_install:
+        production._create_production_profile(project_dir, framework)
+    return pip_install
+
+
+@pytest.mark.parametrize("framework", sorted(FRAMEWORKS))
+def test_production_files_are_written(tmp_path, framework):
+    pip_install = scaffold(tmp_path / "shop", framework)
+    if os.name != "nt":
+        assert pip_install.call_args.args[1][-1] == (
+            "gunicorn" if framework == "flask" else "uvicorn-worker"
+        )
+
+    config = (tmp_path / "shop" / "gunicorn.conf.py").read_text()
+    port = templates.DEFAULT_PORTS[framework]
+    assert f'"0.0.0.0:{port}"' in config
+    settings = {}
+    exec(compile(config, "gunicorn.conf.py", "exec"), settings)
+    assert settings["workers"] >= 1
+    assert settings["preload_app"] is True
+    assert settings["backlog"] == 2048
+
+
+@patch("tailgen.cli.setup_complete")
+@patch("tailgen.cli._create_production_profile")
+@patch("tailgen.cli.update_package_json_with_build_script")
+@patch("tailgen.cli._install_and_configure_tailwindcss_fastapi")
+@patch("tailgen.cli._create_fastapi_project")
+@patch("tailgen.cli._git_init")
+@patch("tailgen.cli._create_readme")
+@patch("tailgen.cli._create_git_ignore")
+@patch("tailgen.cli._create_venv")
+def test_init_production_profile(
+    _venv,
+    _gitignore,
+    _readme,
+    _git,
+    create_project,
+    _tailwind,
+    _package_json,
+    create_production_profile,
+    _complete,
+    tmp_path,
+):
+    result = runner.invoke(
+        cli.app,
+        ["init", "-f", "fastapi", "--profile", "production", "-o", str(tmp_path)],
+        input="shop\n",
+    )
+    assert result.exit_code == 0, result.stdout
+    create_production_profile.assert_called_once_with(tmp_path / "shop", "fastapi")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="gunicorn does not run on Windows")
+@pytest.mark.parametrize("framework", sorted(FRAMEWORKS))
+def test_production_server_serves_the_app(tmp_path, framework):
+    pytest.importorskip("gunicorn")
+    pytest.importorskip("jinja2")
+    if framework == "flask":
+        pytest.importorskip("flask")
+    else:
+        pytest.importorskip("fastapi")
+        pytest.importorskip("uvicorn_worker")
+    project_dir = tmp_path / "shop"
+    scaffold(project_dir, framework)
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+        + ["--bind", f"127.0.0.1:{port}", "--workers", "2"],
+        cwd=project_dir,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/") as response:
+                    assert response.status == 200
+                    assert "Hello World" in response.read().decode()
+                break
+            except OSError:
+                assert server.poll() is None, "the server exited"
+                assert time.monotonic() < deadline, "the server did not start"
+                time.sleep(0.2)
+    finally:
+        server.terminate()
+        server.wait(10)
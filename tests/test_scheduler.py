@@ -0,0 +1,91 @@
+import sys
+import threading
+import time
+
+import pytest
+import typer
+
+from tailgen.scheduler import Stage, StageError, run_stages
+
+
+def test_independent_stages_run_concurrently():
+    """Two stages without dependencies should overlap instead of running serially"""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def work(value):
+        barrier.wait()
+        return value
+
+    results = run_stages([Stage("pip", work, (1,)), Stage("npm", work, (2,))])
+    assert results == {"pip": 1, "npm": 2}
+
+
+def test_dependencies_run_in_order():
+    calls = []
+    stages = [
+        Stage("venv", lambda: calls.append("venv")),
+        Stage("framework", lambda: calls.append("framework"), requires=("venv",)),
+    ]
+    run_stages(stages)
+    assert calls == ["venv", "framework"]
+
+
+def test_output_follows_declaration_order(capsys):
+    """Output of a later stage that finishes first is held back"""
+    first_may_finish = threading.Event()
+
+    def slow():
+        typer.echo("slow start")
+        first_may_finish.wait(5)
+        typer.echo("slow end")
+
+    def fast():
+        typer.echo("fast")
+        first_may_finish.set()
+
+    run_stages([Stage("slow", slow), Stage("fast", fast)])
+    assert capsys.readouterr().out == "slow start\nslow end\nfast\n"
+
+
+def test_buffered_output_rejects_bytes(capsys):
+    """click writes b"" to detect binary streams; a held-back stage must refuse it"""
+    first_may_finish = threading.Event()
+
+    def slow():
+        first_may_finish.wait(5)
+
+    def fast():
+        try:
+            with pytest.raises(TypeError):
+                sys.stdout.write(b"")
+            typer.echo("fast")
+        finally:
+            first_may_finish.set()
+
+    run_stages([Stage("slow", slow), Stage("fast", fast)])
+    assert capsys.readouterr().out == "fast\n"
+
+
+def test_failure_skips_dependents_but_not_independent_stages():
+    ran = []
+
+    def broken():
+        raise RuntimeError("pip exploded")
+
+    stages = [
+        Stage("venv", broken),
+        Stage("framework", lambda: ran.append("framework"), requires=("venv",)),
+        Stage("tailwindcss", lambda: (time.sleep(0.01), ran.append("tailwindcss"))),
+    ]
+    with pytest.raises(StageError) as error:
+        run_stages(stages)
+
+    assert ran == ["tailwindcss"]
+    assert [name for name, _ in error.value.failures] == ["venv"]
+    assert str(error.value.failures[0][1]) == "pip exploded"
+    assert error.value.skipped == ["framework"]
+
+
+def test_requires_must_be_declared_first():
+    with pytest.raises(ValueError):
+        run_stages([Stage("framework", print, requires=("venv",))])
@@ -0,0 +1,152 @@
+import hashlib
+import io
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from tailgen import cli, standalone
+from tailgen.settings import configure
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def binary(tmp_path):
+    """A downloaded executable standing in for the Tailwind CLI"""
+    path = tmp_path / "tailwindcss-download"
+    path.write_text("#!/bin/sh\necho tailwind\n")
+    return path
+
+
+def test_cache_warm_caches_a_downloaded_binary(cache_dir, binary):
+    result = runner.invoke(cli.app, ["cache", "warm", "--tailwind-binary", str(binary)])
+    assert result.exit_code == 0, result.stdout
+
+    cached = standalone.cached_binary()
+    assert cached.read_bytes() == binary.read_bytes()
+    assert os.access(cached, os.X_OK)
+
+
+def test_link_binary_points_at_the_cache(cache_dir, binary, tmp_path):
+    cached = standalone.add_binary(binary)
+    project = tmp_path / "shop"
+    project.mkdir()
+
+    link = standalone.link_binary(project)
+    assert link == project / standalone.PROJECT_BINARY
+    assert link.resolve() == cached.resolve()
+
+    # Linking again replaces the old link
+    assert standalone.link_binary(project) == link
+
+
+def fake_release(binary_data, sums):
+    """urlopen standing in for a Tailwind release's download URLs"""
+
+    def urlopen(url, timeout):
+        if url.endswith("/sha256sums.txt"):
+            if sums is None:
+                raise OSError("unreachable")
+            return io.BytesIO(sums.encode())
+        return io.BytesIO(binary_data)
+
+    return patch("tailgen.standalone.urllib.request.urlopen", urlopen)
+
+
+@pytest.mark.parametrize("matches", [True, False])
+def test_download_is_verified_before_it_is_cached(cache_dir, matches):
+    data = b"#!/bin/sh\necho tailwind\n"
+    digest = hashlib.sha256(data if matches else b"other").hexdigest()
+    sums = f"{digest}  ./{standalone.asset_name()}\n"
+    with fake_release(data, sums):
+        if matches:
+            assert standalone.ensure_binary().read_bytes() == data
+        else:
+            with pytest.raises(standalone.StandaloneError, match="Checksum"):
+                standalone.ensure_binary()
+    if not matches:
+        assert [path.name for path in standalone.cached_binary().parent.iterdir()] == [
+            "lock"
+        ]
+
+
+def test_download_without_checksums_fails(cache_dir):
+    with fake_release(b"#!/bin/sh\n", None):
+        with pytest.raises(standalone.StandaloneError, match="tailwind-binary"):
+            standalone.ensure_binary()
+    assert not standalone.cached_binary().exists()
+
+
+def test_offline_without_cached_binary_fails(cache_dir, tmp_path):
+    configure(offline=True)
+    try:
+        with patch("tailgen.standalone._download") as download:
+            with pytest.raises(standalone.StandaloneError, match="cache warm"):
+                standalone.link_binary(tmp_path)
+        download.assert_not_called()
+    finally:
+        configure()
+
+
+def test_build_script_is_executable(tmp_path):
+    standalone.write_build_script(tmp_path)
+    script = tmp_path / standalone.BUILD_SCRIPT
+    assert "bin/tailwindcss" in script.read_text()
+    assert os.access(script, os.X_OK)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="runs the shell script")
+def test_build_script_drops_the_manifest_of_tailgen_build(tmp_path, binary):
+    standalone.write_build_script(tmp_path)
+    (tmp_path / "bin").mkdir()
+    binary.chmod(0o755)
+    binary.rename(tmp_path / "bin" / "tailwindcss")
+    manifest = tmp_path / "static" / "dist" / "manifest.json"
+    manifest.parent.mkdir(parents=True)
+    manifest.write_text('{"dist/css/output.css": "dist/css/output.0123456789ab.css"}')
+
+    subprocess.run([str(tmp_path / standalone.BUILD_SCRIPT)], check=True)
+    assert not manifest.exists()
+
+
+@patch("tailgen.cli.setup_complete")
+@patch("tailgen.cli.update_package_json_with_build_script")
+@patch("tailgen.cli._write_build_script")
+@patch("tailgen.cli._install_and_configure_tailwindcss")
+@patch("tailgen.cli._create_flask_project")
+@patch("tailgen.cli._git_init")
+@patch("tailgen.cli._create_readme")
+@patch("tailgen.cli._create_git_ignore")
+@patch("tailgen.cli._create_venv")
+def test_init_standalone_skips_package_json(
+    _venv,
+    _gitignore,
+    _readme,
+    _git,
+    _flask,
+    install_tailwindcss,
+    write_build_script,
+    update_package_json,
+    _complete,
+    tmp_path,
+):
+    result = runner.invoke(
+        cli.app,
+        ["init", "--tailwind", "standalone", "-o", str(tmp_path)],
+        input="shop\n",
+    )
+    assert result.exit_code == 0, result.stdout
+    install_tailwindcss.assert_called_once_with(tmp_path / "shop")
+    write_build_script.assert_called_once_with(tmp_path / "shop")
+    update_package_json.assert_not_called()
+
+
+def test_init_rejects_unknown_tailwind_mode(tmp_path):
+    result = runner.invoke(
+        cli.app, ["init", "--tailwind", "cdn", "-o", str(tmp_path)], input="shop\n"
+    )
+    assert result.exit_code == 2
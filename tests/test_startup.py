@@ -0,0 +1,61 @@
+"""Startup cost of the tailgen command.
+
+``-X importtime`` reports the cumulative microseconds spent importing each
+module. The budget is generous for a slow CI machine, but a regression such
+as importing typer or the framework generators for ``--version`` blows it.
+"""
+
+import subprocess
+import sys
+
+from tailgen import __app_name__, __version__
+
+# Microseconds allowed for all imports made by ``python -m tailgen --version``
+# beyond the interpreter's own startup
+VERSION_IMPORT_BUDGET = 50_000
+
+
+def import_times(*args):
+    """Cumulative import time of every top-level import made by a command"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.rstrip()] = int(cumulative)
+    return result.stdout, times
+
+
+def test_version_is_within_import_budget():
+    stdout, times = import_times("-m", "tailgen", "--version")
+    assert stdout == f"{__app_name__} v{__version__}\n"
+
+    assert not {"typer", "rich", "tailgen.cli"} & {name.strip() for name in times}
+    top_level = {name for name in times if not name.startswith(" ")}
+    # site and encodings are imported by every interpreter before tailgen
+    spent = sum(times[name] for name in top_level - {"site", "encodings"})
+    assert spent < VERSION_IMPORT_BUDGET, f"{spent}us spent importing: {times}"
+
+
+def test_cli_does_not_import_generators_up_front():
+    _, times = import_times("-c", "import tailgen.cli")
+    modules = {name.strip() for name in times}
+    assert not modules & {
+        "tailgen.flask_app",
+        "tailgen.fastapi_app",
+        "tailgen.helpers",
+        "tailgen.npm_store",
+        "tailgen.batch",
+    }
+
+
+def test_init_client_does_not_import_the_cli():
+    _, times = import_times("-c", "import tailgen.client")
+    modules = {name.strip() for name in times}
+    assert not modules & {"typer", "click", "rich", "tailgen.cli"}
@@ -1,10 +1,15 @@
 # tests/test_cli.py
+import json
+import shutil
+import subprocess
 import tempfile
 import pytest
+from contextlib import ExitStack
 from typer.testing import CliRunner
 from unittest.mock import patch, MagicMock
 from pathlib import Path
-from tailgen import __app_name__, __version__, cli
+from tailgen import __app_name__, __version__, DELAY_DURATION, cli
+from tailgen.helpers import update_package_json_with_build_script
 
 runner = CliRunner()
 
@@ -34,6 +39,8 @@ def test_init_command_with_flask():
     ) as mock_create_flask, patch(
         "tailgen.cli._install_and_configure_tailwindcss"
     ) as mock_install_tailwind, patch(
+        "tailgen.cli.update_package_json_with_build_script"
+    ), patch(
         "tailgen.cli.input", side_effect=mock_user_input
     ):
         # Test initialization with default framework (Flask)
@@ -45,7 +52,7 @@ def test_init_command_with_flask():
         assert "Creating project directory" in result.stdout
 
         mock_init_dir.assert_called_once_with(Path.cwd(), "new_project")
-        mock_create_venv.assert_called_once_with(Path("/tmp/test_project"))
+        mock_create_venv.assert_called_once_with(Path("/tmp/test_project"), "flask")
         mock_create_git_ignore.assert_called_once_with(Path("/tmp/test_project"))
         mock_create_readme.assert_called_once_with(Path("/tmp/test_project"))
         mock_git_init.assert_called_once_with(Path("/tmp/test_project"))
@@ -68,6 +75,8 @@ def test_init_command_with_fastapi():
     ) as mock_create_fastapi, patch(
         "tailgen.cli._install_and_configure_tailwindcss_fastapi"
     ) as mock_install_tailwind_fastapi, patch(
+        "tailgen.cli.update_package_json_with_build_script"
+    ), patch(
         "tailgen.cli.input", side_effect=mock_user_input
     ):
 
@@ -79,7 +88,9 @@ def test_init_command_with_fastapi():
 
         # Check that the _init_project_directory was called with the correct arguments
         mock_init_dir.assert_called_once_with(Path.cwd(), "new_project")
-        mock_create_venv.assert_called_once_with(Path("/tmp/test_project_fastapi"))
+        mock_create_venv.assert_called_once_with(
+            Path("/tmp/test_project_fastapi"), "fastapi"
+        )
         mock_create_git_ignore.assert_called_once_with(
             Path("/tmp/test_project_fastapi")
         )
@@ -105,7 +116,7 @@ def test_init_command_flask_with_output_dir():
     ) as mock_create_flask, patch(
         "tailgen.cli._install_and_configure_tailwindcss"
     ) as mock_install_tailwind, patch(
-        "tailgen.cli.sleep", return_value=None
+        "tailgen.cli.update_package_json_with_build_script"
     ), patch(
         "builtins.input", lambda _: "new_project"
     ):
@@ -115,7 +126,7 @@ def test_init_command_flask_with_output_dir():
         assert "Creating project directory" in result.stdout
         assert "new_project" in result.stdout  # Ensuring the mock project name is used
         mock_init_dir.assert_called_once_with(Path("/tmp/test_project"), "new_project")
-        mock_create_venv.assert_called_once_with(Path("/tmp/test_project"))
+        mock_create_venv.assert_called_once_with(Path("/tmp/test_project"), "flask")
         mock_create_git_ignore.assert_called_once_with(Path("/tmp/test_project"))
         mock_create_readme.assert_called_once_with(Path("/tmp/test_project"))
         mock_git_init.assert_called_once_with(Path("/tmp/test_project"))
@@ -138,7 +149,7 @@ def test_init_command_fastapi_with_output_dir():
     ) as mock_create_fastapi, patch(
         "tailgen.cli._install_and_configure_tailwindcss_fastapi"
     ) as mock_install_tailwind_fastapi, patch(
-        "tailgen.cli.sleep", return_value=None
+        "tailgen.cli.update_package_json_with_build_script"
     ), patch(
         "builtins.input", lambda _: "new_project"
     ):
@@ -159,7 +170,9 @@ def test_init_command_fastapi_with_output_dir():
         mock_init_dir.assert_called_once_with(
             Path("/tmp/test_project_fastapi"), "new_project"
         )
-        mock_create_venv.assert_called_once_with(Path("/tmp/test_project_fastapi"))
+        mock_create_venv.assert_called_once_with(
+            Path("/tmp/test_project_fastapi"), "fastapi"
+        )
         mock_create_git_ignore.assert_called_once_with(
             Path("/tmp/test_project_fastapi")
         )
@@ -169,3 +182,75 @@ def test_init_command_fastapi_with_output_dir():
         mock_install_tailwind_fastapi.assert_called_once_with(
             Path("/tmp/test_project_fastapi")
         )
+
+
+def _mocked_flask_stages():
+    return (
+        patch(
+            "tailgen.cli._init_project_directory",
+            return_value=Path("/tmp/test_project"),
+        ),
+        patch("tailgen.cli._create_venv"),
+        patch("tailgen.cli._create_git_ignore"),
+        patch("tailgen.cli._create_readme"),
+        patch("tailgen.cli._git_init"),
+        patch("tailgen.cli._create_flask_project"),
+        patch("tailgen.cli._install_and_configure_tailwindcss"),
+        patch("tailgen.cli.update_package_json_with_build_script"),
+    )
+
+
+def test_init_does_not_sleep():
+    """A mocked init should spend no time idling between steps"""
+    with ExitStack() as stack:
+        for mock in _mocked_flask_stages():
+            stack.enter_context(mock)
+        stack.enter_context(patch("tailgen.prefetch.start"))
+        # Any fixed delay: time.sleep itself, and output's own reference to it
+        mock_sleeps = [
+            stack.enter_context(patch("time.sleep")),
+            stack.enter_context(patch("tailgen.output.sleep")),
+        ]
+
+        result = runner.invoke(cli.app, ["init"], input="\n")
+
+    assert result.exit_code == 0
+    for mock_sleep in mock_sleeps:
+        mock_sleep.assert_not_called()
+
+
+def test_init_with_pace_sleeps_after_steps():
+    with ExitStack() as stack:
+        for mock in _mocked_flask_stages():
+            stack.enter_context(mock)
+        mock_sleep = stack.enter_context(patch("tailgen.output.sleep"))
+
+        result = runner.invoke(cli.app, ["init", "--pace"], input="\n")
+
+    assert result.exit_code == 0
+    mock_sleep.assert_called_with(DELAY_DURATION)
+
+
+def test_init_without_cache_builds_plain_venv():
+    with ExitStack() as stack:
+        mocks = [stack.enter_context(mock) for mock in _mocked_flask_stages()]
+        result = runner.invoke(cli.app, ["init", "--no-cache"], input="\n")
+
+    assert result.exit_code == 0
+    mock_create_venv = mocks[1]
+    mock_create_venv.assert_called_once_with(Path("/tmp/test_project"))
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_build_script_drops_the_manifest_of_tailgen_build(tmp_path):
+    (tmp_path / "package.json").write_text("{}")
+    update_package_json_with_build_script(tmp_path)
+    script = json.loads((tmp_path / "package.json").read_text())["scripts"]["build"]
+    manifest = tmp_path / "static" / "dist" / "manifest.json"
+    manifest.parent.mkdir(parents=True)
+    manifest.write_text("{}")
+
+    # Only the part before Tailwind, which would need npx
+    removal = script.split(" && ")[0]
+    subprocess.run(removal, shell=True, cwd=tmp_path, check=True)
+    assert not manifest.exists()
@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+from tailgen import templates
+from tailgen.fastapi_app import _create_fastapi_project
+from tailgen.flask_app import _install_and_configure_tailwindcss
+
+
+def test_render_keeps_jinja_and_unknown_placeholders():
+    text = "<title>$title</title> {{ url_for('static') }} $unknown costs $5"
+    assert templates.render(text, {"title": "My Shop"}) == (
+        "<title>My Shop</title> {{ url_for('static') }} $unknown costs $5"
+    )
+
+
+def test_templates_are_read_once():
+    templates._template_set.cache_clear()
+    with patch.object(
+        templates.resources, "files", wraps=templates.resources.files
+    ) as mock_files:
+        templates.get_template("tailgen.flask_app", "app.txt")
+        templates.get_template("tailgen.flask_app", "index.txt")
+    mock_files.assert_called_once_with("tailgen.flask_app")
+
+
+def test_project_files_are_rendered(tmp_path):
+    project_dir = tmp_path / "my-shop"
+    project_dir.mkdir()
+    with patch("tailgen.fastapi_app._install_framework"), patch(
+        "tailgen.fastapi_app.write_project_lock", return_value=False
+    ):
+        _create_fastapi_project(project_dir)
+
+    assert 'uvicorn.run("main:app", port=8000' in (project_dir / "main.py").read_text()
+    base = (project_dir / "templates" / "base.html").read_text()
+    assert "<title>My Shop</title>" in base
+    assert "{{url_for('static',path=asset('dist/css/output.css'))}}" in base
+
+
+def test_tailwind_files_are_written(tmp_path):
+    with patch("tailgen.flask_app._npm_install"):
+        _install_and_configure_tailwindcss(tmp_path)
+
+    assert (tmp_path / "tailwind.config.js").read_text().startswith("/** @type")
+    assert (tmp_path / "static" / "src" / "input.css").read_text() == (
+        "@tailwind base;\n@tailwind components;\n@tailwind utilities;\n"
+    )
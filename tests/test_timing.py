@@ -0,0 +1,73 @@
+import json
+import sys
+import threading
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from typer.testing import CliRunner
+
+from tailgen import cli, timing
+from tailgen.process import run_process
+from tailgen.scheduler import Stage, run_stages
+
+runner = CliRunner()
+
+
+def test_subprocess_spans_nest_under_concurrent_stages():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def stage(code):
+        barrier.wait()
+        run_process([sys.executable, "-c", f"raise SystemExit({code})"], check=False)
+
+    recorder = timing.Recorder()
+    with timing.recording(recorder):
+        run_stages([Stage("pip", stage, (0,)), Stage("npm", stage, (3,))])
+
+    stages = {span.name: span for span in recorder.children(None)}
+    assert set(stages) == {"pip", "npm"}
+    assert stages["pip"].thread != stages["npm"].thread
+    for name, code in (("pip", 0), ("npm", 3)):
+        (child,) = recorder.children(stages[name].id)
+        assert child.category == "subprocess"
+        assert child.args["exit_code"] == code
+        assert stages[name].start <= child.start <= child.end <= stages[name].end
+
+
+def test_spans_are_not_collected_without_a_recorder():
+    with timing.span("stage") as args:
+        args["exit_code"] = 0
+    assert timing._recorder.get() is None
+
+
+def test_init_writes_timings_and_trace(tmp_path):
+    trace = tmp_path / "trace.json"
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch("tailgen.cli._init_project_directory", return_value=tmp_path)
+        )
+        for name in (
+            "_create_venv",
+            "_create_git_ignore",
+            "_create_readme",
+            "_git_init",
+            "_create_flask_project",
+            "_install_and_configure_tailwindcss",
+            "update_package_json_with_build_script",
+        ):
+            stack.enter_context(patch(f"tailgen.cli.{name}"))
+        result = runner.invoke(
+            cli.app, ["init", "--timings", "--trace", str(trace)], input="\n"
+        )
+
+    assert result.exit_code == 0
+    assert "Timings" in result.stdout
+
+    events = json.loads(trace.read_text())["traceEvents"]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    assert {"init", "project_directory", "venv", "flask", "package_json"} <= set(spans)
+    init = spans["init"]
+    assert init["ts"] <= spans["package_json"]["ts"]
+    assert spans["package_json"]["ts"] + spans["package_json"]["dur"] <= (
+        init["ts"] + init["dur"]
+    )
@@ -0,0 +1,70 @@
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from tailgen import cli, production
+from tailgen.process import run_process
+from tailgen.settings import configure
+from tailgen.wheelhouse import pip_source_args, wheelhouse_dir
+
+runner = CliRunner()
+
+
+pytestmark = pytest.mark.usefixtures("no_shipped_locks")
+
+
+@pytest.fixture(autouse=True)
+def reset_settings():
+    yield
+    configure()
+
+
+def test_offline_install_from_warmed_wheelhouse(tmp_path, cache_dir, wheel_dir):
+    result = runner.invoke(
+        cli.app, ["cache", "warm", "--framework", "flask", "--from", str(wheel_dir)]
+    )
+    assert result.exit_code == 0, result.stdout
+    assert (wheelhouse_dir() / "werkzeug-9.0.0-py3-none-any.whl").exists()
+
+    configure(offline=True)
+    target = tmp_path / "site-packages"
+    run_process(
+        [sys.executable, "-m", "pip", "install", "--target", target]
+        + pip_source_args(["flask"])
+        + ["flask"]
+    )
+    assert (target / "flask" / "__init__.py").exists()
+    assert (target / "werkzeug" / "__init__.py").exists()
+
+
+def test_fresh_wheelhouse_is_used_without_offline(cache_dir, wheel_dir):
+    assert pip_source_args(["flask"]) == []
+    runner.invoke(cli.app, ["cache", "warm", "-f", "flask", "--from", str(wheel_dir)])
+    assert pip_source_args(["flask"])[:2] == ["--no-index", "--find-links"]
+
+
+def test_offline_without_wheelhouse_fails(cache_dir):
+    configure(offline=True)
+    with pytest.raises(RuntimeError, match="tailgen cache warm"):
+        pip_source_args(["flask"])
+
+
+@pytest.mark.skipif(os.name == "nt", reason="gunicorn is not installed on Windows")
+def test_offline_production_install_from_warmed_wheelhouse(
+    tmp_path, cache_dir, wheel_dir
+):
+    runner.invoke(cli.app, ["cache", "warm", "-f", "flask", "--from", str(wheel_dir)])
+    assert (wheelhouse_dir() / "gunicorn-9.0.0-py3-none-any.whl").exists()
+
+    configure(offline=True)
+    with patch("tailgen.production._pip_install") as pip_install:
+        assert production._install_server(tmp_path / "venv", "flask")
+    assert pip_install.call_args.args[1] == [
+        "--no-index",
+        "--find-links",
+        str(wheelhouse_dir()),
+        "gunicorn",
+    ]
@@ -0,0 +1,130 @@
+import sys
+from importlib.resources import files
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from tailgen import build, cli, workspace
+
+runner = CliRunner()
+
+# Stands in for the standalone CLI: counts its runs and lists the templates
+# the workspace config gave it, so every service's classes show in the CSS
+FAKE_TAILWIND = """#!/bin/sh
+echo run >> runs.log
+mkdir -p static/dist/css
+cat */templates/*.html > static/dist/css/output.css
+"""
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "platform"
+    workspace.create(root, "standalone")
+    (root / "static" / "src").mkdir(parents=True)
+    (root / "static" / "src" / "input.css").write_text("@tailwind base;\n")
+    (root / "tailwind.config.js").write_text(
+        files("tailgen.setup_files")
+        .joinpath("workspace_tailwind_config.txt")
+        .read_text()
+    )
+    binary = root / "bin" / "tailwindcss"
+    binary.parent.mkdir()
+    binary.write_text(FAKE_TAILWIND)
+    binary.chmod(0o755)
+    return root
+
+
+def add_service(root, name, html):
+    (root / name / "templates").mkdir(parents=True)
+    (root / name / "templates" / "index.html").write_text(html)
+    workspace.add_service(root, name, "flask")
+    return root / name
+
+
+def runs(root):
+    log = root / "runs.log"
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+def test_services_find_their_workspace(root, tmp_path):
+    service = add_service(root, "billing", "")
+    assert workspace.find_root(service) == root
+    assert workspace.find_root(root) == root
+    assert workspace.find_root(tmp_path) is None
+    assert workspace.venv_dir(service) == root / "venv"
+    assert workspace.services(root) == {"billing": service}
+
+    with pytest.raises(workspace.WorkspaceError, match="--tailwind standalone"):
+        workspace.create(root, "npm")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fake CLI is a shell script")
+def test_build_runs_tailwind_once_for_every_service(root):
+    billing = add_service(root, "billing", '<p class="p-4"></p>\n')
+    admin = add_service(root, "admin", '<p class="m-2"></p>\n')
+
+    result = runner.invoke(cli.app, ["build", str(billing), str(admin)])
+    assert result.exit_code == 0, result.stdout
+    assert runs(root) == 1
+    css = (billing / build.OUTPUT_CSS).read_text()
+    assert "p-4" in css and "m-2" in css
+    assert (admin / build.OUTPUT_CSS).read_text() == css
+
+    result = runner.invoke(cli.app, ["build", str(root)])
+    assert result.stdout.count("is up to date") == 2
+    assert runs(root) == 1
+
+    (admin / "templates" / "index.html").write_text('<p class="m-8"></p>\n')
+    runner.invoke(cli.app, ["build", str(root)])
+    assert runs(root) == 2
+    assert "m-8" in (billing / build.OUTPUT_CSS).read_text()
+
+
+@patch("tailgen.cli._git_init")
+@patch("tailgen.workspace.install_tailwind")
+@patch("tailgen.workspace.create_environment")
+def test_workspace_init(create_environment, install_tailwind, git_init, tmp_path):
+    root = tmp_path / "platform"
+    result = runner.invoke(
+        cli.app, ["workspace", "init", str(root), "--tailwind", "standalone"]
+    )
+    assert result.exit_code == 0, result.stdout
+    create_environment.assert_called_once_with(root, ["fastapi", "flask"])
+    install_tailwind.assert_called_once_with(root)
+    git_init.assert_called_once_with(root)
+    assert workspace.read_manifest(root)["tailwind"] == "standalone"
+
+    result = runner.invoke(cli.app, ["workspace", "init", str(root)])
+    assert result.exit_code == 1
+    assert "is a workspace with --tailwind standalone" in result.stdout
+
+
+@patch("tailgen.cli.setup_complete")
+@patch("tailgen.lock.write_project_lock")
+@patch("tailgen.workspace.install_framework")
+@patch("tailgen.prefetch.start")
+def test_init_adds_a_service_to_the_workspace(
+    _prefetch, install_framework, _lock, setup_complete, root
+):
+    result = runner.invoke(
+        cli.app, ["init", "--workspace", str(root)], input="billing\n"
+    )
+    assert result.exit_code == 0, result.stdout
+    service = root / "billing"
+    install_framework.assert_called_once_with(root, "flask")
+    assert (service / "app.py").is_file()
+    assert (service / "templates" / "index.html").is_file()
+    # The workspace's venv, Tailwind and repository are used as they are
+    for shared in ("venv", "tailwind.config.js", "static/src/input.css", ".git"):
+        assert not (service / shared).exists()
+    assert workspace.services(root) == {"billing": service}
+    setup_complete.assert_called_once_with("flask", f"tailgen build {root}")
+
+
+@patch("tailgen.prefetch.start")
+def test_init_needs_a_workspace(_prefetch, tmp_path):
+    result = runner.invoke(cli.app, ["init", "--workspace", str(tmp_path)])
+    assert result.exit_code == 1
+    assert "is not a tailgen workspace" in result.stdout